@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Asyncio entry point of the web interface, alongside wsgi.py.
+It serves /api, /api/batch, /ajaxGet and /verb as the flask application
+does, the pages are served by the flask application (wsgi.py).
+The event loop serves the connections, the conjugation is run by a
+bounded worker pool (config ASGI_WORKERS, ASGI_PROCESSES): a request
+gets a 503 response if the pool is full (ASGI_MAX_PENDING), and a 504
+response if its conjugation is not done in ASGI_TIMEOUT seconds.
+The cached responses are sent by the event loop, without worker.
+The worker processes warm up their own caches, and drop the data read
+from the dictionary when it's changed, as the main process does.
+
+    uvicorn asgi:application --host 127.0.0.1 --port 8000
+"""
+import os
+import sys
+import json
+import asyncio
+import logging
+import urllib.parse
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BASE_DIR, "interfaces", "web"))
+sys.path.insert(0, BASE_DIR)
+
+import config.qutrub_config as qutrub_config
+import core.adaat
+import core.response_cache as response_cache
+import core.worker_pool as worker_pool
+import libqutrub.mosaref_main
+import qws_request
+
+# maximum size of a posted request
+MAX_BODY_SIZE = 1024 * 1024
+
+# the worker pool, created at start
+_pool = {}
+
+
+def get_pool():
+    """
+    Get the worker pool, created on the first use.
+    @rtype: worker_pool.WorkerPool
+    """
+    if "pool" not in _pool:
+        _pool["pool"] = worker_pool.WorkerPool(
+            workers = qutrub_config.ASGI_WORKERS or None,
+            max_pending = qutrub_config.ASGI_MAX_PENDING,
+            timeout = qutrub_config.ASGI_TIMEOUT,
+            processes = qutrub_config.ASGI_PROCESSES,
+            initializer = init_worker)
+    return _pool["pool"]
+
+
+def init_worker():
+    """
+    Initialize a worker process: load the conjugator data, keep the
+    dictionary signature, and conjugate the most frequent verbs in
+    background.
+    """
+    libqutrub.mosaref_main.warmup()
+    response_cache.check_database()
+    core.adaat.start_warmup()
+
+
+def compute_response(url, text, action, options):
+    """
+    Conjugate a request and serialize its response, run by the workers.
+    @return: the JSON response.
+    @rtype: bytes
+    """
+    # a worker process drops its own dictionary data if it's changed
+    response_cache.check_database()
+    resulttext = core.adaat.DoAction(text, action, options)
+    results = qws_request.format_result(resulttext)
+    invalid_verb = "" if results["result"] else "invalid"
+    logging.info('%s:%s:%s:%s', url, action, text, invalid_verb)
+    return qws_request.dump_json(results)
+
+
+def etag_matches(if_none_match, etag):
+    """
+    The ETag is given by the If-None-Match header, by weak comparison.
+    @param if_none_match: the header value.
+    @type if_none_match: string.
+    @param etag: the response ETag, without quotes.
+    @type etag: string.
+    @rtype: Boolean
+    """
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == "*" or tag == '"%s"' % etag:
+            return True
+    return False
+
+
+async def send_response(send, status, body = b"", headers = None,
+        head = False):
+    """
+    Send a complete response.
+    @param headers: the response headers (name, value).
+    @type headers: list of tuple.
+    @param head: send the headers only, for HEAD requests.
+    @type head: Boolean.
+    """
+    headers = list(headers or [])
+    headers.append(("Content-Length", str(len(body))))
+    await send({"type":"http.response.start", "status":status,
+        "headers":[(name.lower().encode("latin-1"), value.encode("latin-1"))
+            for (name, value) in headers]})
+    await send({"type":"http.response.body", "body":b"" if head else body})
+
+
+async def send_json(send, status, data, headers = None, head = False):
+    """
+    Send a JSON response.
+    """
+    headers = [("Content-Type", "application/json")] + list(headers or [])
+    await send_response(send, status, qws_request.dump_json(data), headers,
+        head)
+
+
+async def read_body(receive):
+    """
+    Read the body of a request.
+    @return: the body, None if it's too long.
+    @rtype: bytes
+    """
+    chunks = []
+    size = 0
+    more_body = True
+    while more_body:
+        message = await receive()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_SIZE:
+            return None
+        chunks.append(chunk)
+        more_body = message.get("more_body", False)
+    return b"".join(chunks)
+
+
+async def conjugation_entry(url, text, action, options):
+    """
+    Get the JSON body of a request and its ETag from the response cache,
+    or computed by the worker pool and cached.
+    @return: (body, etag)
+    @rtype: tuple
+    @raise worker_pool.PoolFullError: the pool is full.
+    @raise asyncio.TimeoutError: the conjugation is not done in time.
+    """
+    key = response_cache.request_key(url, action, text, options)
+    entry = response_cache.get(key)
+    if entry is None:
+        body = await get_pool().run(compute_response, url, text, action,
+            options)
+        entry = response_cache.store(key, body)
+    else:
+        logging.info('%s:%s:%s:cached', url, action, text)
+    return entry
+
+
+async def conjugation_response(send, request, url, text, action, options,
+        headers = None):
+    """
+    Send the response of a conjugation request, from the response cache
+    or computed by the worker pool.
+    """
+    head = request["method"] == "HEAD"
+    headers = list(headers or [])
+    try:
+        (body, etag) = await conjugation_entry(url, text, action, options)
+    except worker_pool.PoolFullError:
+        await send_json(send, 503, {"error":"busy"}, headers
+            + [("Retry-After", "1")], head)
+        return
+    except asyncio.TimeoutError:
+        await send_json(send, 504, {"error":"timeout"}, headers, head)
+        return
+    headers += [("ETag", '"%s"' % etag),
+        ("Cache-Control", "public, max-age=%d"
+            % qutrub_config.RESPONSE_MAX_AGE)]
+    if request["method"] in ("GET", "HEAD") and etag_matches(
+            request["headers"].get("if-none-match", ""), etag):
+        await send_response(send, 304, b"", headers, True)
+        return
+    if url == "api":
+        content_type = "application/json; charset=utf-8"
+    else:
+        content_type = "application/json"
+    await send_response(send, 200, body, [("Content-Type", content_type)]
+        + headers, head)
+
+
+async def api(send, request, text = "", haraka = ""):
+    """
+    /api, /api/<verb>, /api/<verb>/<haraka>
+    """
+    default = qws_request.API_DEFAULT_VERB
+    args = request["args"]
+    # Request a random text
+    if qws_request.is_random_text_request(args):
+        await send_json(send, 200, {"text": default})
+        return
+    (text, options) = qws_request.api_options(args, text, haraka)
+    await conjugation_response(send, request, "api", text, "Conjugate",
+        options, [("Access-Control-Allow-Origin", "*")])
+
+
+async def read_json(send, receive):
+    """
+    Read a posted JSON request, an error response is sent if it's
+    not valid.
+    @return: (valid, data)
+    @rtype: tuple
+    """
+    body = await read_body(receive)
+    if body is None:
+        await send_json(send, 413, {"error":"request too long"})
+        return (False, None)
+    try:
+        return (True, json.loads(body))
+    except ValueError:
+        await send_json(send, 400, {"error":"invalid request"})
+        return (False, None)
+
+
+async def batch_line(index, text, options, error):
+    """
+    Conjugate a verb of a batch request.
+    @return: the line of the verb.
+    @rtype: bytes
+    """
+    body = None
+    if error is None:
+        try:
+            (body, etag) = await conjugation_entry("api", text, "Conjugate",
+                options)
+        except worker_pool.PoolFullError:
+            error = "busy"
+        except asyncio.TimeoutError:
+            error = "timeout"
+        except Exception:
+            logging.exception("batch: %s", text)
+            error = "conjugation error"
+    return qws_request.batch_line(index, text, body, error)
+
+
+async def api_batch(send, request, receive):
+    """
+    /api/batch, conjugate a list of verbs, given as /api arguments.
+    The verbs are conjugated by the worker pool, the results are streamed
+    as newline delimited JSON, a line by verb, as they are done.
+    """
+    (valid, data) = await read_json(send, receive)
+    if not valid:
+        return
+    items = qws_request.batch_items(data)
+    if items is None:
+        await send_json(send, 400, {"error":"a list of verbs is expected"})
+        return
+    if len(items) > qutrub_config.BATCH_MAX_SIZE:
+        await send_json(send, 413, {"error":"too many verbs, the maximum "
+            "is %d" % qutrub_config.BATCH_MAX_SIZE})
+        return
+    await send({"type":"http.response.start", "status":200,
+        "headers":[(b"content-type", b"application/x-ndjson"),
+            (b"access-control-allow-origin", b"*")]})
+    # the batch keeps every worker busy, without filling the pool: the
+    # window is limited to the free places of the pool
+    pool = get_pool()
+    window = asyncio.Semaphore(max(1, min(2 * pool.workers, pool.free())))
+    async def conjugate_item(index, item):
+        async with window:
+            return await batch_line(index, *item)
+    jobs = [asyncio.ensure_future(conjugate_item(index, item))
+        for (index, item) in enumerate(items)]
+    try:
+        for job in asyncio.as_completed(jobs):
+            await send({"type":"http.response.body", "body":await job,
+                "more_body":True})
+    finally:
+        for job in jobs:
+            job.cancel()
+    await send({"type":"http.response.body", "body":b""})
+
+
+async def ajax(send, request, receive):
+    """
+    /ajaxGet
+    """
+    if request["method"] == "POST":
+        (valid, data) = await read_json(send, receive)
+        if not valid:
+            return
+        args = data.get("data") if isinstance(data, dict) else None
+        if not isinstance(args, dict):
+            await send_json(send, 400, {"error":"invalid request"})
+            return
+    else:
+        args = request["args"]
+    # Request a random text
+    if qws_request.is_random_text_request(args):
+        await send_json(send, 200, {"text": core.adaat.random_text()})
+        return
+    (text, action, options) = qws_request.ajax_options(args)
+    await conjugation_response(send, request, "ajax", text, action, options)
+
+
+async def verb(send, request, verb_value, haraka = "فتحة", trans = False):
+    """
+    /verb/<verb_value>/<haraka>/<trans>, redirected to the main page.
+    """
+    location = '/?verb=%s&haraka=%s&trans=%s' % (verb_value, haraka, trans)
+    await send_response(send, 302, b"", [("Location",
+        urllib.parse.quote(location, safe="/?=&"))])
+
+
+async def lifespan(receive, send):
+    """
+    Load the conjugator data and start the workers at start,
+    stop them at shutdown.
+    """
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            # load the conjugator data before the first request
+            libqutrub.mosaref_main.warmup()
+            get_pool()
+            # conjugate the most frequent verbs in background, the worker
+            # processes warm up their own caches: the main process doesn't
+            # conjugate, and its warm-up thread would hold the locks of
+            # the data while the workers are forked
+            if not qutrub_config.ASGI_PROCESSES:
+                core.adaat.start_warmup()
+            await send({"type":"lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            if "pool" in _pool:
+                _pool.pop("pool").shutdown(wait = False)
+            await send({"type":"lifespan.shutdown.complete"})
+            return
+
+
+def parse_request(scope):
+    """
+    Get the method, the path parts, the first value of every query
+    argument and the headers of a request.
+    @rtype: dict
+    """
+    args = {}
+    for (name, value) in urllib.parse.parse_qsl(
+            scope.get("query_string", b"").decode("latin-1"),
+            keep_blank_values=True):
+        args.setdefault(name, value)
+    headers = dict((name.decode("latin-1").lower(), value.decode("latin-1"))
+        for (name, value) in scope.get("headers", []))
+    return {"method":scope["method"], "args":args, "headers":headers,
+        "parts":[part for part in scope["path"].split("/") if part]}
+
+
+async def application(scope, receive, send):
+    """
+    The ASGI application.
+    """
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+    request = parse_request(scope)
+    parts = request["parts"]
+    method = request["method"]
+    if parts == ["api", "batch"] and method == "POST":
+        await api_batch(send, request, receive)
+    elif parts[:1] == ["api"] and len(parts) <= 3 \
+            and method in ("GET", "HEAD"):
+        await api(send, request, *parts[1:])
+    elif parts == ["ajaxGet"] and method in ("GET", "HEAD", "POST"):
+        await ajax(send, request, receive)
+    elif parts[:1] == ["verb"] and 2 <= len(parts) <= 4 \
+            and method in ("GET", "HEAD"):
+        await verb(send, request, *parts[1:])
+    else:
+        await send_json(send, 404, {"error":"not found"})
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run("asgi:application", host="127.0.0.1", port=8000)
@@ -0,0 +1,375 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#************************************************************************
+# Run benchmarks
+#
+# Description:
+# Time the conjugation engine, displays, lookups and web api
+#
+# Copyright (c) 2026, Qutrub-ng Project
+#
+#***********************************************************************/
+"""
+Run the benchmarks on stratified samples of verbs, and save the results
+as JSON, to compare the runs across commits.
+
+Every benchmark is timed for every verb of the samples, the results are
+given by verb class: number of calls, throughput and latencies.
+By default the conjugation caches are cleared before every repeat.
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py -b do_sarf -b flask_api -n 50
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/old.json
+"""
+import argparse
+import datetime
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(BASE_DIR)
+import pyarabic.araby as araby
+import libqutrub.classverb as classverb
+import libqutrub.mosaref_main as mosaref_main
+import libqutrub.verb_cache as verb_cache
+import libqutrub.verb_const as vconst
+import libqutrub.verb_db as verb_db
+import libqutrub.verb_search as verb_search
+import libqutrub.verb_template as verb_template
+import libqutrub.conjugation_store as conjugation_store
+import libqutrub.verb_timing as verb_timing
+import core.qutrub_api as qutrub_api
+try:
+    import samples
+except ImportError:
+    from benchmarks import samples
+
+RESULTS_DIR = os.path.join(BASE_DIR, "benchmarks", "results")
+
+# the ConjugateDisplay formats
+DISPLAY_FORMATS = [("text", "display_text"), ("html", "display_html"),
+    ("html_colored", "display_html_colored_diacritics"),
+    ("dict", "display_dict"), ("csv", "display_csv"),
+    ("table", "display_table"), ("xml", "display_xml"),
+    ("tex", "display_tex"), ("rows", "display_rows")]
+
+
+def clear_caches():
+    """
+    Clear the conjugation caches, to time the conjugation engine.
+    """
+    verb_cache.RESULT_CACHE.clear()
+    verb_cache.FUTURE_CACHE.clear()
+    verb_template.TEMPLATE_CACHE.clear()
+    classverb.cache_standard.clear()
+    verb_search.SEARCH_CACHE.clear()
+
+
+#####################################
+#{ benchmarks, every benchmark prepares a call for a verb
+#####################################
+def bench_do_sarf(verb, haraka, transitive):
+    return lambda: mosaref_main.do_sarf(verb, haraka,
+        transitive=transitive, display_format="DICT")
+
+
+def bench_verbclass(verb, haraka, transitive):
+    return lambda: classverb.VerbClass(verb, transitive, haraka)
+
+
+def bench_conjugate_all_tenses(verb, haraka, transitive):
+    vbc = classverb.VerbClass(verb, transitive, haraka)
+    return vbc.conjugate_all_tenses
+
+
+def display_benchmark(method):
+    """
+    Create the benchmark of a display method on a conjugated verb.
+    """
+    def bench_display(verb, haraka, transitive):
+        vbc = classverb.VerbClass(verb, transitive, haraka)
+        vbc.conjugate_all_tenses()
+        display = getattr(vbc.conj_display, method)
+        return lambda: display(vconst.TABLE_TENSE)
+    return bench_display
+
+
+def bench_suggest(verb, haraka, transitive):
+    api = qutrub_api.QutrubApi(db_path=BASE_DIR)
+    word = araby.strip_tashkeel(verb)
+    return lambda: api.suggest_similar_verb_list(word, haraka)
+
+
+def bench_verb_search(verb, haraka, transitive):
+    # a common misspelling, the plural waw is added to the verb
+    word = araby.strip_tashkeel(verb) + araby.WAW
+    verb_search.load()
+    return lambda: verb_search.search(word)
+
+
+def bench_verb_db(verb, haraka, transitive):
+    if len(araby.strip_harakat(verb)) == 3:
+        return lambda: verb_db.find_triliteral_verb(BASE_DIR, verb, haraka)
+    api = qutrub_api.QutrubApi(db_path=BASE_DIR)
+    return lambda: api.lookup_nontri_verb(verb)
+
+
+def bench_adaat_conjugate(verb, haraka, transitive):
+    # the request path of the web interface, without http
+    import config.qutrub_config
+    import core.adaat
+    config.qutrub_config.DB_BASE_PATH = BASE_DIR
+    options = {"all":True, "future_type":haraka, "transitive":transitive}
+    return lambda: core.adaat.conjugate(verb, options)
+
+
+_flask = {}
+
+
+def get_test_client():
+    """
+    Get the test client of the web interface, None if flask is missing.
+    """
+    if "client" not in _flask:
+        # the database path of the web server is relative to its directory
+        import config.qutrub_config
+        config.qutrub_config.DB_BASE_PATH = BASE_DIR
+        sys.path.append(os.path.join(BASE_DIR, "interfaces", "web"))
+        try:
+            import qutrub_webserver
+        except ImportError as error:
+            print("flask_api skipped: %s" % error)
+            _flask["client"] = None
+        else:
+            qutrub_webserver.app.testing = True
+            _flask["client"] = qutrub_webserver.app.test_client()
+    return _flask["client"]
+
+
+def bench_flask_api(verb, haraka, transitive):
+    client = get_test_client()
+    if client is None:
+        return None
+    query = {"verb":verb, "haraka":haraka, "trans":"1" if transitive else "0"}
+    def call():
+        response = client.get("/api", query_string=query)
+        if response.status_code != 200:
+            raise ValueError("/api status %d" % response.status_code)
+    return call
+
+
+BENCHMARKS = [("do_sarf", bench_do_sarf), ("verbclass", bench_verbclass),
+    ("conjugate_all_tenses", bench_conjugate_all_tenses)]
+BENCHMARKS += [("display_" + name, display_benchmark(method))
+    for (name, method) in DISPLAY_FORMATS]
+BENCHMARKS += [("suggest_similar_verb_list", bench_suggest),
+    ("verb_search", bench_verb_search), ("verb_db", bench_verb_db),
+    ("adaat_conjugate", bench_adaat_conjugate),
+    ("flask_api", bench_flask_api)]
+
+
+#####################################
+#{ runner
+#####################################
+def summarize(latencies):
+    """
+    Summarize the latencies of calls.
+    @param latencies: the latencies in seconds.
+    @type latencies: list of float.
+    @return: count, throughput and latencies in milliseconds.
+    @rtype: dict
+    """
+    latencies = sorted(latencies)
+    count = len(latencies)
+    total = sum(latencies)
+    if not count:
+        return {"count":0}
+    return {"count":count, "total_s":round(total, 6),
+        "ops_per_s":round(count / total, 2) if total else None,
+        "mean_ms":round(total / count * 1000, 4),
+        "p50_ms":round(latencies[count // 2] * 1000, 4),
+        "p95_ms":round(latencies[min(count - 1, int(count * 0.95))] * 1000, 4),
+        "max_ms":round(latencies[-1] * 1000, 4)}
+
+
+def run_benchmark(factory, verb_samples, repeats, warm):
+    """
+    Time a benchmark on all the verb samples.
+    @return: results by verb class, and 'all' for all classes.
+    @rtype: dict
+    """
+    latencies = dict((name, []) for name in verb_samples)
+    for repeat in range(repeats):
+        if not warm:
+            clear_caches()
+        for name in verb_samples:
+            for (verb, haraka, transitive) in verb_samples[name]:
+                call = factory(verb, haraka, transitive)
+                if call is None:
+                    return None
+                start = time.perf_counter()
+                call()
+                latencies[name].append(time.perf_counter() - start)
+    results = dict((name, summarize(latencies[name])) for name in latencies)
+    results["all"] = summarize([latency for name in latencies
+        for latency in latencies[name]])
+    return results
+
+
+# time the import of the conjugator and its first conjugation in a new process
+COLD_START_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import libqutrub.conjugator
+imported = time.perf_counter()
+libqutrub.conjugator.conjugate(u"\u0643\u064e\u062a\u064e\u0628\u064e",
+    u"\u0636\u0645\u0629", display_format="DICT")
+json.dump({"import":imported - start,
+    "first_conjugation":time.perf_counter() - imported}, sys.stdout)
+"""
+
+
+def cold_start(runs):
+    """
+    Time the cold start of the conjugator in new processes: the import of
+    libqutrub.conjugator and the first conjugation.
+    @param runs: number of processes.
+    @type runs: integer.
+    @return: the summary of the import and first conjugation latencies.
+    @rtype: dict
+    """
+    latencies = {"import":[], "first_conjugation":[]}
+    for run in range(runs):
+        output = subprocess.check_output([sys.executable, "-c",
+            COLD_START_SCRIPT], cwd=BASE_DIR)
+        timings = json.loads(output.decode("utf-8"))
+        for name in latencies:
+            latencies[name].append(timings[name])
+    return dict((name, summarize(latencies[name])) for name in latencies)
+
+
+def git_commit():
+    """
+    Get the current commit of the repository, None if not available.
+    """
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+            cwd=BASE_DIR, stderr=subprocess.DEVNULL).decode("ascii").strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, old_results):
+    """
+    Print the throughput of the results against old results.
+    """
+    print("%-28s %-14s %12s %12s %8s" % ("benchmark", "class", "old ops/s",
+        "new ops/s", "ratio"))
+    for bench in results["results"]:
+        old_bench = old_results["results"].get(bench)
+        if not old_bench:
+            continue
+        for name in results["results"][bench]:
+            new = results["results"][bench][name].get("ops_per_s")
+            old = old_bench.get(name, {}).get("ops_per_s")
+            if new and old:
+                print("%-28s %-14s %12.1f %12.1f %8.2f" % (bench, name, old,
+                    new, new / old))
+
+
+def grabargs():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the conjugator on stratified verb samples')
+    parser.add_argument("-b", dest="benchmarks", action="append",
+        choices=[name for (name, factory) in BENCHMARKS],
+        help="benchmark to run, can be repeated, default all")
+    parser.add_argument("-n", dest="size", type=int, default=20,
+        help="number of verbs by verb class")
+    parser.add_argument("-r", dest="repeats", type=int, default=3,
+        help="number of repeats")
+    parser.add_argument("--seed", type=int, default=0,
+        help="random seed of the samples")
+    parser.add_argument("--warm", action="store_true",
+        help="keep the conjugation caches between repeats")
+    parser.add_argument("--no-store", dest="store", action="store_false",
+        help="don't use the precomputed conjugation store")
+    parser.add_argument("--no-stamp-index", dest="stamp_index",
+        action="store_false",
+        help="query the verbmore table instead of the stamp index")
+    parser.add_argument("--stages", action="store_true",
+        help="time the conjugation stages of every benchmark")
+    parser.add_argument("--cold-start", dest="cold_start", type=int,
+        default=5, help="number of processes to time the import, 0 to skip")
+    parser.add_argument("-o", dest="output",
+        help="output JSON file, default in benchmarks/results")
+    parser.add_argument("--compare", dest="compare",
+        help="results JSON file of a previous run to compare with")
+    return parser.parse_args()
+
+
+def main(args):
+    args = grabargs()
+    # the web interface logs in a file by default
+    logging.basicConfig(level=logging.WARNING)
+    if not args.store:
+        conjugation_store.set_store_path(None)
+    if not args.stamp_index:
+        verb_db.set_stamp_index(False)
+    selected = args.benchmarks or [name for (name, factory) in BENCHMARKS]
+    verb_samples = samples.stratified_sample(args.size, args.seed)
+    commit = git_commit()
+    results = {"meta":{
+        "date":datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit":commit,
+        "python":platform.python_version(),
+        "platform":platform.platform(),
+        "sample_size":args.size, "seed":args.seed, "repeats":args.repeats,
+        "warm":args.warm,
+        "store":conjugation_store.lookup(u"كَتَبَ", araby.DAMMA, True) is not None,
+        "stamp_index":args.stamp_index,
+        "classes":dict((name, len(verb_samples[name]))
+            for name in verb_samples)},
+        "results":{}}
+    for (name, factory) in BENCHMARKS:
+        if name not in selected:
+            continue
+        if args.stages:
+            verb_timing.reset()
+            verb_timing.enable()
+        result = run_benchmark(factory, verb_samples, args.repeats, args.warm)
+        verb_timing.disable()
+        if result is None:
+            continue
+        if args.stages:
+            result["stages"] = verb_timing.get_stats()
+        results["results"][name] = result
+        print("%-28s %10.1f ops/s  p50 %8.3f ms  p95 %8.3f ms" % (name,
+            result["all"]["ops_per_s"], result["all"]["p50_ms"],
+            result["all"]["p95_ms"]))
+    if args.cold_start > 0:
+        result = cold_start(args.cold_start)
+        results["cold_start"] = result
+        print("%-28s import p50 %8.3f ms  first conjugation p50 %8.3f ms" % (
+            "cold_start", result["import"]["p50_ms"],
+            result["first_conjugation"]["p50_ms"]))
+    output = args.output
+    if not output:
+        if not os.path.exists(RESULTS_DIR):
+            os.makedirs(RESULTS_DIR)
+        output = os.path.join(RESULTS_DIR, "%s-%s.json" % (
+            datetime.datetime.now().strftime("%Y%m%d-%H%M%S"),
+            commit or "nocommit"))
+    with open(output, "w", encoding="utf-8") as outfile:
+        json.dump(results, outfile, ensure_ascii=False, indent=1)
+    print("results saved in %s" % output)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as infile:
+            compare(results, json.load(infile))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
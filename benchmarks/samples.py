@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#************************************************************************
+# Benchmark samples
+#
+# Description:
+# Stratified samples of the lexicon verbs, by verb class
+#
+# Copyright (c) 2026, Qutrub-ng Project
+#
+#***********************************************************************/
+"""
+Select the benchmark inputs from the verb dictionary.
+The verbs are classified as sound, hamzated, doubled, assimilated,
+hollow, defective, irregular, quadriliteral, 5 and 6 letters verbs,
+and the same number of verbs is taken at random from every class,
+with a fixed seed, so the runs use the same inputs.
+"""
+import os
+import sys
+import random
+import sqlite3
+sys.path.append(os.path.join(os.path.dirname(__file__), '../'))
+import pyarabic.araby as araby
+import libqutrub.classverb as classverb
+
+DB_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+    '..', 'data', 'verbdict.db')
+
+# the verb classes, in the classification order
+VERB_CLASSES = ["irregular", "doubled", "hamzated", "assimilated", "hollow",
+    "defective", "sound", "quadriliteral", "5-letters", "6-letters"]
+
+
+def verb_class(verb, future_type):
+    """
+    Get the class of a verb.
+    @param verb: the vocalized verb.
+    @type verb: unicode.
+    @param future_type: the future type name (فتحة، ضمة، كسرة).
+    @type future_type: unicode.
+    @return: the verb class, or None if the verb has no class.
+    @rtype: unicode.
+    """
+    # the shadda is kept as a letter
+    verb_nm = araby.strip_harakat(verb)
+    if len(verb_nm) == 4:
+        return "quadriliteral"
+    elif len(verb_nm) == 5:
+        return "5-letters"
+    elif len(verb_nm) == 6:
+        return "6-letters"
+    elif len(verb_nm) != 3:
+        return None
+    vbc = classverb.VerbClass(verb, True, future_type, display=False)
+    if vbc._is_irregular_verb():
+        return "irregular"
+    elif araby.SHADDA in verb_nm:
+        return "doubled"
+    elif araby.HAMZA in araby.normalize_hamza(verb_nm):
+        return "hamzated"
+    elif verb_nm[0] in (araby.WAW, araby.YEH):
+        return "assimilated"
+    elif verb_nm[1] in (araby.ALEF, araby.WAW, araby.YEH):
+        return "hollow"
+    elif verb_nm[2] in (araby.ALEF, araby.ALEF_MAKSURA, araby.WAW, araby.YEH):
+        return "defective"
+    return "sound"
+
+
+def lexicon_verbs(db_file = DB_FILE):
+    """
+    Get the verbs of the dictionary.
+    @param db_file: the verbdict database file.
+    @type db_file: string.
+    @return: list of (verb, future type name, transitive)
+    @rtype: list of tuple.
+    """
+    conn = sqlite3.connect(db_file)
+    try:
+        rows = conn.execute("""select verb_vocalised, haraka, transitive
+                from verbdict
+                union
+                select verb, ?, transitive
+                from verbmore""", (u"فتحة", )).fetchall()
+    finally:
+        conn.close()
+    # MEEM is transitive, KAF is common, LAM is intransitive
+    return sorted((verb, haraka, transitive in (araby.KAF, araby.MEEM))
+        for (verb, haraka, transitive) in rows if verb)
+
+
+def stratified_sample(size = 20, seed = 0, db_file = DB_FILE):
+    """
+    Take a random sample of verbs from every verb class.
+    @param size: number of verbs by class.
+    @type size: integer.
+    @param seed: the random seed.
+    @type seed: integer.
+    @param db_file: the verbdict database file.
+    @type db_file: string.
+    @return: verbs by class, {class:[(verb, future type name, transitive)]}
+    @rtype: dict
+    """
+    classes = dict((name, []) for name in VERB_CLASSES)
+    for (verb, haraka, transitive) in lexicon_verbs(db_file):
+        name = verb_class(verb, haraka)
+        if name:
+            classes[name].append((verb, haraka, transitive))
+    rand = random.Random(seed)
+    samples = {}
+    for name in VERB_CLASSES:
+        verbs = classes[name]
+        if len(verbs) > size:
+            verbs = rand.sample(verbs, size)
+        samples[name] = verbs
+    return samples
@@ -12,6 +12,28 @@ LOGGING_FILE = "./logs.txt"
 # in developement True in production False
 MODE_DEBUG = True
 # ~ MODE_DEBUG = False
+# Cache warm-up at server start, in a background thread:
+# number of the most frequent verbs conjugated, 0 to disable
+WARMUP_VERBS = 500
+# maximum duration of the warm-up in seconds
+WARMUP_TIME_BUDGET = 30
+# HTTP response cache of /api and /ajaxGet:
+# number of responses kept in memory
+RESPONSE_CACHE_SIZE = 4096
+# the max-age given to the clients and proxies, in seconds
+RESPONSE_MAX_AGE = 86400
+# asyncio server (asgi.py), the conjugation is run by a bounded pool:
+# number of workers, 0 for the number of CPUs
+ASGI_WORKERS = 0
+# use worker processes instead of threads
+ASGI_PROCESSES = False
+# maximum number of running and waiting conjugations, the next requests
+# get a 503 response
+ASGI_MAX_PENDING = 64
+# maximum waiting time of a conjugation in seconds, then a 504 response
+ASGI_TIMEOUT = 10
+# maximum number of verbs of a batch request (/api/batch)
+BATCH_MAX_SIZE = 500
 def main(args):
     return 0
 
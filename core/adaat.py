@@ -20,13 +20,28 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '../'))
 import random
 import logging
 import re
+import time
+import threading
 
 import pyarabic.araby  as araby # arabic words general functions
 
 
 import config.qutrub_config
+import libqutrub.verb_db as verb_db
+import libqutrub.verb_cache as verb_cache
+import libqutrub.ar_verb as ar_verb
+import libqutrub.verb_const as vconst
+import libqutrub.mosaref_main as mosaref
 from . import qutrub_api
 
+# the options of the verbs conjugated by the warm-up, as given by the api
+WARMUP_OPTIONS = {"all":True, "future_type":u"فتحة", "transitive":True}
+# the sections of a conjugation result, all computed by default
+FIELDS = ("table", "verb_info", "suggest")
+# the conjugation services by database path, one by worker
+_services = {}
+_services_lock = threading.Lock()
+
 def DoAction(text, action, options = {}):
     """
     do action by name
@@ -44,60 +59,127 @@ def DoAction(text, action, options = {}):
 def conjugate(text, options):
     """
     Conjugate verb using qutrub
-    
+    The conjugation service of the worker is used.
     """
-   
-    myconjugator = qutrub_api.QutrubApi(db_path = config.qutrub_config.DB_BASE_PATH)
-    
-   
-    #extract first word if many words are given
-    word = text.split(" ")[0]
-    # if the verb is not valid:
-    valid = myconjugator.is_valid_infinitive(word)
-    if not valid:    
-        suggestions  =  myconjugator.suggest_similar_verb_list(word, u"فتحة")
-        if suggestions:
-            return {"table":[], "verb_info":"","suggest":suggestions};
-        else:
-            return {"table":[], "verb_info":"","suggest":[]}
-    else:  # if verb is valid
-            
-        
-        given_future_type = options.get("future_type",u"فتحة") 
+    return get_service().conjugate(text, options)
+
+
+class ConjugationService:
+    """
+    The conjugation service of a worker, created once and used by all the
+    requests and threads: it keeps no request state, the verb is looked up
+    once, and its dictionary rows and conjugation are used by the table,
+    the verb info and the suggestions.
+    """
+    def __init__(self, db_path):
+        """
+        init method
+        @param db_path: the database path of the dictionary.
+        @type db_path: path string.
+        """
+        self.db_path = db_path
+        # only the stateless methods of the api are used
+        self.api = qutrub_api.QutrubApi(db_path = db_path)
+
+    def conjugate(self, text, options):
+        """
+        Conjugate the first word of a text, as given by the web interface.
+        Only the sections given by the fields option are computed, the
+        others are empty, the tenses and pronouns options select the cells
+        of the table.
+        @param text: given text.
+        @type text: unicode.
+        @param options: the conjugation options, as given by the api,
+        with the filters: fields (table, verb_info, suggest), tenses
+        and pronouns.
+        @type options: dict.
+        @return: {"table", "suggest", "verb_info"}
+        @rtype: dict
+        """
+        api = self.api
+        fields = options.get("fields") or FIELDS
+        #extract first word if many words are given
+        word = text.split(" ")[0]
+        # if the verb is not valid:
+        if not api.is_valid_infinitive(word):
+            suggestions = []
+            if "suggest" in fields:
+                suggestions = api.suggest_similar_verb_list(word, u"فتحة")
+            return {"table":[], "verb_info":"", "suggest":suggestions or []}
+        given_future_type = options.get("future_type", u"فتحة")
         given_transitive = options.get("transitive", False)
-        # find future haraka for a given verb
-        verb_list = myconjugator.find_verb(word, given_future_type)
+        # find future haraka for a given verb, the rows of triliteral verbs
+        # are kept for the suggestions
+        tri_rows = None
+        if len(araby.strip_harakat(word)) == 3:
+            tri_rows = verb_db.fetch_triliteral_rows(self.db_path,
+                [araby.strip_harakat(word)])
+            verb_list = tri_rows and verb_db.order_triliteral_rows(word,
+                tri_rows[araby.strip_harakat(word)], given_future_type)
+        else:
+            verb_list = api.lookup_nontri_verb(word)
         # get vocalized form of the verb
-        if(verb_list):
-            word = verb_list[0].get("verb",word)
-            future_type = verb_list[0].get("haraka",word)
-            transitive = verb_list[0].get("transitive",word)
-            # ~ logging.debug("adaat.py:", future_type, verb_list[0].get("haraka",word))
+        if verb_list:
+            word = verb_list[0].get("verb", word)
+            future_type = verb_list[0].get("haraka", word)
+            transitive = verb_list[0].get("transitive", word)
         else:
             future_type = given_future_type
             transitive = given_transitive
-        
-        conjugate_result =  do_sarf(myconjugator, word, 
-            future_type = future_type,
-            all         = options.get("all", False),
-            past        = options.get("past", False),
-            future      = options.get("future", False),
-            passive     = options.get("passive", False),
-            imperative  = options.get("imperative", False),
-            future_moode= options.get("future_moode", False),
-            confirmed   = options.get("confirmed", False),
-            transitive  = transitive,
-            );
-            
-        conjugate_result_table = conjugate_result.get("table",{})
-        # more suggestion
-        conjugate_result_suggest = myconjugator.suggest_similar_verb_list(word, future_type)
-            
-        conjugate_result_verb_info= myconjugator.format_verb_info(conjugate_result.get("verb_info",""), bool(verb_list))
+        future_mark = ar_verb.get_future_type_by_name(future_type)
+        if options.get("tenses"):
+            # the passive tenses of intransitive verbs are not given
+            tenses = [tense for tense in options["tenses"]
+                if transitive or tense in vconst.TableIndicativeTense]
+        else:
+            tenses = qutrub_api.select_tenses(
+                all         = options.get("all", False),
+                past        = options.get("past", False),
+                future      = options.get("future", False),
+                passive     = options.get("passive", False),
+                imperative  = options.get("imperative", False),
+                future_moode= options.get("future_moode", False),
+                confirmed   = options.get("confirmed", False),
+                transitive  = transitive,
+                )
+        result = {"table":[], "suggest":[], "verb_info":""}
+        future_form = None
+        # no table if all the given tenses are passive for an intransitive
+        if "table" in fields and (tenses or not options.get("tenses")):
+            # the table is displayed once, only the given tenses are
+            # conjugated, the conjugation is cached
+            conj_display = mosaref.get_conjugation_display(word,
+                future_mark, transitive, tenses)
+            result["table"] = conj_display.display_table(
+                tenses or vconst.TABLE_TENSE, options.get("pronouns"))
+            future_form = conj_display.future_form
+        if "verb_info" in fields:
+            verb_info = api.get_verb_info(word, future_mark, transitive,
+                future_form = future_form)
+            result["verb_info"] = api.format_verb_info(verb_info,
+                bool(verb_list))
+        if "suggest" in fields:
+            result["suggest"] = api.suggest_similar_verb_list(word,
+                future_type, tri_rows = tri_rows)
+        return result
+
+
+def get_service():
+    """
+    Get the conjugation service of the worker, created on the first use
+    for the configured database path.
+    @rtype: ConjugationService
+    """
+    db_path = config.qutrub_config.DB_BASE_PATH
+    service = _services.get(db_path)
+    if service is None:
+        with _services_lock:
+            service = _services.get(db_path)
+            if service is None:
+                service = ConjugationService(db_path)
+                _services[db_path] = service
+    return service
 
-        return {"table":conjugate_result_table,
-        "suggest":conjugate_result_suggest,
-        "verb_info":conjugate_result_verb_info}
 
 def do_sarf(myconjugator, word,future_type,all=True,past=False,future=False,passive=False,imperative=False,future_moode=False,confirmed=False,transitive=False,display_format="HTML"):
     
@@ -121,6 +203,69 @@ def do_sarf(myconjugator, word,future_type,all=True,past=False,future=False,pass
     
 
 
+def warmup(top = None, time_budget = None):
+    """
+    Conjugate the most frequent verbs of the corpus (freq_verbs table),
+    to fill the conjugation caches before the first requests.
+    The verbs are conjugated by decreasing frequency, until the time
+    budget is spent.
+    @param top: the number of verbs, default config WARMUP_VERBS, it's
+    limited to the result cache size.
+    @type top: integer.
+    @param time_budget: the maximum duration in seconds, default config
+    WARMUP_TIME_BUDGET.
+    @type time_budget: float.
+    @return: the number of conjugated verbs.
+    @rtype: integer
+    """
+    if top is None:
+        top = config.qutrub_config.WARMUP_VERBS
+    if time_budget is None:
+        time_budget = config.qutrub_config.WARMUP_TIME_BUDGET
+    # the first verbs would be evicted by the last ones
+    top = min(top, verb_cache.RESULT_CACHE.maxsize or top)
+    if top <= 0:
+        return 0
+    start = time.monotonic()
+    try:
+        verbs = verb_db.frequent_verbs(config.qutrub_config.DB_BASE_PATH,
+            top)
+    except Exception:
+        logging.exception("warmup: can't read the frequent verbs")
+        return 0
+    count = 0
+    for verb in verbs:
+        if time.monotonic() - start > time_budget:
+            break
+        try:
+            conjugate(verb, dict(WARMUP_OPTIONS))
+        except Exception:
+            logging.exception("warmup: can't conjugate %s", verb)
+        count += 1
+    logging.info("warmup: %d verbs conjugated in %.2f s", count,
+        time.monotonic() - start)
+    return count
+
+
+def start_warmup(top = None, time_budget = None):
+    """
+    Run the warm-up in a background thread, the server is ready while
+    the caches are filled.
+    @param top: the number of verbs, default config WARMUP_VERBS.
+    @type top: integer.
+    @param time_budget: the maximum duration in seconds, default config
+    WARMUP_TIME_BUDGET.
+    @type time_budget: float.
+    @return: the started thread.
+    @rtype: threading.Thread
+    """
+    thread = threading.Thread(target=warmup, args=(top, time_budget),
+        name="qutrub-warmup")
+    thread.daemon = True
+    thread.start()
+    return thread
+
+
 def random_text():
     """
     get random text for tests
@@ -22,7 +22,6 @@
 #  
 #
 import re
-import sqlite3 as sqlite
 import os
         
 import pyarabic.araby as araby
@@ -36,9 +35,48 @@ import libqutrub.verb_db
 import libqutrub.ar_verb as ar_verb
 import libqutrub.verb_const as verb_const
 import libqutrub.mosaref_main as mosaref
+import libqutrub.db_pool as db_pool
+import libqutrub.verb_search as verb_search
 
 from libqutrub.verb_valid import is_valid_infinitive_verb, suggest_verb
 import logging
+
+
+def select_tenses(all=True, past=False, future=False, passive=False,
+        imperative=False, future_moode=False, confirmed=False,
+        transitive=False):
+    """
+    Select the tenses according to given parameters, without conjugator
+    state, used by QutrubApi.manage_tenses.
+    @return: the selected tenses.
+    @rtype: list of unicode.
+    """
+    listetenses=[];
+    if all :
+        if transitive :
+            listetenses= verb_const.TABLE_TENSE
+        else:
+            listetenses = verb_const.TableIndicativeTense;
+    else:
+        if past : listetenses.append(verb_const.TensePast);
+        if (past and passive and transitive) : listetenses.append(verb_const.TensePassivePast)
+        if future : listetenses.append(verb_const.TenseFuture);
+        if (future and passive and transitive) : listetenses.append(verb_const.TensePassiveFuture)
+        if (future_moode) :
+            listetenses.append(verb_const.TenseSubjunctiveFuture)
+            listetenses.append(verb_const.TenseJussiveFuture)
+        if (confirmed) :
+            if (future):listetenses.append(verb_const.TenseConfirmedFuture);
+            if (imperative):listetenses.append(verb_const.TenseConfirmedImperative);
+        if (future and passive and transitive and confirmed) :
+            listetenses.append(verb_const.TensePassiveConfirmedFuture);
+        if (passive and transitive and future_moode) :
+            listetenses.append(verb_const.TensePassiveSubjunctiveFuture)
+            listetenses.append(verb_const.TensePassiveJussiveFuture)
+        if imperative : listetenses.append(verb_const.TenseImperative)
+    return listetenses
+
+
 class QutrubApi:
     """
     a class as conjugator wraper
@@ -58,7 +96,8 @@ class QutrubApi:
             7: 'فعل سباعي', 
             8: 'فعل ثماني', 
             9: 'فعل تساعي'}
-        self.my_verb_class = None
+        self.verb_input = None
+        self.conj_display = None
         self.listetenses = verb_const.TABLE_TENSE
         self.verb_stamp_pat = VERB_STAMP_PAT
     
@@ -114,40 +153,23 @@ class QutrubApi:
         """
         manage tenses according to given parameters
         """
-        listetenses=[];
-        if all :
-            if transitive :
-                listetenses= verb_const.TABLE_TENSE
-            else:
-                listetenses = verb_const.TableIndicativeTense;
-        else:
-            if past : listetenses.append(verb_const.TensePast);
-            if (past and passive and transitive) : listetenses.append(verb_const.TensePassivePast)
-            if future : listetenses.append(verb_const.TenseFuture);
-            if (future and passive and transitive) : listetenses.append(verb_const.TensePassiveFuture)
-            if (future_moode) :
-                listetenses.append(verb_const.TenseSubjunctiveFuture)
-                listetenses.append(verb_const.TenseJussiveFuture)
-            if (confirmed) :
-                if (future):listetenses.append(verb_const.TenseConfirmedFuture);
-                if (imperative):listetenses.append(verb_const.TenseConfirmedImperative);
-            if (future and passive and transitive and confirmed) :
-                listetenses.append(verb_const.TensePassiveConfirmedFuture);
-            if (passive and transitive and future_moode) :
-                listetenses.append(verb_const.TensePassiveSubjunctiveFuture)
-                listetenses.append(verb_const.TensePassiveJussiveFuture)
-            if imperative : listetenses.append(verb_const.TenseImperative)
-        
+        listetenses = select_tenses(all, past, future, passive, imperative,
+            future_moode, confirmed, transitive)
         self.listetenses = listetenses ;
         
-        return   listetenses 
+        return   listetenses
+        
     def conjugate_all_tenses(self, tenses= [] ):
         """ conjugate verb in input wwith tenses"""
         if not tenses:
             tenses = self.listetenses
-        if not self.my_verb_class:
+        if not self.verb_input:
             return None
-        result = self.my_verb_class.conjugate_all_tenses(tenses)
+        (verb, future_type, transitive) = self.verb_input
+        # the conjugation table is taken from the result cache if possible
+        self.conj_display = mosaref.get_conjugation_display(verb, future_type,
+            transitive, tenses)
+        result = self.conj_display.display(self.conj_display.mode, tenses)
         
         return result;
               
@@ -160,13 +182,14 @@ class QutrubApi:
     def display(self):
         """
         """
-        if not self.my_verb_class:
+        if not self.conj_display:
             return None        
-        resulttext = self.my_verb_class.conj_display.display("TABLE",self.listetenses)
+        resulttext = self.conj_display.display("TABLE",self.listetenses)
         return resulttext
         
 
-    def get_verb_info(self, word, future_type="فتحة", transitive=True):
+    def get_verb_info(self, word, future_type="فتحة", transitive=True,
+            future_form=None):
         """
         This function extract verb feaures:
         * length: 3,4,5,6 
@@ -174,12 +197,16 @@ class QutrubApi:
         * safety: hamza, shadda
         * kind of weakness: waw, yeh
         * category of weakness
-        """
-        try:
-            future_form = mosaref.get_future_form(word, future_type)
-        except:
-            #print("qutrub_api: Error on future form ", word)
-            future_form = word
+        The future form is given by the conjugation if it's done,
+        else it's taken from the future form cache.
+        """
+        if not future_form:
+            try:
+                future_form = mosaref.get_future_form(word, future_type,
+                    self.db_path)
+            except:
+                #print("qutrub_api: Error on future form ", word)
+                future_form = word
         # strip haraka and keep shadda
         verb_nm = araby.strip_harakat(word)
         features = {"الفعل":word, "مضارعه": future_form}
@@ -249,7 +276,9 @@ class QutrubApi:
         prepare input
         """
         # ~ logging.debug("qutrub_api",future_type)
-        self.my_verb_class = verbclass.VerbClass(verb, transitive, future_type);
+        # the verb is conjugated later, in conjugate_all_tenses
+        self.verb_input = (verb, future_type, transitive)
+        self.conj_display = None
         # init tenses list
         self.listetenses = verb_const.TABLE_TENSE
         
@@ -291,38 +320,76 @@ passive = False, imperative = False, future_moode = False, confirmed = False,
         """
         return suggest_verb(word)
                 
-    def suggest_similar_verb_list(self, word, given_future_type):
+    def suggest_similar_verb_list(self, word, given_future_type,
+            tri_rows=None):
         """
         Suggest a list of verbs if error or multiple entries
+        The misspelled verbs and the verbs which are not in the dictionary
+        are searched in the lexicon by the verb search index, the rules of
+        suggest_verb are used if the index is not available.
+        The future forms are taken from the future form cache.
+        The dictionary rows of the word, if they are already read by
+        fetch_triliteral_rows, are given by tri_rows, to not read them again.
         """
-
-        suggestions = []
-  
         valid = is_valid_infinitive_verb(word)
+        suggestions = []
         if valid:
-            suggestions = self.find_tri_verb(word, given_future_type)
-            suggestions.extend(self.find_nontri_verb(word))            
-        else:
-            sug_verb_list  =  list(set(suggest_verb(word)))
-            suggestions = []
-            logging.debug(repr(sug_verb_list))
-            for sug in sug_verb_list:
-                suggestions.extend(self.find_tri_verb(sug, given_future_type))
-                suggestions.extend(self.find_nontri_verb(sug))
-        # make suggestion unique
-        list_of_data_uniq = []
-        for data in suggestions:
-            if data not in list_of_data_uniq:
-                list_of_data_uniq.append(data)
-        suggestions =  list_of_data_uniq
+            suggestions = self.lookup_suggestions([word], given_future_type,
+                tri_rows=tri_rows)
+        if not suggestions:
+            candidates = [verb for (verb, cost, freq) in verb_search.search(
+                word, db_file=os.path.join(self.db_path, "data/verbdict.db"))]
+            logging.debug(repr(candidates))
+            if candidates:
+                suggestions = self.lookup_suggestions(candidates,
+                    given_future_type, lexicon_forms=True)
+            elif not valid:
+                # unique suggestions, in the order of suggest_verb
+                suggestions = self.lookup_suggestions(
+                    list(dict.fromkeys(suggest_verb(word))), given_future_type)
         # add future form
         for sug in suggestions:
-            sug["future"] = mosaref.get_future_form(sug.get("verb", ""), sug.get("haraka", ""))
-        if suggestions:
-            # ~ print("suggest_verb_list",suggestions)
-            return suggestions;
-        else:
-            return []   
+            sug["future"] = mosaref.get_future_form(sug.get("verb", ""),
+                sug.get("haraka", ""), self.db_path)
+        return suggestions
+
+    def lookup_suggestions(self, candidates, given_future_type,
+            lexicon_forms=False, tri_rows=None):
+        """
+        Find the dictionary verbs of the suggested candidates,
+        the candidates are looked up in one query by table.
+        @param candidates: the suggested verbs, in order.
+        @type candidates: list of unicode.
+        @param given_future_type: given haraka of future type.
+        @type given_future_type: unicode.
+        @param lexicon_forms: the candidates are unvocalized lexicon forms,
+        only the verbs of these forms are given, not the verbs of the same
+        stamp.
+        @type lexicon_forms: Boolean.
+        @param tri_rows: the rows of triliteral candidates, already read by
+        fetch_triliteral_rows.
+        @type tri_rows: dict of list.
+        @return: unique verbs, as lookup_nontri_verb.
+        @rtype: list of dict.
+        """
+        tri_verbs = libqutrub.verb_db.find_triliteral_verbs(self.db_path,
+            candidates, given_future_type, rows=tri_rows) or {}
+        nontri_verbs = self.lookup_nontri_verbs(candidates) or {}
+        # make suggestion unique
+        suggestions = []
+        seen = set()
+        for candidate in candidates:
+            for data in tri_verbs.get(candidate, []) \
+                    + nontri_verbs.get(candidate, []):
+                if lexicon_forms \
+                   and araby.strip_harakat(data["verb"]) != candidate:
+                    continue
+                key = (data["verb"], data["haraka"], data["transitive"])
+                if key not in seen:
+                    seen.add(key)
+                    suggestions.append(data)
+        return suggestions
+
     def verb_stamp(self, word):
         """
         generate a stamp for a verb,
@@ -362,25 +429,72 @@ passive = False, imperative = False, future_moode = False, confirmed = False,
         # ~ liste = [{"verb":"استعجل", 
                     # ~ "haraka":"فتحة", "transitive":True}]
         # ~ return liste
-        liste = []
+        results = self.lookup_nontri_verbs([verb])
+        if results is None:
+            return None
+        return results[verb]
+
+    def lookup_nontri_verbs(self, verbs):
+        """
+        Find many non triliteral verbs in the dictionary, with one query
+        by QUERY_BATCH_SIZE verbs,
+        return a list of possible verb forms for every verb,
+        the precomputed future forms of the found verbs are kept in the
+        future form cache.
+        @param verbs: given verbs.
+        @type verbs: list of unicode.
+        @return: {verb:list of verbs}, like lookup_nontri_verb.
+        @rtype: dict of list.
+        """
         db_path = os.path.join(self.db_path, "data/verbdict.db")
         logging.debug("QAPI;%s", db_path)
+        # the verbs are found in the stamp index if it's enabled
+        stamp_index = libqutrub.verb_db.get_stamp_index(db_path)
+        if stamp_index is not None:
+            results = {}
+            for verb in verbs:
+                liste = []
+                for (verb_vocalised, transitive, future_form) in \
+                        stamp_index.lookup(self.verb_stamp(verb),
+                            araby.strip_harakat(verb)):
+                    libqutrub.verb_db.keep_future_form(verb_vocalised,
+                        araby.FATHA, future_form)
+                    liste.append({"verb":verb_vocalised, "haraka":"فتحة",
+                        "transitive":transitive})
+                results[verb] = liste
+            return results
         try:
             logging.debug("verb_db2:"+ db_path)        
-            conn  =  sqlite.connect(db_path)
-            cursor  =  conn.cursor()
+            stamps = dict((verb, self.verb_stamp(verb)) for verb in verbs)
+            unique_stamps = list(dict.fromkeys(stamps.values()))
+            # the rows of every stamp, in the table order
+            rows_by_stamp = {}
+            # the future form is read with the verb if it's precomputed
+            future_form = libqutrub.verb_db.FUTURE_FORM_COLUMN \
+                if libqutrub.verb_db.has_future_forms(db_path) else "null"
+            # the dictionary is opened once and shared by all lookups
+            with db_pool.connection(db_path) as conn:
+                for start in range(0, len(unique_stamps),
+                        libqutrub.verb_db.QUERY_BATCH_SIZE):
+                    batch = unique_stamps[start:start
+                        + libqutrub.verb_db.QUERY_BATCH_SIZE]
+                    rows = conn.execute("""select stamp, verb, unmarked,
+                            transitive, %s
+                            from verbmore
+                            where stamp in (%s)""" % (future_form,
+                        ", ".join("?" * len(batch))), batch).fetchall()
+                    for row in rows:
+                        rows_by_stamp.setdefault(row[0], []).append(row[1:])
+                        libqutrub.verb_db.keep_future_form(row[1], araby.FATHA,
+                            row[4])
+        except IOError:
+            return None
+        results = {}
+        for verb in verbs:
+            liste = []
             # strip harakat and keep shadda
             verb_nm = araby.strip_harakat(verb)
-            verb_stamp = self.verb_stamp(verb)
-            # ~ tup = (verb_nm, )
-            # ~ cursor.execute("""select verb, transitive 
-                        # ~ from verbmore
-                        # ~ where unvocalized = ?""", tup)
-            tup = (verb_stamp, )
-            cursor.execute("""select verb, unmarked, transitive 
-                        from verbmore
-                        where stamp = ?""", tup)
-            for row in cursor:
+            for row in rows_by_stamp.get(stamps[verb], []):
                 verb_vocalised = row[0]
                 # strip harakat and keep shadda
                 verb_unmarked = row[1] 
@@ -404,10 +518,8 @@ passive = False, imperative = False, future_moode = False, confirmed = False,
                 else:
                     liste.append({"verb":verb_vocalised, 
                     "haraka":haraka, "transitive":transitive})
-            cursor.close()
-            return liste
-        except IOError:
-            return None
+            results[verb] = liste
+        return results
     def verb_exists_in_database(self, verb, given_future_type="فتحة"):
         """
         Test if a given verb exists on database,
@@ -0,0 +1,155 @@
+#!/usr/bin/python
+# -*- coding=utf-8 -*-
+#************************************************************************
+# Response cache
+#
+# Description:
+# Cache of the serialized responses of the web interface
+#
+# Copyright (c) 2026, Qutrub-ng Project
+#
+#***********************************************************************/
+"""
+Cache of the serialized responses of the web interface.
+The responses of /api and /ajaxGet depend only on the request parameters
+and on the dictionary, the JSON body of a response is kept by its
+canonical request key, with a strong ETag computed from its content.
+The cache is dropped when the dictionary file is changed, or by
+invalidate().
+
+    key = response_cache.request_key("api", "Conjugate", verb, options)
+    entry = response_cache.get(key)
+    if entry is None:
+        entry = response_cache.store(key, body)
+    (body, etag) = entry
+"""
+import os
+import json
+import hashlib
+import threading
+
+import config.qutrub_config
+import libqutrub.verb_cache as verb_cache
+import libqutrub.verb_db as verb_db
+import libqutrub.verb_search as verb_search
+import libqutrub.db_pool as db_pool
+
+# the cached responses: request key -> (body, etag)
+RESPONSE_CACHE = verb_cache.LRUCache(config.qutrub_config.RESPONSE_CACHE_SIZE)
+
+# the dictionary file and its signature when the responses are cached
+_database = {"path":None, "signature":None}
+_lock = threading.Lock()
+
+
+def request_key(url, action, text, options):
+    """
+    Build the canonical key of a request, the options are sorted.
+    @param url: the interface name (api, ajax).
+    @type url: string.
+    @param action: the requested action.
+    @type action: unicode.
+    @param text: the given text.
+    @type text: unicode.
+    @param options: the request options, given to adaat.DoAction.
+    @type options: dict.
+    @return: the request key.
+    @rtype: unicode.
+    """
+    return json.dumps([url, action, text, options], sort_keys=True,
+        ensure_ascii=False, separators=(",", ":"))
+
+
+def content_etag(body):
+    """
+    Get the strong ETag of a response body, a hash of its content.
+    @param body: the response body.
+    @type body: bytes.
+    @return: the ETag, without quotes.
+    @rtype: string.
+    """
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def get(key):
+    """
+    Get a cached response, the cache is dropped first if the dictionary
+    is changed.
+    @param key: the request key, given by request_key.
+    @type key: unicode.
+    @return: (body, etag), None if the response is not cached.
+    @rtype: tuple.
+    """
+    check_database()
+    return RESPONSE_CACHE.get(key)
+
+
+def store(key, body):
+    """
+    Keep a response in the cache.
+    @param key: the request key, given by request_key.
+    @type key: unicode.
+    @param body: the serialized response.
+    @type body: bytes.
+    @return: (body, etag)
+    @rtype: tuple.
+    """
+    entry = (body, content_etag(body))
+    RESPONSE_CACHE.set(key, entry)
+    return entry
+
+
+def invalidate(dictionary = False):
+    """
+    Drop the cached responses, it's the hook called when the dictionary
+    is changed.
+    @param dictionary: drop also the dictionary connections and the
+    data read from the dictionary (verb search and stamp indexes, future
+    forms and future form columns).
+    @type dictionary: Boolean.
+    """
+    with _lock:
+        RESPONSE_CACHE.clear()
+        if dictionary:
+            if _database["path"]:
+                db_pool.reset(_database["path"])
+            verb_search.reset()
+            verb_db.reset_stamp_index()
+            verb_db.reset_future_forms()
+            verb_cache.FUTURE_CACHE.clear()
+
+
+def database_signature(db_file):
+    """
+    Get the signature of the dictionary file, changed when it's written.
+    @return: (modification time, size), None if the file is missing.
+    @rtype: tuple
+    """
+    try:
+        stat = os.stat(db_file)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def check_database(db_base_path = None):
+    """
+    Drop the cached responses if the dictionary file is changed
+    since they are cached.
+    @param db_base_path: the database path, default config DB_BASE_PATH.
+    @type db_base_path: path string.
+    @return: True if the cache is dropped.
+    @rtype: Boolean
+    """
+    if db_base_path is None:
+        db_base_path = config.qutrub_config.DB_BASE_PATH
+    db_file = os.path.abspath(os.path.join(db_base_path, "data/verbdict.db"))
+    signature = database_signature(db_file)
+    if (db_file, signature) == (_database["path"], _database["signature"]):
+        return False
+    changed = _database["path"] == db_file
+    invalidate(dictionary = changed)
+    with _lock:
+        _database["path"] = db_file
+        _database["signature"] = signature
+    return changed
@@ -0,0 +1,156 @@
+#!/usr/bin/python
+# -*- coding=utf-8 -*-
+#************************************************************************
+# Worker pool
+#
+# Description:
+# Bounded pool of conjugation workers for the asyncio server
+#
+# Copyright (c) 2026, Qutrub-ng Project
+#
+#***********************************************************************/
+"""
+A bounded pool of conjugation workers, used by the asyncio server.
+The conjugation is CPU bound, it's run in a thread or process pool of
+few workers, while the event loop serves many connections.
+The number of pending jobs is limited, a job is refused when the pool
+is full, and a request waits for its job at most a timeout.
+A timed out job is cancelled if it's waiting, a running one keeps its
+worker until it's done and is counted as pending until then, so the
+pool never runs more jobs than workers.
+
+    pool = worker_pool.WorkerPool(workers=2, max_pending=64, timeout=10)
+    result = await pool.run(adaat.DoAction, text, "Conjugate", options)
+"""
+import os
+import asyncio
+import logging
+import threading
+import concurrent.futures
+
+
+class PoolFullError(Exception):
+    """
+    The pool has too many pending jobs.
+    """
+
+
+class WorkerPool:
+    """
+    A bounded pool of workers, the jobs are run from the event loop.
+    """
+    def __init__(self, workers = None, max_pending = 64, timeout = None,
+            processes = False, initializer = None):
+        """
+        init method
+        @param workers: the number of workers, default the number of CPUs.
+        @type workers: integer.
+        @param max_pending: the maximum number of running and waiting jobs.
+        @type max_pending: integer.
+        @param timeout: the maximum waiting time of a job in seconds,
+        None for no limit.
+        @type timeout: float.
+        @param processes: use worker processes instead of threads.
+        @type processes: Boolean.
+        @param initializer: function called by every worker process at
+        start, to load the conjugator data.
+        @type initializer: function.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.processes = processes
+        self.pending = 0
+        self.refused = 0
+        self.timeouts = 0
+        self._lock = threading.Lock()
+        if processes:
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                self.workers, initializer=initializer)
+        else:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                self.workers, thread_name_prefix="qutrub-worker")
+
+    def submit(self, func, *args):
+        """
+        Submit a job to the pool, it's refused if the pool is full.
+        @param func: the job function, it must be picklable for processes.
+        @type func: function.
+        @return: the future of the job result.
+        @rtype: concurrent.futures.Future
+        """
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.refused += 1
+                raise PoolFullError("%d pending jobs" % self.pending)
+            self.pending += 1
+        try:
+            future = self._executor.submit(func, *args)
+        except Exception:
+            self._done(None)
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future):
+        """
+        Count a finished job, called by the future.
+        """
+        with self._lock:
+            self.pending -= 1
+
+    async def run(self, func, *args, timeout = None):
+        """
+        Run a job in the pool and wait for its result.
+        @param func: the job function.
+        @type func: function.
+        @param timeout: the maximum waiting time in seconds, default the
+        pool timeout.
+        @type timeout: float.
+        @return: the job result.
+        @raise PoolFullError: the pool has too many pending jobs.
+        @raise asyncio.TimeoutError: the job is not done in time.
+        """
+        future = asyncio.wrap_future(self.submit(func, *args))
+        if timeout is None:
+            timeout = self.timeout
+        try:
+            # a waiting job is cancelled, a running job can't be stopped
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            logging.warning("worker pool: job %s timed out after %s s",
+                getattr(func, "__name__", func), timeout)
+            raise
+
+    def free(self):
+        """
+        Get the number of jobs which can be submitted before the pool
+        is full.
+        @rtype: integer
+        """
+        with self._lock:
+            return max(0, self.max_pending - self.pending)
+
+    def stats(self):
+        """
+        Get the pool counters.
+        @return: workers, pending, max_pending, refused and timeouts.
+        @rtype: dict.
+        """
+        with self._lock:
+            return {"workers":self.workers,
+                "pending":self.pending,
+                "max_pending":self.max_pending,
+                "refused":self.refused,
+                "timeouts":self.timeouts,
+                }
+
+    def shutdown(self, wait = True):
+        """
+        Stop the workers.
+        @param wait: wait for the pending jobs.
+        @type wait: Boolean.
+        """
+        self._executor.shutdown(wait)
@@ -8,7 +8,7 @@ from glob import glob
 import logging
 import logging.config
 from datetime import datetime, timedelta
-from flask import Flask, render_template, make_response, send_from_directory, request, jsonify, redirect
+from flask import Flask, render_template, make_response, send_from_directory, request, jsonify, redirect, Response, stream_with_context
 # ~ from flask_sitemap import Sitemap
 from flask_minify import minify
 
@@ -18,11 +18,20 @@ sys.path.append(os.path.join(os.path.dirname(__file__), "../../"))
 from config.qutrub_config import LOGGING_CFG_FILE
 from config.qutrub_config import LOGGING_FILE
 from config.qutrub_config import MODE_DEBUG
+from config.qutrub_config import RESPONSE_MAX_AGE
+from config.qutrub_config import BATCH_MAX_SIZE
 # ~ HOMEDOMAIN = "http://qutrub.arabeyes.org"
 import qws_const
+import qws_request
 import core.adaat
+import core.response_cache
+import libqutrub.mosaref_main
 
 app = Flask(__name__)
+# load the conjugator data before the first request
+libqutrub.mosaref_main.warmup()
+# conjugate the most frequent verbs in background
+core.adaat.start_warmup()
 app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0
 
 # set output logging in utf
@@ -52,17 +61,8 @@ def prepare_result(resulttext, text, action, options, url="ajax"):
     extract results from conjugator
     """
     
-    if type(resulttext) == dict:
-        suggestions = resulttext.get("suggest",[])
-        results = {"result": resulttext.get("table",{}),
-                "verb_info":resulttext.get("verb_info",""),
-                 "suggest":suggestions}        
-    else:
-        app.logger.debug('No suggestion ', resulttext)
-        suggestions = []
-        results = {"result": {},
-                "verb_info":"",
-                 "suggest": []}  
+    results = qws_request.format_result(resulttext)
+    suggestions = results["suggest"]
     if not results.get("result",[]):
         invalid_verb = "invalid"
     else:
@@ -73,6 +73,37 @@ def prepare_result(resulttext, text, action, options, url="ajax"):
                      
     app.logger.debug('%s:%s'%("Suggest", repr(suggestions)))
     return results
+
+def cached_entry(text, action, options, url="ajax"):
+    """
+    Get the JSON body of a request and its ETag from the response cache,
+    the result is computed and cached if it's missing.
+    """
+    key = core.response_cache.request_key(url, action, text, options)
+    entry = core.response_cache.get(key)
+    if entry is None:
+        resulttext = core.adaat.DoAction(text, action, options)
+        results = prepare_result(resulttext, text, action, options, url)
+        entry = core.response_cache.store(key,
+            qws_request.dump_json(results))
+    else:
+        app.logger.info('%s:%s:%s:cached', url, action, text)
+    return entry
+
+def cached_response(text, action, options, url="ajax"):
+    """
+    Get the JSON response of a request from the response cache.
+    The response has a strong ETag, a request with a matching
+    If-None-Match gets a 304 response.
+    """
+    (body, etag) = cached_entry(text, action, options, url)
+    response = make_response(body)
+    response.mimetype = "application/json"
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = RESPONSE_MAX_AGE
+    return response.make_conditional(request)
+
 @app.route("/doc/")
 def doc():
     return render_template("doc.html",current_page='doc')
@@ -129,10 +160,6 @@ def verb(verb_value, haraka="فتحة", trans=False):
 @app.route("/ajaxGet", methods=["POST", "GET"])
 def ajax():
     default = core.adaat.random_text()
-    resulttext = u"السلام عليكم"
-    text = default
-    action = ""
-    options = {}
     if request.method == "GET":
         args = request.args
     elif request.method == "POST":
@@ -140,116 +167,66 @@ def ajax():
     else:
         return jsonify({"text": default})
     # Request a random text
-    if args.get("response_type", "") == "get_random_text":
+    if qws_request.is_random_text_request(args):
         return jsonify({"text": default})
 
-    text = args.get("text", "")
-    action = args.get("action", "")
-    options["all"] = args.get("all", False)
-    options["transitive"] = args.get("transitive", False)
-
-    options["past"] = args.get("past", False)
-    options["future"] = args.get("future", False)
-    options["imperative"] = args.get("imperative", False)
-    options["future_moode"] = args.get("future_moode", False)
-    options["confirmed"] = args.get("confirmed", False)
-
-    options["passive"] = args.get("passive", False)
-    options["past"] = args.get("past", False)
-    options["future_type"] = args.get("future_type", u"فتحة")
-
-    options["display_format"] = args.get("display_format", "HTML")
-
-    resulttext = core.adaat.DoAction(text, action, options)
-    results = prepare_result(resulttext, text, action, options,"ajax")
-    
-    # ~ invalid_verb = ""
-    # ~ if type(resulttext) == dict:
-        # ~ suggestions = resulttext.get("suggest",[])
-        # ~ results = {"result": resulttext.get("table",{}),
-                # ~ "verb_info":resulttext.get("verb_info",""),
-                 # ~ "suggest":suggestions}        
-    # ~ else:
-        # ~ app.logger.debug('No suggestion ', resulttext)
-        # ~ suggestions = []
-        # ~ results = {"result": {},
-                # ~ "verb_info":"",
-                 # ~ "suggest": []}  
-    # ~ if not results.get("result",[]):
-        # ~ invalid_verb = "invalid"
-    #suggestions = core.adaat.DoAction(text, "Suggest", options)
-    # ~ app.logger.info('%s:%s:%s', action, text, invalid_verb)
-    # ~ logging.info('%s:%s:%s', action, text, invalid_verb)
-    # ~ app.logger.debug('%s:%s',"Suggest", repr(suggestions))
-    return jsonify(results)
+    (text, action, options) = qws_request.ajax_options(args)
+    return cached_response(text, action, options, "ajax")
     
     
-@app.route("/api/<verb>/<haraka>", methods=["GET"])
-@app.route("/api/<verb>", methods=["GET"])
+@app.route("/api/<text>/<haraka>", methods=["GET"])
+@app.route("/api/<text>", methods=["GET"])
 @app.route("/api", methods=["GET"])
 def api(text="", haraka=""):
-    default = "استعمل"
+    default = qws_request.API_DEFAULT_VERB
     # ~ text = verb
     action = "Conjugate"
-    options = {}
     if request.method == "GET":
         args = request.args
     else:
         return jsonify({"text": default})
     # Request a random text
-    if args.get("response_type", "") == "get_random_text":
+    if qws_request.is_random_text_request(args):
         return jsonify({"text": default})
 
-    if not text : 
-        text = args.get("verb", "")
-        if not text:
-            text = default
-    if not haraka:
-        haraka = args.get("haraka", u"فتحة")
-        if haraka.lower() == "a":
-            haraka = "فتحة"
-        elif haraka.lower() == "u":
-            haraka = "ضمة"
-        elif haraka.lower() == "i":
-            haraka = "كسرة"
-        options["future_type"] = haraka
-    
-    trans = args.get("trans", True)
-    if trans == "0":
-        options["transitive"] = False
-    else:
-        options["transitive"] = True
-    options["all"] = True    
-
-    resulttext = core.adaat.DoAction(text, action, options)
-    results = prepare_result(resulttext, text, action, options, url="api")
-    # ~ if type(resulttext) == dict:
-        # ~ suggestions = resulttext.get("suggest",[])
-        # ~ results = {"result": resulttext.get("table",{}),
-                # ~ "verb_info":resulttext.get("verb_info",""),
-                 # ~ "suggest":suggestions}        
-    # ~ else:
-        # ~ app.logger.debug('No suggestion ', resulttext)
-        # ~ suggestions = []
-        # ~ results = {"result": {},
-                # ~ "verb_info":"",
-                 # ~ "suggest": []}  
-    # ~ if not results.get("result",[]):
-        # ~ invalid_verb = "invalid"
-    # ~ else:
-        # ~ invalid_verb = ""        
-    ##suggestions = core.adaat.DoAction(text, "Suggest", options)
-    # ~ app.logger.info('%s:%s:%s', action, text, invalid_verb)
-    # ~ logging.info('%s:%s:%s', action, text, invalid_verb)
-                     
-    # ~ app.logger.debug('%s:%s'%("Suggest", repr(suggestions)))
-    response = jsonify(results)
+    (text, options) = qws_request.api_options(args, text, haraka)
+
+    response = cached_response(text, action, options, url="api")
     response.headers["Content-Type"] = "application/json; charset=utf-8"
     response.headers["Access-Control-Allow-Origin"] = "*"
     return response
     
 
 
+@app.route("/api/batch", methods=["POST"])
+def api_batch():
+    """
+    Conjugate a list of verbs, given as /api arguments, the results are
+    streamed as newline delimited JSON, a line by verb, in order.
+    """
+    items = qws_request.batch_items(request.get_json(silent=True))
+    if items is None:
+        return jsonify({"error": "a list of verbs is expected"}), 400
+    if len(items) > BATCH_MAX_SIZE:
+        return jsonify({"error": "too many verbs, the maximum is %d"
+            % BATCH_MAX_SIZE}), 413
+    def generate():
+        for (index, (text, options, error)) in enumerate(items):
+            body = None
+            if error is None:
+                try:
+                    (body, etag) = cached_entry(text, "Conjugate", options,
+                        url="api")
+                except Exception:
+                    app.logger.exception('batch: %s', text)
+                    error = "conjugation error"
+            yield qws_request.batch_line(index, text, body, error)
+    response = Response(stream_with_context(generate()),
+        mimetype="application/x-ndjson")
+    response.headers["Access-Control-Allow-Origin"] = "*"
+    return response
+
+
 @app.route("/result", methods=["POST", "GET"])
 def result():
     if request.method == "POST":
@@ -0,0 +1,227 @@
+#! /usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+The parameters and results of the web interface requests, without web
+framework, shared by the flask application (qutrub_webserver.py) and
+the asyncio application (asgi.py).
+"""
+import json
+
+import libqutrub.verb_const as vconst
+
+# the verb conjugated by /api if no verb is given
+API_DEFAULT_VERB = "استعمل"
+# the future marks given by their latin vowel to /api
+API_HARAKAT = {"a":"فتحة", "u":"ضمة", "i":"كسرة"}
+# the sections of a conjugation response, selected by fields=
+FIELDS = ("table", "verb_info", "suggest")
+# the tenses selected by tenses=, by their name or a latin alias
+TENSE_ALIASES = {"past":vconst.TensePast,
+    "future":vconst.TenseFuture,
+    "jussive":vconst.TenseJussiveFuture,
+    "subjunctive":vconst.TenseSubjunctiveFuture,
+    "confirmed_future":vconst.TenseConfirmedFuture,
+    "imperative":vconst.TenseImperative,
+    "confirmed_imperative":vconst.TenseConfirmedImperative,
+    "passive_past":vconst.TensePassivePast,
+    "passive_future":vconst.TensePassiveFuture,
+    "passive_jussive":vconst.TensePassiveJussiveFuture,
+    "passive_subjunctive":vconst.TensePassiveSubjunctiveFuture,
+    "passive_confirmed_future":vconst.TensePassiveConfirmedFuture,
+    }
+# the tenses by their name without spaces around
+TENSE_NAMES = dict((tense.strip(), tense) for tense in vconst.TABLE_TENSE)
+
+
+def is_random_text_request(args):
+    """
+    The request asks for a random text.
+    @param args: the request arguments.
+    @type args: dict.
+    @rtype: Boolean
+    """
+    return args.get("response_type", "") == "get_random_text"
+
+
+def split_values(value):
+    """
+    Get the values of a list argument, given as a list or as a comma
+    separated string.
+    @rtype: list of unicode.
+    """
+    if isinstance(value, str):
+        value = value.split(",")
+    if not isinstance(value, list):
+        return []
+    return [item.strip() for item in value if isinstance(item, str)]
+
+
+def add_filters(args, options):
+    """
+    Add the section and cell filters of a request to its options:
+        - fields: the computed sections (table, verb_info, suggest),
+        result is the table;
+        - tenses: the tenses of the table, by name or latin alias;
+        - pronouns: the pronouns of the table.
+    The unknown values are ignored, the options are not added if they
+    are not given, or if no value is known.
+    @param args: the request arguments.
+    @type args: dict.
+    @param options: the request options.
+    @type options: dict.
+    """
+    fields = [field.replace("result", "table")
+        for field in split_values(args.get("fields"))]
+    fields = [field for field in FIELDS if field in fields]
+    if fields:
+        options["fields"] = fields
+    tenses = []
+    for tense in split_values(args.get("tenses")):
+        tense = TENSE_ALIASES.get(tense.lower(), TENSE_NAMES.get(tense))
+        if tense and tense not in tenses:
+            tenses.append(tense)
+    if tenses:
+        options["tenses"] = tenses
+    pronouns = []
+    for pronoun in split_values(args.get("pronouns")):
+        if pronoun in vconst.PronounsTable and pronoun not in pronouns:
+            pronouns.append(pronoun)
+    if pronouns:
+        options["pronouns"] = pronouns
+
+
+def api_options(args, text="", haraka=""):
+    """
+    Get the verb and the options of an /api request.
+    @param args: the query arguments.
+    @type args: dict.
+    @param text: the verb given in the path.
+    @type text: unicode.
+    @param haraka: the future mark given in the path.
+    @type haraka: unicode.
+    @return: (verb, options)
+    @rtype: tuple
+    """
+    options = {}
+    if not text:
+        text = args.get("verb", "")
+        if not text:
+            text = API_DEFAULT_VERB
+    if not haraka:
+        haraka = args.get("haraka", u"فتحة")
+        haraka = API_HARAKAT.get(haraka.lower(), haraka)
+        options["future_type"] = haraka
+    trans = args.get("trans", True)
+    if trans == "0":
+        options["transitive"] = False
+    else:
+        options["transitive"] = True
+    options["all"] = True
+    add_filters(args, options)
+    return (text, options)
+
+
+def ajax_options(args):
+    """
+    Get the text, the action and the options of an /ajaxGet request.
+    @param args: the query arguments, or the data of a posted request.
+    @type args: dict.
+    @return: (text, action, options)
+    @rtype: tuple
+    """
+    options = {}
+    text = args.get("text", "")
+    action = args.get("action", "")
+    for name in ("all", "transitive", "past", "future", "imperative",
+            "future_moode", "confirmed", "passive"):
+        options[name] = args.get(name, False)
+    options["future_type"] = args.get("future_type", u"فتحة")
+    options["display_format"] = args.get("display_format", "HTML")
+    add_filters(args, options)
+    return (text, action, options)
+
+
+def format_result(resulttext):
+    """
+    Get the response of a conjugation result.
+    @param resulttext: the result given by adaat.DoAction.
+    @type resulttext: dict.
+    @return: the response {"result", "verb_info", "suggest"}
+    @rtype: dict
+    """
+    if type(resulttext) == dict:
+        return {"result": resulttext.get("table",{}),
+                "verb_info":resulttext.get("verb_info",""),
+                 "suggest":resulttext.get("suggest",[])}
+    return {"result": {},
+            "verb_info":"",
+            "suggest": []}
+
+
+def dump_json(results):
+    """
+    Serialize a response as flask jsonify does in production mode,
+    the flask and the ASGI servers give the same body and ETag, whatever
+    the flask debug mode.
+    @param results: the response.
+    @type results: dict.
+    @rtype: bytes
+    """
+    return (json.dumps(results, ensure_ascii=True, sort_keys=True,
+        separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def batch_items(data):
+    """
+    Get the verbs of a batch request, every verb is given as a string, or
+    as a dict of /api arguments: {"verb", "haraka", "trans", "fields",
+    "tenses", "pronouns"}.
+    @param data: the posted request, a list of verbs or {"verbs":list}.
+    @type data: list or dict.
+    @return: (verb, options, error) for every verb, the error is None if
+    the verb is valid, None if the request is not a list of verbs.
+    @rtype: list of tuple.
+    """
+    if isinstance(data, dict):
+        data = data.get("verbs")
+    if not isinstance(data, list):
+        return None
+    items = []
+    for item in data:
+        if isinstance(item, str):
+            item = {"verb":item}
+        if not isinstance(item, dict) or not item.get("verb") \
+                or not isinstance(item["verb"], str):
+            items.append((None, None, "a verb is expected"))
+            continue
+        args = {"verb":item["verb"]}
+        if isinstance(item.get("haraka"), str):
+            args["haraka"] = item["haraka"]
+        for name in ("fields", "tenses", "pronouns"):
+            if name in item:
+                args[name] = item[name]
+        if item.get("trans") in ("0", 0, False):
+            args["trans"] = "0"
+        (text, options) = api_options(args)
+        items.append((text, options, None))
+    return items
+
+
+def batch_line(index, verb, body = None, error = None):
+    """
+    Get the line of a verb in a batch response (newline delimited JSON):
+    {"index", "verb", "response"} or {"index", "verb", "error"}.
+    @param index: the verb position in the request.
+    @type index: integer.
+    @param verb: the given verb.
+    @type verb: unicode.
+    @param body: the /api response of the verb, as given by dump_json.
+    @type body: bytes.
+    @param error: the error message if the verb is not conjugated.
+    @type error: string.
+    @rtype: bytes
+    """
+    if error is not None:
+        return dump_json({"index":index, "verb":verb, "error":error})
+    return b'{"index":%d,"response":%s,"verb":%s}\n' % (index,
+        body.rstrip(b"\n"), json.dumps(verb).encode("utf-8"))
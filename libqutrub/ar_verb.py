@@ -646,13 +646,39 @@ def standard_harakat(word):
     return new_word
 
 
+#####################################
+#{ orthographic treatment tables
+#####################################
+# the harakat of alef variants are treated as alef haraka by tahmeez
+TAHMEEZ_HARAKAT_TRANSLATION = {ord(vconst.ALEF_YEH_HARAKA):vconst.ALEF_HARAKA,
+    ord(vconst.ALEF_WAW_HARAKA):vconst.ALEF_HARAKA}
+# the harakat which can be followed by a geminated letter
+GEMINATING_HARAKAT = (SUKUN, FATHA, KASRA, DAMMA)
+# the long harakat
+LONG_HARAKAT = (vconst.ALEF_HARAKA, vconst.WAW_HARAKA, vconst.YEH_HARAKA)
+# the weak letters treated by homogenize
+HOMOGENIZED_LETTERS = (ALEF_MAKSURA, vconst.ALEF_MAMDUDA, YEH, WAW)
+WEAK_LETTERS_PATTERN = re.compile(u'[%s%s%s%s]' % HOMOGENIZED_LETTERS)
+# the replacements are done only if one of their patterns is found
+STANDARD_REPLACEMENT_PATTERN = re.compile(u"|".join([re.escape(pat)
+    for (pat, rep) in vconst.STANDARD_REPLACEMENT]))
+
+# transition tables, filled on demand from the treatment rules,
+# the keys are the context of a letter, the values are the action.
+# The number of contexts is bounded by the harakat and letters,
+# they are computed once for all verbs.
+TAHMEEZ_TRANSITIONS = {}
+HOMOGENIZE_MIDDLE_TRANSITIONS = {}
+HOMOGENIZE_LAST_TRANSITIONS = {}
+
+
 def geminating(word_nm, harakat):
     """ treat geminating cases
     المدخلات هي من كلمة غير مشكولة يقابلها حركاتها
     والحرف المضعف يمثل بشدة
     وإذا كانت الحالة تستوجب الفك، استبدلت الشدة بالحرف المضعف،
-    أمّا إذا كانت لا تستوجب الفك، 
-فتُعدّل حركة الحرف المضعف الأول إلى حركة ملغاة، 
+    أمّا إذا كانت لا تستوجب الفك،
+فتُعدّل حركة الحرف المضعف الأول إلى حركة ملغاة،
 تحذف في دالة الرسم الإملائي فيما بعد
     @param word_nm: given unvocalized word.
     @type word_nm: unicode.
@@ -661,85 +687,68 @@ def geminating(word_nm, harakat):
     @return: (letters, harakat).
     @rtype: tuple of unicode.
     """
-    new_word = u""
-    new_harakat = u""
-    i = 0
-    length = len(word_nm)
-    ##    has_shadda = False
-    ##    has_shadda = False
-    if word_nm.find(SHADDA) < 0:
+    if SHADDA not in word_nm:
         return (word_nm, harakat)
-    ##has_shadda and
+    letters = list(word_nm)
+    new_word = []
+    new_harakat = []
+    i = 0
+    length = len(letters)
     while i < length:
     # نعالج الحالات التي فيها الحرف الحالي متبوع بحرف شدة،
     # ندرس الحالات التي يجب فيها فك الإدغام
-        if (i > 0 and i+1 < length and word_nm[i+1] == SHADDA and \
-        harakat[i] in (SUKUN, FATHA, KASRA, DAMMA)) and harakat[i-1]:
+        if (i > 0 and i+1 < length and letters[i+1] == SHADDA and \
+        harakat[i] in GEMINATING_HARAKAT) and harakat[i-1]:
             # treat ungeminating case
 
 #إذا كان الحرف المضعف الأول غير ساكن والحرف المضعّف الثاني (ممثلا بشدة)ساكنا،
-# يفك الإدغام.أمّا إذا كانت لا تستوجب الفك، 
+# يفك الإدغام.أمّا إذا كانت لا تستوجب الفك،
 
-            if  harakat[i] != SUKUN and harakat[i+1] == SUKUN:
+            if harakat[i+1] == SUKUN:
                 #ungeminating
-                new_word += word_nm[i]
-                word_nm = replace_pos(word_nm, word_nm[i], i+1)
-                new_harakat += harakat[i]
-                i += 1
-
-            elif  harakat[i] == SUKUN and harakat[i+1] == SUKUN:
-                #no geminating
-                new_word += word_nm[i]
-                word_nm = replace_pos(word_nm, word_nm[i], i+1)
-                new_harakat += FATHA
+                new_word.append(letters[i])
+                letters[i+1] = letters[i]
+                if harakat[i] != SUKUN:
+                    new_harakat.append(harakat[i])
+                else:
+                    #no geminating
+                    new_harakat.append(FATHA)
                 i += 1
             else:
-
     # عندما يكون الحرف السابق ساكنا فإنه يستعيع
     #يض عن حركته بحركة الحرف الأول
-                if i-1 >= 0 and new_harakat[i-1] == SUKUN:
-                    new_word += word_nm[i]+SHADDA
+                new_word.append(letters[i]+SHADDA)
+                if new_harakat[i-1] == SUKUN:
                     if harakat[i] != SUKUN:
-                        new_harakat = new_harakat[:-1]+harakat[i]+ \
-                           vconst.NOT_DEF_HARAKA+harakat[i+1]
+                        new_harakat[-1] = harakat[i]
                     else:
-                        new_harakat = new_harakat[:-1]+FATHA+ \
-                        vconst.NOT_DEF_HARAKA+harakat[i+1]
+                        new_harakat[-1] = FATHA
     ## يتم الإدغام إذا كان الحرف السابق ذو حركة طويلة
-                elif i-1 >= 0 and new_harakat[i-1] in \
-                (vconst.ALEF_HARAKA, vconst.WAW_HARAKA, \
-                vconst.YEH_HARAKA):
-                    new_word += word_nm[i]+SHADDA
-                    new_harakat += vconst.NOT_DEF_HARAKA+harakat[i+1]
-
-                elif harakat[i] == SUKUN:
-                    new_word += word_nm[i]+SHADDA
-                    new_harakat += vconst.NOT_DEF_HARAKA+harakat[i+1]
-                else:
-    ## مؤقت حتى يتم حل المشكلة
-                    new_word += word_nm[i]+SHADDA
-                    new_harakat += vconst.NOT_DEF_HARAKA+harakat[i+1]
+    ## وإلا فهو مؤقت حتى يتم حل المشكلة
+                new_harakat.append(vconst.NOT_DEF_HARAKA)
+                new_harakat.append(harakat[i+1])
     ##TODO
     ## منع الإدغام في بعض الحالات التي لا يمكن فيها الإدغام
     ##مثل حالة سكتتا ، أي الحرفات متحركان وما قبلهاما متحرك
     ## تم حل هذه المشكلة من خلال خوارزمية التجانس بين التصريفات
                 i += 2
-        elif i > 0 and i+1 < length and word_nm[i+1] == word_nm[i] and \
-        harakat[i]  == SUKUN and harakat[i+1] in (FATHA, DAMMA, KASRA):
+        elif i > 0 and i+1 < length and letters[i+1] == letters[i] and \
+        harakat[i] == SUKUN and harakat[i+1] in (FATHA, DAMMA, KASRA):
             # treat geminating case
-            new_word += word_nm[i]+SHADDA
-            new_harakat += vconst.NOT_DEF_HARAKA+harakat[i+1]
+            new_word.append(letters[i]+SHADDA)
+            new_harakat.append(vconst.NOT_DEF_HARAKA)
+            new_harakat.append(harakat[i+1])
             i += 2
         else :
-            new_word += word_nm[i]
-            new_harakat += harakat[i]
+            new_word.append(letters[i])
+            new_harakat.append(harakat[i])
             i += 1
-    return (new_word, new_harakat)
+    return (u"".join(new_word), u"".join(new_harakat))
 
 
 def standard2(word_nm, harakat):
     """ join the harakat and the letters to the give word
-     in the standard script, 
+     in the standard script,
     it return one strings ( the word with harakat and the harakat).
 
     @param word_nm: given unvocalized word.
@@ -752,57 +761,102 @@ def standard2(word_nm, harakat):
     if len(word_nm) != len(harakat):
         print(word_nm.encode('utf8'),len(word_nm), u"-".join([araby.name(x) for x in harakat]), len(harakat))
         return u"*"
-    else:
-        word = u""
-        i = 0
-        word_nm, harakat = geminating(word_nm, harakat)
-        if len(word_nm) != len(harakat):
-            return u""
+    word_nm, harakat = geminating(word_nm, harakat)
+    if len(word_nm) != len(harakat):
+        return u""
     ## حالة عدم الابتداء بسكون
     ##إذا كان الحرف الثاني مضموما  تكون الحركة الأولى مضمومة، وإلا تكون مكسورة
-        if len(harakat) != 0 and harakat.startswith(SUKUN):
-            word_nm = ALEF+word_nm
-            if len(harakat) >= 2 and harakat[1] in \
-                    (DAMMA, vconst.WAW_HARAKA):
-                harakat = DAMMA+harakat
-            else:
-                harakat = KASRA+harakat
-
-    ##        word_nm = tahmeez2(word_nm, harakat)
-        if len(word_nm) != len(harakat):
-            return u""
-        word_before = word_nm
-        harakat_before = harakat
-        word_nm, harakat = homogenize(word_nm, harakat)
-        if len(word_nm) != len(harakat):
-            print("len word: ", len(word_nm), word_nm.encode('utf8') )
-            print("len harakat: ", len(harakat), repr(harakat))
-            print(repr(harakat_before), word_before.encode('utf8'))
-            return u""
-        word_nm = tahmeez2(word_nm, harakat)
-
-        len_word_nm = len(word_nm)
-        while i < len_word_nm:
-            # للعمل :
+    if harakat[:1] == SUKUN:
+        word_nm = ALEF+word_nm
+        if len(harakat) >= 2 and harakat[1] in \
+                (DAMMA, vconst.WAW_HARAKA):
+            harakat = DAMMA+harakat
+        else:
+            harakat = KASRA+harakat
+    word_before = word_nm
+    harakat_before = harakat
+    word_nm, harakat = homogenize(word_nm, harakat)
+    if len(word_nm) != len(harakat):
+        print("len word: ", len(word_nm), word_nm.encode('utf8') )
+        print("len harakat: ", len(harakat), repr(harakat))
+        print(repr(harakat_before), word_before.encode('utf8'))
+        return u""
+    word_nm = tahmeez2(word_nm, harakat)
+    # للعمل :
     # هذه حالة الألف التي أصلها ياء
     # وقد استغنينا عنها بأن جعلنا الحرف الناقص من الفعل الناقص حرفا تاما
-            if harakat[i] in vconst.WRITTEN_HARAKA:
-                word += word_nm[i]+vconst.WRITTEN_HARAKA[harakat[i]]
-            else:
-                word += word_nm[i]+harakat[i]
-            i += 1
+    written = vconst.WRITTEN_HARAKA
+    word = u"".join([letter + written.get(hrk, hrk)
+        for (letter, hrk) in zip(word_nm, harakat)])
 
-    #-تحويل همزة القطع على الألف بعدها فتحة 
+    #-تحويل همزة القطع على الألف بعدها فتحة
 #وهمزة القطع على الألف بعدها سكون إلى ألف ممدودة
-    for (pat, rep) in vconst.STANDARD_REPLACEMENT:
-        word = word.replace( pat, rep)
+    if STANDARD_REPLACEMENT_PATTERN.search(word):
+        for (pat, rep) in vconst.STANDARD_REPLACEMENT:
+            word = word.replace( pat, rep)
+    return word
 
 
-    return word
+def _middle_hamza(letter, before, actual, shadda_haraka, previous_letter):
+    """
+    Get the written form of a hamza in the middle of the word.
+    @param letter: the hamza letter.
+    @param before: the haraka of the previous letter.
+    @param actual: the haraka of the hamza.
+    @param shadda_haraka: the haraka of the following shadda if any.
+    @param previous_letter: the previous letter if YEH or WAW.
+    @return: the written hamza.
+    @rtype: unicode char.
+    """
+    # if the hamza have shadda, it will take the harakat of shadda.
+    if actual == vconst.NOT_DEF_HARAKA or actual == SUKUN:
+        if shadda_haraka:
+            actual = shadda_haraka
+    if before == vconst.NOT_DEF_HARAKA:
+        before = FATHA
+    if actual == vconst.NOT_DEF_HARAKA:
+        actual = FATHA
+    if before in vconst.MIDDLE_TAHMEEZ_TABLE and\
+      actual in vconst.MIDDLE_TAHMEEZ_TABLE[before]:
+        swap = vconst.MIDDLE_TAHMEEZ_TABLE[before][actual]
+        #~ # if the actual haraka is FATHA
+        if before in (SUKUN, vconst.YEH_HARAKA, vconst.ALEF_HARAKA, vconst.WAW_HARAKA):
+            if actual == FATHA and previous_letter == araby.YEH:
+                swap = araby.YEH_HAMZA
+            elif previous_letter == araby.WAW and actual not in (KASRA, vconst.YEH_HARAKA):
+                swap = araby.HAMZA
+    else :
+        swap = letter
+    return swap
+
+
+def _final_hamza(letter, before, actual, previous_letter):
+    """
+    Get the written form of a hamza at the end of the word.
+    @param letter: the hamza letter.
+    @param before: the haraka of the previous letter.
+    @param actual: the haraka of the hamza.
+    @param previous_letter: the previous letter if YEH or WAW.
+    @return: the written hamza.
+    @rtype: unicode char.
+    """
+    if before == vconst.NOT_DEF_HARAKA:
+        before = FATHA
+    if actual == vconst.NOT_DEF_HARAKA:
+        actual = FATHA
+    if before in vconst.FINAL_TAHMEEZ_TABLE and \
+     actual in vconst.FINAL_TAHMEEZ_TABLE[before]:
+        if previous_letter == araby.WAW and actual in (FATHA, DAMMA):
+            swap = araby.HAMZA
+        else:
+            swap = vconst.FINAL_TAHMEEZ_TABLE[before][actual]
+    else :
+        swap = letter
+    return swap
 
 
 def tahmeez2(word_nm, harakat):
-    """ Transform hamza on the standard script. 
+    """ Transform hamza on the standard script.
     in entry the word without harakat and the harakat seperately
     return the word with non uniform hamza.
     إعلال و إبدال الهمزة.
@@ -819,72 +873,42 @@ def tahmeez2(word_nm, harakat):
     # if no hamza, no tahmeez
     elif  HAMZA not in word_nm:
         return word_nm
-    else:
-        ha2 = u""
-        #eliminate some altenative of HARAKAT to standard.
-        for hrk in harakat:
-            if hrk == vconst.ALEF_YEH_HARAKA or \
-              hrk == vconst.ALEF_WAW_HARAKA:
-                hrk = vconst.ALEF_HARAKA
-            ha2 += hrk
-        harakat = ha2
-        word = u""
-        for i in range(len(word_nm)):
-            if word_nm[i] != HAMZA and word_nm[i] != ALEF_HAMZA_ABOVE:
-                word += word_nm[i]
+    #eliminate some altenative of HARAKAT to standard.
+    harakat = harakat.translate(TAHMEEZ_HARAKAT_TRANSLATION)
+    word = list(word_nm)
+    last = len(word_nm) - 1
+    transitions = TAHMEEZ_TRANSITIONS
+    for i, letter in enumerate(word_nm):
+        if letter != HAMZA and letter != ALEF_HAMZA_ABOVE:
+            continue
+        if i == 0:
+            actual = harakat[0]
+            word[0] = vconst.INITIAL_TAHMEEZ_TABLE.get(actual, actual)
+            continue
+        previous_letter = word_nm[i-1]
+        if previous_letter != YEH and previous_letter != WAW:
+            previous_letter = u""
+        if i < last:
+            if word_nm[i+1] == SHADDA and harakat[i+1] != SUKUN:
+                shadda_haraka = harakat[i+1]
             else:
-                if i == 0:
-                    actual = harakat[i]
-                    swap = vconst.INITIAL_TAHMEEZ_TABLE.get(actual, actual)
-                else:
-                    before = harakat[i-1]
-                    actual = harakat[i]
-
-                    if i+1 < len(word_nm):
-    # if the hamza have shadda, it will take the harakat of shadda.
-                        if actual == vconst.NOT_DEF_HARAKA or actual == SUKUN:
-                            if word_nm[i+1] == SHADDA and harakat[i+1] != SUKUN:
-                                actual = harakat[i+1]
-                        if before == vconst.NOT_DEF_HARAKA:
-                            before = FATHA
-                        if actual == vconst.NOT_DEF_HARAKA:
-                            actual = FATHA
-
-                        if  before in vconst.MIDDLE_TAHMEEZ_TABLE and\
-                      actual in  vconst.MIDDLE_TAHMEEZ_TABLE[before]:
-                            swap = vconst.MIDDLE_TAHMEEZ_TABLE[before][actual]
-                            #~ # if the actual haraka is FATHA
-                            if before  in (SUKUN, vconst.YEH_HARAKA, vconst.ALEF_HARAKA, vconst.WAW_HARAKA):
-                                if actual == FATHA and word_nm[i-1] == araby.YEH:
-                                    swap = araby.YEH_HAMZA
-                                #~ #elif word_nm[i-1] in ( araby.WAW, araby.DAL,araby.THAL, 
-                                #~ #   araby.REH, araby.ZAIN ):
-                                #ZZZZ
-                                elif word_nm[i-1] == araby.WAW and actual  not in (KASRA, vconst.YEH_HARAKA):
-                                    swap = araby.HAMZA                            
-                        else :
-                            swap = word_nm[i]
-
-                    else :
-                        if before == vconst.NOT_DEF_HARAKA:
-                            before = FATHA
-                        if actual == vconst.NOT_DEF_HARAKA: 
-                            actual = FATHA
-
-                        if  before in vconst.FINAL_TAHMEEZ_TABLE and \
-                         actual in vconst.FINAL_TAHMEEZ_TABLE[before]:
-                            if word_nm[i-1]  in( araby.WAW, ) and actual in (FATHA, DAMMA):
-                                #pass
-                               swap = araby.HAMZA 
-                            else:
-                                swap = vconst.FINAL_TAHMEEZ_TABLE[before][actual]
-                        else :
-                            swap = word_nm[i]
-                word += swap
-    return word
+                shadda_haraka = u""
+            key = (letter, harakat[i-1], harakat[i], shadda_haraka,
+                previous_letter)
+        else:
+            key = (letter, harakat[i-1], harakat[i], None, previous_letter)
+        swap = transitions.get(key)
+        if swap is None:
+            if i < last:
+                swap = _middle_hamza(*key)
+            else:
+                swap = _final_hamza(letter, key[1], key[2], previous_letter)
+            transitions[key] = swap
+        word[i] = swap
+    return u"".join(word)
 
 def treat_sukun2(word_nm, harakat):
-    """ Treat the rencontre of sukun. 
+    """ Treat the rencontre of sukun.
     in entry the word without harakat and the harakat seperately,
      and the probably haraka
     return the new sequence of harakat
@@ -897,38 +921,197 @@ def treat_sukun2(word_nm, harakat):
     @rtype: tuple of unicode.
     """
     # if no sukun, to treat
-    if harakat.find(SUKUN) < 0:
+    pos = harakat.find(SUKUN, 1)
+    if pos < 0:
         return harakat
     len_word = len(word_nm)
-    len_harakat = len(harakat)
-
-    if len_word != len_harakat:
+    if len_word != len(harakat):
         return harakat
-    else:
-        new_harakat = u""
-        for i in range(len_word):
-            if i+1 < len_harakat and harakat[i+1] == SUKUN:
-                if harakat[i] == vconst.ALEF_HARAKA:
-                    #  other conditions
-                      # إذا كان حرف الألف ثانيا مثل خاف يقلب كسرة،
-                    #أما إذا كان ثالثا أو رابعا فيصبح فتحة،
-                    # مثل خاف لا تخف
-                    # حالة الألف بعدها حرف مشدد
-                    if i+2 < len_word and word_nm[i+2] == SHADDA:
-                        new_harakat += vconst.ALEF_HARAKA
-                    elif i == 0 :
-                        new_harakat += KASRA
-                    else:
-                        new_harakat += FATHA
-                # if the actual haraka is in table use table conversion
-                elif harakat[i] in vconst.CONVERSION_TABLE:
-                    new_harakat += vconst.CONVERSION_TABLE[harakat[i]]
-                else :
-                    new_harakat += harakat[i]
-            else :
-                new_harakat += harakat[i]
-    return new_harakat
+    new_harakat = list(harakat)
+    # only the harakat before a sukun are changed
+    while pos > 0:
+        i = pos - 1
+        hrk = harakat[i]
+        if hrk == vconst.ALEF_HARAKA:
+            #  other conditions
+              # إذا كان حرف الألف ثانيا مثل خاف يقلب كسرة،
+            #أما إذا كان ثالثا أو رابعا فيصبح فتحة،
+            # مثل خاف لا تخف
+            # حالة الألف بعدها حرف مشدد
+            if i+2 < len_word and word_nm[i+2] == SHADDA:
+                pass
+            elif i == 0 :
+                new_harakat[i] = KASRA
+            else:
+                new_harakat[i] = FATHA
+        # if the actual haraka is in table use table conversion
+        else:
+            new_harakat[i] = vconst.CONVERSION_TABLE.get(hrk, hrk)
+        pos = harakat.find(SUKUN, pos + 1)
+    return u"".join(new_harakat)
+
 
+def _homogenize_middle(actual_letter, actual_haraka, previous_haraka,
+        next_sukun, next_yeh, shadda_in_next):
+    """
+    Get the treatment of a weak letter in the middle of the word.
+    @param actual_letter: the weak letter.
+    @param actual_haraka: its haraka.
+    @param previous_haraka: the haraka of the previous letter.
+    @param next_sukun: the next haraka is sukun.
+    @param next_yeh: the next letter is yeh.
+    @param shadda_in_next: the next letter is geminated.
+    @return: (new previous haraka or None, added haraka, added letter).
+    @rtype: tuple.
+    """
+    if  actual_letter == ALEF_MAKSURA or actual_letter == YEH:
+ #إذا كانت الياء ساكنة أو مكسورة (كسرا قصيرا أو طويلا)،
+# وكان ما قبلها مكسورا، يأخذ ماقبلها كسرة طويلة            #مثال :
+        # بِ +يْ  = > بِي
+        #بِ +يِ   = > بِي
+        #بِ +يي  = > بِي
+        if actual_letter == ALEF_MAKSURA and next_sukun:
+            return (None, u"", u"")
+        elif  (actual_haraka in(SUKUN, KASRA, vconst.YEH_HARAKA)) and \
+         previous_haraka == KASRA and not shadda_in_next:
+            return (vconst.YEH_HARAKA, u"", u"")
+        elif  actual_haraka == KASRA and previous_haraka == KASRA \
+          and shadda_in_next:
+            return (None, u"", u"")
+        # ToDO review
+        #سقّى، يُسقُّون
+        elif  actual_haraka  == DAMMA  and  shadda_in_next:
+            if previous_haraka in (DAMMA, KASRA):
+                return (DAMMA, u"", u"")
+            else:
+                return (None, DAMMA, WAW)
+        #تحويل الياء إلى واو ساكنة
+        #2 - إذا كانت الياء مضمومة (ضما قصيرا أو طويلا)،
+# وكان ما قبلها مفتوحا، تتحول الياء إلى واو ساكنة.                #مثال :
+        # بَ +يُ  = > بَِوْ
+        #بَ +يو   = > بَوْ
+        elif (actual_haraka in (DAMMA, vconst.WAW_HARAKA))and\
+          previous_haraka == FATHA and not shadda_in_next:
+            return (None, SUKUN, WAW)
+        elif (actual_haraka in (DAMMA, vconst.WAW_HARAKA))and \
+         previous_haraka == FATHA and shadda_in_next:
+            return (None, actual_haraka, WAW)
+        #إذا كانت ساكنة، وماقبلها مضموما،
+# ولم يكن ما بعدها ياء، أخذ ما قبلها ضمة طويلة.
+        #مثال :
+        # بُ +يُت  = >بُوت
+        elif  (actual_haraka  == SUKUN) and previous_haraka == DAMMA \
+         and not next_yeh and not shadda_in_next:
+            return (vconst.WAW_HARAKA, u"", u"")
+        elif (actual_haraka  == vconst.YEH_HARAKA)and \
+        previous_haraka == FATHA:
+            return (None, SUKUN, YEH)
+        elif  (actual_haraka  == vconst.WAW_HARAKA) and previous_haraka == KASRA :
+            return (vconst.WAW_HARAKA, u"", u"")
+        else :
+            return (None, actual_haraka, YEH)
+    elif   actual_letter == vconst.ALEF_MAMDUDA or \
+     actual_letter == WAW:
+        if actual_letter == vconst.ALEF_MAMDUDA and next_sukun:
+            return (None, u"", u"")
+        elif actual_letter == vconst.ALEF_MAMDUDA and \
+        (actual_haraka in(SUKUN, DAMMA, vconst.WAW_HARAKA))and\
+         (previous_haraka == DAMMA) and not shadda_in_next:
+            return (vconst.WAW_HARAKA, u"", u"")
+        elif actual_letter == WAW and (actual_haraka in(SUKUN, DAMMA))\
+         and (previous_haraka == DAMMA) and not shadda_in_next:
+            return (vconst.WAW_HARAKA, u"", u"")
+        #تحويل الواو المضمومة  أو الطويلة إلى واو ساكنة
+        elif  (actual_haraka in (DAMMA, vconst.WAW_HARAKA)) \
+        and previous_haraka == FATHA :
+            return (None, SUKUN, WAW)
+        # حالة وجع ايجع
+        elif (actual_haraka  == (SUKUN))and \
+        (previous_haraka == KASRA) and not shadda_in_next:
+            return (vconst.YEH_HARAKA, u"", u"")
+        elif  (actual_haraka == KASRA)and shadda_in_next:
+            return (KASRA, u"", u"")
+        elif  actual_letter == vconst.ALEF_MAMDUDA and \
+        (actual_haraka == DAMMA) and shadda_in_next:
+            if previous_haraka == DAMMA:
+                return (DAMMA, u"", u"")
+            else:
+                return (None, DAMMA, WAW)
+        elif  actual_letter == WAW and (actual_haraka == vconst.WAW_HARAKA):
+            return (vconst.WAW_HARAKA, u"", u"")
+        elif  actual_letter == WAW and (actual_haraka == DAMMA) and previous_haraka == DAMMA and shadda_in_next:
+            return (None, u"", u"")
+        elif  actual_letter == vconst.ALEF_MAMDUDA and \
+        (actual_haraka == vconst.YEH_HARAKA) and \
+         not shadda_in_next:
+            return (vconst.YEH_HARAKA, u"", u"")
+        elif  actual_letter == WAW and (actual_haraka == DAMMA) and\
+         shadda_in_next:
+            return (None, DAMMA, WAW)
+        else :
+            return (None, actual_haraka, WAW)
+    return (None, actual_haraka, actual_letter)
+
+
+def _homogenize_last(last_letter, last_haraka, previous_yeh, previous_haraka):
+    """
+    Get the treatment of a weak letter at the end of the word.
+    @param last_letter: the weak letter.
+    @param last_haraka: its haraka.
+    @param previous_yeh: the previous letter is yeh.
+    @param previous_haraka: the haraka of the previous letter.
+    @return: (new previous haraka or None, added haraka, added letter).
+    @rtype: tuple.
+    """
+    if  last_letter == ALEF_MAKSURA or last_letter == YEH :
+        if  (last_haraka in(KASRA, DAMMA))  and previous_haraka == KASRA:
+            return (vconst.YEH_HARAKA, u"", u"")
+        elif  last_haraka == vconst.YEH_HARAKA and\
+         previous_haraka == KASRA :
+            return (vconst.YEH_HARAKA, u"", u"")
+        #حذف حركة الحرف الأخير إذا كان ساكنا
+        elif (last_haraka == SUKUN):
+            return (None, u"", u"")
+        elif  previous_yeh and \
+        (last_haraka in(KASRA, DAMMA, FATHA)) and previous_haraka == FATHA:
+            return (None, vconst.NOT_DEF_HARAKA, ALEF)
+        elif  not previous_yeh and \
+        (last_haraka in(KASRA, DAMMA, FATHA)) and previous_haraka == FATHA:
+            return (None, vconst.NOT_DEF_HARAKA, ALEF_MAKSURA)
+        elif  last_haraka == vconst.WAW_HARAKA and \
+        previous_haraka == KASRA:
+            return (vconst.WAW_HARAKA, u"", u"")
+        #حالة تصريف الفعل الناقص في المضارع المجزوم مع أنت للمؤنث
+        elif  (last_haraka == vconst.YEH_HARAKA) and  \
+        previous_haraka == FATHA:
+            return (None, SUKUN, YEH)
+        else :
+            return (None, last_haraka, YEH)
+    elif last_letter == vconst.ALEF_MAMDUDA :
+        if (last_haraka in(DAMMA, KASRA, vconst.WAW_HARAKA)) and \
+        previous_haraka == DAMMA :
+            return (vconst.WAW_HARAKA, u"", u"")
+        elif last_haraka == vconst.ALEF_HARAKA and \
+         previous_haraka == DAMMA:
+            return (vconst.YEH_HARAKA, u"", u"")
+        elif  (last_haraka == vconst.YEH_HARAKA):
+            return (vconst.YEH_HARAKA, u"", u"")
+        elif (last_haraka == SUKUN):
+            return (None, u"", u"")
+        elif (last_haraka == FATHA)and previous_haraka == FATHA:
+            return (None, vconst.NOT_DEF_HARAKA, vconst.ALEF_MAMDUDA)
+        else :
+            return (None, last_haraka, WAW)
+    elif  last_letter == WAW :
+        if  (last_haraka in(DAMMA, FATHA))  and previous_haraka == FATHA:
+            return (None, vconst.NOT_DEF_HARAKA, ALEF_MAKSURA)
+        elif  last_haraka == FATHA  and previous_haraka == KASRA:
+            return (None, FATHA, YEH)
+        elif  last_haraka == vconst.YEH_HARAKA  and previous_haraka in (KASRA, DAMMA):
+            return (vconst.YEH_HARAKA, u"", u"")
+        elif last_haraka == SUKUN  and previous_haraka in (DAMMA, FATHA):
+            return (None, u"", u"")
+    return (None, last_haraka, last_letter)
 
 
 def homogenize(word_nm, harakat):
@@ -946,270 +1129,55 @@ def homogenize(word_nm, harakat):
         print("Homogenize:inequal length", len(word_nm), len(harakat))
         return (word_nm, harakat)
     # word without weak letters doesn't need treatment
-    #~ elif not re.search(ur'[%s%s%s%s]'%(ALEF_MAKSURA, vconst.ALEF_MAMDUDA, \
-    elif not re.search(u'[%s%s%s%s]'%(ALEF_MAKSURA, vconst.ALEF_MAMDUDA, \
-     YEH, WAW), word_nm):
+    elif not WEAK_LETTERS_PATTERN.search(word_nm):
         return (word_nm, harakat)
     # treatment
-    else:
-        new_harakat = harakat[0]
-        new_word = word_nm[0]
-        # نبدأ من الحرف الثاني لأن الحرف الأول لا يعالج
-        i = 1
-        ## دراسة حالات الياء والواو قبل النهاية
-        len_word_nm = len(word_nm)
-        while i < len_word_nm-1:
-            actual_letter = word_nm[i]            # Actual letter
-            actual_haraka = harakat[i]            # Actual haraka
-            if i-1 >= 0 :
-                previous_letter = word_nm[i-1]    # previous letter
-                previous_haraka = harakat[i-1]    # previous letter
-            else:
-                previous_letter = ''
-                previous_haraka = ''
-            if i+1 < len_word_nm:
-                next_letter = word_nm[i+1]        # next letter
-                next_haraka = harakat[i+1]        # next haraka
-            else:
-                next_letter = ''
-                next_haraka = ''
-            # إذا كان الحرف التالي مضعف
-            if i+2 < len_word_nm and word_nm[i+2] == SHADDA:
-                shadda_in_next = True
-            else:
-                shadda_in_next = False
-
-            if  actual_letter == ALEF_MAKSURA or actual_letter == YEH:
- #إذا كانت الياء ساكنة أو مكسورة (كسرا قصيرا أو طويلا)،
-# وكان ما قبلها مكسورا، يأخذ ماقبلها كسرة طويلة            #مثال :
-            # بِ +يْ  = > بِي
-            #بِ +يِ   = > بِي
-            #بِ +يي  = > بِي
-
-                if actual_letter == ALEF_MAKSURA and next_haraka == SUKUN:
-                    new_harakat += ""
-                elif  (actual_haraka in(SUKUN, KASRA, vconst.YEH_HARAKA)) and \
-                 previous_haraka == KASRA and not shadda_in_next:
-                    new_harakat = new_harakat[:-1]+vconst.YEH_HARAKA
-                elif  (actual_haraka in(KASRA)) and previous_haraka == KASRA \
-                  and shadda_in_next:
-                    new_harakat += ''
-                # حالة هو تيسّر في المضارع المبني للمجهول
-                #~ elif  actual_letter == YEH and previous_haraka == DAMMA and \
-                #~ actual_haraka  == DAMMA  and  shadda_in_next:
-                    #~ #pass
-                    #~ new_harakat += DAMMA
-                    #~ new_word += YEH
-                # # مثل تؤدّينّ
-                # elif  previous_haraka in (KASRA, FATHA) and
-                # actual_haraka  == DAMMA  and  shadda_in_next:
-                    # new_harakat += FATHA
-                    # new_word += YEH
-                # ToDO review
-                #سقّى، يُسقُّون
-                elif  actual_haraka  == DAMMA  and  shadda_in_next:
-                    if previous_haraka in (DAMMA, KASRA):
-                    #~ if previous_haraka in DAMMA:
-                        new_harakat = new_harakat[:-1]+DAMMA
-                    else:
-                        new_harakat += DAMMA
-                        new_word += WAW
-                #تحويل الياء إلى واو ساكنة
-                #2 - إذا كانت الياء مضمومة (ضما قصيرا أو طويلا)،
-# وكان ما قبلها مفتوحا، تتحول الياء إلى واو ساكنة.                #مثال :
-                # بَ +يُ  = > بَِوْ
-                #بَ +يو   = > بَوْ
-
-                elif (actual_haraka in (DAMMA, vconst.WAW_HARAKA))and\
-                  previous_haraka == FATHA and not shadda_in_next:
-                    new_harakat += SUKUN
-                    new_word += WAW
-                elif (actual_haraka in (DAMMA, vconst.WAW_HARAKA))and \
-                 previous_haraka == FATHA and shadda_in_next:
-                    new_harakat += actual_haraka
-                    new_word += WAW
-                #إذا كانت ساكنة، وماقبلها مضموما،
-# ولم يكن ما بعدها ياء، أخذ ما قبلها ضمة طويلة.
-                #مثال :
-                # بُ +يُت  = >بُوت
-
-
-                elif  (actual_haraka  == SUKUN) and previous_haraka == DAMMA \
-                 and next_letter != YEH and not shadda_in_next:
-                    new_harakat = new_harakat[:-1]+vconst.WAW_HARAKA
-
-                elif (actual_haraka  == vconst.YEH_HARAKA)and \
-                previous_haraka == FATHA:
-                    new_harakat += SUKUN
-                    new_word += YEH
-                elif  (actual_haraka  == vconst.WAW_HARAKA) and previous_haraka == KASRA :
-                    new_harakat = new_harakat[:-1]+vconst.WAW_HARAKA
-
-                    #~ if araby.is_hamza(previous_letter):
-                        #~ new_word    = new_word[:-1] + araby.WAW_HAMZA
-                        
-
-                else :
-                    new_harakat += actual_haraka
-                    new_word += YEH
-
-            elif   actual_letter == vconst.ALEF_MAMDUDA or \
-             actual_letter == WAW:
-                if actual_letter == vconst.ALEF_MAMDUDA and \
-                next_haraka == SUKUN:
-                    new_harakat += ""
-                elif actual_letter == vconst.ALEF_MAMDUDA and \
-                (actual_haraka in(SUKUN, DAMMA, vconst.WAW_HARAKA))and\
-                 (previous_haraka == DAMMA) and not shadda_in_next:
-                    new_harakat = new_harakat[:-1]+vconst.WAW_HARAKA
-                    
-                elif actual_letter == WAW and (actual_haraka in(SUKUN, DAMMA))\
-                 and (previous_haraka == DAMMA) and not shadda_in_next:
-                    new_harakat = new_harakat[:-1]+vconst.WAW_HARAKA
-                    
-                #تحويل الواو المضمومة  أو الطويلة إلى واو ساكنة
-                elif  (actual_haraka in (DAMMA, vconst.WAW_HARAKA)) \
-                and previous_haraka == FATHA :
-                    new_harakat += SUKUN
-                    new_word += WAW
-                # حالة وجع ايجع
-                elif (actual_haraka  == (SUKUN))and \
-                (previous_haraka == KASRA) and not shadda_in_next:
-                    new_harakat = new_harakat[:-1]+vconst.YEH_HARAKA
-                elif  (actual_haraka == KASRA)and shadda_in_next:
-                    new_harakat = new_harakat[:-1]+KASRA
-                    
-                elif  actual_letter == vconst.ALEF_MAMDUDA and \
-                (actual_haraka == DAMMA) and shadda_in_next:
-                    if previous_haraka == DAMMA:
-                        new_harakat = new_harakat[:-1]+DAMMA
-                    else:
-                        new_harakat += DAMMA
-                        new_word +=  WAW
-                        
-                
-                elif  actual_letter == WAW and (actual_haraka == vconst.WAW_HARAKA):
-                    new_harakat = new_harakat[:-1]+ vconst.WAW_HARAKA
-                elif  actual_letter == WAW and (actual_haraka == DAMMA) and previous_haraka == DAMMA and shadda_in_next:
-                    new_harakat +=""
-                    
-                elif  actual_letter == vconst.ALEF_MAMDUDA and \
-                (actual_haraka == vconst.YEH_HARAKA) and \
-                 not shadda_in_next:
-                    new_harakat = new_harakat[:-1]+vconst.YEH_HARAKA
-                elif  (actual_letter == WAW ) and (actual_haraka == DAMMA) and previous_haraka in (FATHA,) and \
-                 shadda_in_next:
-                    new_harakat += DAMMA
-                    new_word += WAW
-                elif  actual_letter == WAW and (actual_haraka == DAMMA) and previous_haraka in (FATHA,) and \
-                 shadda_in_next:
-                    new_harakat += DAMMA
-                    new_word += WAW
-                elif  actual_letter == WAW and (actual_haraka == DAMMA) and\
-                 shadda_in_next:
-                    new_harakat += DAMMA
-                    new_word += WAW
-                #elif  actual_letter == WAW and actual_haraka == FATHA and (previous_haraka == FATHA):
-                #    new_harakat += "" #actual_haraka
-                 #   new_word += ""#WAW
-                else :
-                    new_harakat += actual_haraka
-                    new_word += WAW
-            else:
-                new_harakat += actual_haraka
-                new_word += actual_letter
-            i += 1
-    # end of while
+    new_harakat = [harakat[0]]
+    new_word = [word_nm[0]]
+    len_word_nm = len(word_nm)
+    transitions = HOMOGENIZE_MIDDLE_TRANSITIONS
+    # نبدأ من الحرف الثاني لأن الحرف الأول لا يعالج
+    ## دراسة حالات الياء والواو قبل النهاية
+    for i in range(1, len_word_nm - 1):
+        actual_letter = word_nm[i]
+        if actual_letter not in HOMOGENIZED_LETTERS:
+            new_harakat.append(harakat[i])
+            new_word.append(actual_letter)
+            continue
+        # إذا كان الحرف التالي مضعف
+        key = (actual_letter, harakat[i], harakat[i-1], harakat[i+1] == SUKUN,
+            word_nm[i+1] == YEH,
+            i+2 < len_word_nm and word_nm[i+2] == SHADDA)
+        action = transitions.get(key)
+        if action is None:
+            action = _homogenize_middle(*key)
+            transitions[key] = action
+        (previous, added_haraka, added_letter) = action
+        if previous is not None:
+            new_harakat[-1] = previous
+        if added_letter:
+            new_harakat.append(added_haraka)
+            new_word.append(added_letter)
     # we have to treat the last letter
     ## دراسة حالة الحرف الأخير
-        # Actual letter
-        last_letter = word_nm[i]
-        # Actual haraka
-        last_haraka = harakat[i]
-        if i-1 >= 0 :
-            # previous letter
-            previous_letter = word_nm[i-1]
-            # previous haraka
-            previous_haraka = harakat[i-1]
-        else:
-            previous_letter = ''
-            previous_haraka = ''
-
-        if  last_letter == ALEF_MAKSURA or last_letter == YEH :
-            if  (last_haraka in(KASRA, DAMMA))  and previous_haraka == KASRA:
-                new_harakat = new_harakat[:-1]+vconst.YEH_HARAKA
-            elif  (last_haraka in(vconst.YEH_HARAKA)) and\
-             previous_haraka == KASRA :
-                new_harakat = new_harakat[:-1]+vconst.YEH_HARAKA
-            #حذف حركة الحرف الأخير إذا كان ساكنا
-            elif (last_haraka == SUKUN):
-            ## pass
-                new_harakat += ''
-                new_word += ''
-            elif  previous_letter == YEH and \
-            (last_haraka in(KASRA, DAMMA, FATHA)) and previous_haraka == FATHA:
-                new_harakat += vconst.NOT_DEF_HARAKA
-                new_word += ALEF
-            elif  previous_letter != YEH and \
-            (last_haraka in(KASRA, DAMMA, FATHA)) and previous_haraka == FATHA:
-                new_harakat += vconst.NOT_DEF_HARAKA
-                new_word += ALEF_MAKSURA
-            elif  (last_haraka in(vconst.WAW_HARAKA)) and \
-            previous_haraka == KASRA:
-                new_harakat = new_harakat[:-1]+vconst.WAW_HARAKA
-            #حالة تصريف الفعل الناقص في المضارع المجزوم مع أنت للمؤنث
-            elif  (last_haraka == vconst.YEH_HARAKA) and  \
-            previous_haraka == FATHA:
-                new_harakat += SUKUN
-                new_word += YEH
-            else :
-                new_harakat += last_haraka
-                new_word += YEH
-
-        elif last_letter == vconst.ALEF_MAMDUDA :
-            if (last_haraka in(DAMMA, KASRA, vconst.WAW_HARAKA)) and \
-            previous_haraka == DAMMA :
-                new_harakat = new_harakat[:-1]+vconst.WAW_HARAKA
-            elif (last_haraka in(vconst.ALEF_HARAKA)) and \
-             previous_haraka == DAMMA:
-            ##                pass
-                new_harakat = new_harakat[:-1]+vconst.YEH_HARAKA
-            elif  (last_haraka == vconst.YEH_HARAKA):
-                new_harakat = new_harakat[:-1]+vconst.YEH_HARAKA
-                new_word += ''
-            elif (last_haraka == SUKUN) and previous_haraka == KASRA :
-                pass
-
-            elif (last_haraka == SUKUN):
-                new_harakat += ''
-                new_word += ''
-            elif (last_haraka == FATHA)and previous_haraka == FATHA:
-                new_harakat += vconst.NOT_DEF_HARAKA
-                new_word += vconst.ALEF_MAMDUDA
-            else :
-                new_harakat += last_haraka
-                new_word += WAW
-                #new_word += vconst.ALEF_MAMDUDA
-        elif  last_letter == WAW :
-            if  (last_haraka in(DAMMA, FATHA))  and previous_haraka == FATHA:
-                new_harakat += vconst.NOT_DEF_HARAKA
-                new_word += ALEF_MAKSURA
-            elif  (last_haraka in(FATHA,))  and previous_haraka == KASRA:
-                new_harakat += vconst.FATHA
-                new_word += YEH
-            elif  (last_haraka in (vconst.YEH_HARAKA,))  and previous_haraka in (KASRA, DAMMA):
-                new_harakat = new_harakat[:-1]+vconst.YEH_HARAKA
-                new_word += ''
-            elif (last_haraka in(SUKUN,))  and previous_haraka in (DAMMA, FATHA):
-                new_harakat += ""
-                new_word += ""
-            else:
-                new_harakat += harakat[i]
-                new_word += word_nm[i]
-        else:
-            new_harakat += harakat[i]
-            new_word += word_nm[i]
-        return (new_word, new_harakat)
+    i = max(1, len_word_nm - 1)
+    last_letter = word_nm[i]
+    if last_letter in HOMOGENIZED_LETTERS:
+        key = (last_letter, harakat[i], word_nm[i-1] == YEH, harakat[i-1])
+        action = HOMOGENIZE_LAST_TRANSITIONS.get(key)
+        if action is None:
+            action = _homogenize_last(*key)
+            HOMOGENIZE_LAST_TRANSITIONS[key] = action
+        (previous, added_haraka, added_letter) = action
+        if previous is not None:
+            new_harakat[-1] = previous
+        if added_letter:
+            new_harakat.append(added_haraka)
+            new_word.append(added_letter)
+    else:
+        new_harakat.append(harakat[i])
+        new_word.append(last_letter)
+    return (u"".join(new_word), u"".join(new_harakat))
 
 
 def is_triliteral_verb(verb):
@@ -309,11 +309,12 @@ class NounClass(classverb.VerbClass):
         suf_val = TATWEEL + suf_val
         #uniformate suffix
         # the case is used to avoid duplicated staddization
-        if self.cache_standard['suffix'].has_key( suf_val): 
-            (suf_val_l, suf_val_m) = self.cache_standard['suffix'][suf_val]
+        cached = self.cache_standard['suffix'].get(suf_val)
+        if cached is not None:
+            (suf_val_l, suf_val_m) = cached
         else:
             (suf_val_l, suf_val_m) = ar_verb.uniformate_suffix(suf_val)
-            self.cache_standard['suffix'][suf_val] = (suf_val_l, suf_val_m)
+            self.cache_standard['suffix'].set(suf_val, (suf_val_l, suf_val_m))
         # add affix to the stem
         conj_l = pre_val_l + stem_l + suf_val_l
         #The end of the stem marks takes the begining of the suffix marks
@@ -324,20 +325,20 @@ class NounClass(classverb.VerbClass):
         # Treat sukun
         # the case is used to avoid duplicated staddization
         key_cache = u'-'.join([conj_l, conj_m])
-        if self.cache_standard['sukun'].has_key(key_cache):
-            conj_m = self.cache_standard['sukun'][key_cache]
+        cached = self.cache_standard['sukun'].get(key_cache)
+        if cached is not None:
+            conj_m = cached
         else:
             #~ conj_m = ar_verb.treat_sukun2(conj_l, conj_m, self.future_type)
             conj_m = ar_verb.treat_sukun2(conj_l, conj_m)
-            self.cache_standard['sukun'][key_cache] = conj_m
+            self.cache_standard['sukun'].set(key_cache, conj_m)
         # standard orthographic form
         # the case is used to avoid duplicated staddization
         key_cache = u'-'.join([conj_l, conj_m])
-        if self.cache_standard['standard'].has_key(key_cache):
-            conj = self.cache_standard['standard'][key_cache]
-        else:    
+        conj = self.cache_standard['standard'].get(key_cache)
+        if conj is None:
             conj = ar_verb.standard2(conj_l, conj_m)
-            self.cache_standard['standard'][key_cache] = conj
+            self.cache_standard['standard'].set(key_cache, conj)
         return conj
 
     def derivate(self):
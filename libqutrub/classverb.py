@@ -41,6 +41,7 @@ import libqutrub.ar_verb as ar_verb
 #~ from libqutrub.verb_const import *
 import  libqutrub.verb_const as vconst
 import libqutrub.conjugatedisplay as conjugatedisplay
+import libqutrub.verb_cache as verb_cache
 
 
 class ConjugStem:
@@ -69,10 +70,47 @@ class ConjugStem:
         self.tense = tense
         self.letters = letters
         self.marks = marks
-# a global cache for verbs conjigation
-cache_standard = {'standard':{}, 
-                    'sukun':{}, 
-                    'suffix':{}}
+# a global cache for verbs conjigation,
+# bounded and shared by all threads, see verb_cache.StandardCache
+cache_standard = verb_cache.StandardCache()
+
+def create_display(verb, transitive, future_type, vtype, future_form,
+ table = None):
+    """
+    Create a display object for a verb, and fill it with
+    a raw conjugation table if given.
+    @param verb: the given verb
+    @type verb: unicode.
+    @param transitive: the verb is transitive or not
+    @type transitive: Boolean.
+    @param future_type: The mark of the third radical letter in the verb.
+    @type future_type: unicode; one arabic letter (Fatha, Damma, Kasra).
+    @param vtype: the verb type (فعل ثلاثي، رباعي ...)
+    @type vtype: unicode.
+    @param future_form: the verb conjugated in future with Huwa pronoun.
+    @type future_form: unicode.
+    @param table: conjugation table as given by VerbClass.conjugate_raw
+    @type table: dict of dict
+    @return: the display object
+    @rtype: conjugatedisplay class
+    """
+    conj_display = conjugatedisplay.ConjugateDisplay(verb)
+    if transitive  :
+        conj_display.add_attribut(u"اللزوم/التعدي", u"متعدي")
+    else :
+        conj_display.add_attribut(u"اللزوم/التعدي", u"لازم")
+    conj_display.add_attribut(u"الفعل", verb)
+    conj_display.add_attribut(u"نوع الفعل", vtype)
+    conj_display.set_future_form(future_form)
+    if transitive :
+        conj_display.settransitive()
+    conj_display.setbab(future_type)
+    if table:
+        for tense in table:
+            for pronoun in table[tense]:
+                conj_display.add(tense, pronoun, table[tense][pronoun])
+    return conj_display
+
 class VerbClass:
     """
     Verb Class: represent a verb, prepare it to be conjugated and store the conjugation result
@@ -93,7 +131,8 @@ class VerbClass:
     #~ future_form = u""
     #~ conj_display = None
     #~ tab_conjug_stem = None
-    def __init__(self, verb, transitive, future_type=FATHA):
+    def __init__(self, verb, transitive, future_type=FATHA, display=True,
+        past=True):
         """ 
         init method
         @param verb: the given verb
@@ -103,6 +142,13 @@ class VerbClass:
         @param future_type: The mark of the third radical letter in the verb, 
         used for triletiral verb only. Default value is Fatha; 
         @type future_type: unicode; one arabic letter (Fatha, Damma, Kasra).        
+        @param display: create the display object, if False, the display
+        object and the future form are prepared only when needed,
+        use conjugate_raw to get the conjugation without display.
+        @type display: Boolean.
+        @param past: prepare the past stems, if False, only the future and
+        imperative tenses can be conjugated, used to get the future form.
+        @type past: Boolean.
         """    
         self.verb = verb
         # this cache is used to avoid duplicated operatioon in standardisation,
@@ -142,8 +188,9 @@ class VerbClass:
         # في المضارع والأمر فقط
         # أما الماضي فليس فيه شذوذ
         self.past_stem = ""
-        self._prepare_past_stem()
-        self._prepare_passive_past_stem()
+        if past:
+            self._prepare_past_stem()
+            self._prepare_passive_past_stem()
         if self._is_irregular_verb():
             self._prepare_irregular_future_imperative_stem()
 
@@ -152,21 +199,30 @@ class VerbClass:
 
 
         # display object
-        self.conj_display = conjugatedisplay.ConjugateDisplay(self.verb)
-        if self.transitive  :
-            self.conj_display.add_attribut(u"اللزوم/التعدي", u"متعدي")
-        else :
-            self.conj_display.add_attribut(u"اللزوم/التعدي", u"لازم")
-        self.conj_display.add_attribut(u"الفعل", self.verb)
-        self.conj_display.add_attribut(u"نوع الفعل", self.vtype)
-        self.future_form = self.conjugate_tense_pronoun(vconst.TenseFuture, 
-        vconst.PronounHuwa)
-        self.conj_display.set_future_form(self.future_form)
-        if self.transitive :
-            self.conj_display.settransitive()
-        self.conj_display.setbab(self.future_type)
+        self.future_form = None
+        self.conj_display = None
+        if display:
+            self._create_display()
 
 
+    def _create_display(self):
+        """
+        Create the display object of the verb.
+        """
+        self.conj_display = create_display(self.verb, self.transitive,
+        self.future_type, self.vtype, self.get_future_form())
+
+    def get_future_form(self):
+        """
+        Get the future form of the verb, conjugated with Huwa pronoun.
+        @return: the future form.
+        @rtype: unicode
+        """
+        if self.future_form is None:
+            self.future_form = self.conjugate_tense_pronoun(
+            vconst.TenseFuture, vconst.PronounHuwa)
+        return self.future_form
+
     def __del__(self):
         """
         Delete instance 
@@ -194,6 +250,8 @@ class VerbClass:
             - 'ROWS':
         @param mode: the given mode to display result
         """        
+        if self.conj_display is None:
+            self._create_display()
         self.conj_display.setmode(mode)
 
 
@@ -495,11 +553,12 @@ class VerbClass:
         suf_val = TATWEEL + suf_val
         #uniformate suffix
         # the case is used to avoid duplicated staddization
-        if  suf_val in self.cache_standard['suffix']:
-            (suf_val_l, suf_val_m) = self.cache_standard['suffix'][suf_val]
+        cached = self.cache_standard['suffix'].get(suf_val)
+        if cached is not None:
+            (suf_val_l, suf_val_m) = cached
         else:
             (suf_val_l, suf_val_m) = ar_verb.uniformate_suffix(suf_val)
-            self.cache_standard['suffix'][suf_val] = (suf_val_l, suf_val_m)
+            self.cache_standard['suffix'].set(suf_val, (suf_val_l, suf_val_m))
         # add affix to the stem
         conj_l = pre_val_l + stem_l + suf_val_l
         #The end of the stem marks takes the begining of the suffix marks
@@ -510,20 +569,20 @@ class VerbClass:
         # Treat sukun
         # the case is used to avoid duplicated staddization
         key_cache = u'-'.join([conj_l, conj_m])
-        if key_cache in self.cache_standard['sukun']:
-            conj_m = self.cache_standard['sukun'][key_cache]
+        cached = self.cache_standard['sukun'].get(key_cache)
+        if cached is not None:
+            conj_m = cached
         else:
             #~ conj_m = ar_verb.treat_sukun2(conj_l, conj_m, self.future_type)
             conj_m = ar_verb.treat_sukun2(conj_l, conj_m)
-            self.cache_standard['sukun'][key_cache] = conj_m
+            self.cache_standard['sukun'].set(key_cache, conj_m)
         # standard orthographic form
         # the case is used to avoid duplicated staddization
         key_cache = u'-'.join([conj_l, conj_m])
-        if key_cache in self.cache_standard['standard']:
-            conj = self.cache_standard['standard'][key_cache]
-        else:    
+        conj = self.cache_standard['standard'].get(key_cache)
+        if conj is None:
             conj = ar_verb.standard2(conj_l, conj_m)
-            self.cache_standard['standard'][key_cache] = conj
+            self.cache_standard['standard'].set(key_cache, conj)
         return conj
 
 
@@ -537,122 +596,148 @@ class VerbClass:
         Conjugate a verb  with a list of tenses.
         @param listtense: given tense
         @type listtense: list of unicode
-        @return: conjugated verb 
-        @rtype: the type is given according to the display mode;        
+        @return: conjugated verb
+        @rtype: the type is given according to the display mode;
+        """
+        if not listtense:
+            listtense = vconst.TABLE_TENSE
+        self.fill_all_tenses(listtense)
+# if the result is not diplyed directely on the screen, we return it
+        result  =  self.conj_display.display(self.conj_display.mode,
+        listtense)
+        if result:
+            return result
+
+    def fill_all_tenses(self, listtense = None):
+        """
+        Conjugate a verb  with a list of tenses,
+        the result is stored in the display object without rendering it.
+        @param listtense: given tense
+        @type listtense: list of unicode
+        """
+        self.render_raw(self.conjugate_raw(listtense))
+
+    def render_raw(self, table):
+        """
+        Store a raw conjugation table in the display object,
+        the display object is created if the verb was built without it.
+        @param table: conjugation table given by conjugate_raw
+        @type table: dict of dict
+        @return: the display object
+        @rtype: conjugatedisplay class
+        """
+        if self.conj_display is None:
+            self._create_display()
+        for tense in table:
+            for pronoun in table[tense]:
+                self.conj_display.add(tense, pronoun, table[tense][pronoun])
+        return self.conj_display
+
+    def conjugate_raw(self, listtense = None):
+        """
+        Conjugate a verb  with a list of tenses, without display object.
+        Only conjugated pronouns are given for every tense.
+        @param listtense: given tense
+        @type listtense: list of unicode
+        @return: conjugation table as {tense:{pronoun:conjugated verb}}
+        @rtype: dict of dict
         """
         if not listtense:
             listtense = vconst.TABLE_TENSE
+        table = {}
         for tense in listtense:
+            row = table.setdefault(tense, {})
             if tense == vconst.TensePast:
                 conj_ana = self.conjugate_tense_pronoun(tense, 
                      vconst.PronounAna)
-                self.conj_display.add(tense, vconst.PronounAna, conj_ana)
+                row[vconst.PronounAna] = conj_ana
                 conj_ana_without_last_mark = conj_ana[:-1]
-                self.conj_display.add(tense, vconst.PronounAnta, 
-                conj_ana_without_last_mark+FATHA)
-                self.conj_display.add(tense, vconst.PronounAnti, 
-                conj_ana_without_last_mark+KASRA)
-                self.conj_display.add(tense, vconst.PronounAntuma, 
-                conj_ana+MEEM+FATHA+ALEF)
-                self.conj_display.add(tense, vconst.PronounAntuma_f, 
-                conj_ana+MEEM+FATHA+ALEF)
-                self.conj_display.add(tense, vconst.PronounAntum, 
-                conj_ana+MEEM)
-                self.conj_display.add(tense, vconst.PronounAntunna, 
-                conj_ana+NOON+SHADDA+FATHA)
-                self.conj_display.add(tense, vconst.PronounAna, conj_ana)
+                row[vconst.PronounAnta] = conj_ana_without_last_mark+FATHA
+                row[vconst.PronounAnti] = conj_ana_without_last_mark+KASRA
+                row[vconst.PronounAntuma] = conj_ana+MEEM+FATHA+ALEF
+                row[vconst.PronounAntuma_f] = conj_ana+MEEM+FATHA+ALEF
+                row[vconst.PronounAntum] = conj_ana+MEEM
+                row[vconst.PronounAntunna] = conj_ana+NOON+SHADDA+FATHA
+                row[vconst.PronounAna] = conj_ana
 
                 conj_nahnu = self.conjugate_tense_pronoun(tense,
                    vconst.PronounNahnu)
-                self.conj_display.add(tense, vconst.PronounNahnu, conj_nahnu)
+                row[vconst.PronounNahnu] = conj_nahnu
 
                 conj_hunna = self.conjugate_tense_pronoun(tense, 
                 vconst.PronounHunna)
-                self.conj_display.add(tense, vconst.PronounHunna, conj_hunna)
+                row[vconst.PronounHunna] = conj_hunna
 
                 conj_huma = self.conjugate_tense_pronoun(tense, 
                 vconst.PronounHuma)
-                self.conj_display.add(tense, vconst.PronounHuma, conj_huma)
+                row[vconst.PronounHuma] = conj_huma
 
                 conj_hum = self.conjugate_tense_pronoun(tense, 
                 vconst.PronounHum)
-                self.conj_display.add(tense, vconst.PronounHum, conj_hum)
+                row[vconst.PronounHum] = conj_hum
 
                 conj_hunna = self.conjugate_tense_pronoun(tense, 
                 vconst.PronounHunna)
-                self.conj_display.add(tense, vconst.PronounHunna, conj_hunna)
+                row[vconst.PronounHunna] = conj_hunna
 
                 conj_huwa = self.conjugate_tense_pronoun(tense, 
                 vconst.PronounHuwa)
-                self.conj_display.add(tense, vconst.PronounHuwa, conj_huwa)
+                row[vconst.PronounHuwa] = conj_huwa
                 conj_hya = self.conjugate_tense_pronoun(tense, 
                 vconst.PronounHya)
-                self.conj_display.add(tense, vconst.PronounHya, conj_hya)
-                self.conj_display.add(tense, vconst.PronounHuma_f, 
-                conj_hya[:-1]+FATHA+ALEF)
+                row[vconst.PronounHya] = conj_hya
+                row[vconst.PronounHuma_f] = conj_hya[:-1]+FATHA+ALEF
             elif tense == vconst.TensePassivePast:
                 conj_ana = self.conjugate_tense_pronoun(tense, 
                 vconst.PronounAna)
-                self.conj_display.add(tense, vconst.PronounAna, conj_ana)
+                row[vconst.PronounAna] = conj_ana
                 conj_ana_without_last_mark = conj_ana[:-1]
-                self.conj_display.add(tense, vconst.PronounAnta, 
-                conj_ana_without_last_mark+FATHA)
-                self.conj_display.add(tense, vconst.PronounAnti, 
-                conj_ana_without_last_mark+KASRA)
-                self.conj_display.add(tense, vconst.PronounAntuma, 
-                conj_ana+MEEM+FATHA+ALEF)
-                self.conj_display.add(tense, vconst.PronounAntuma_f, 
-                conj_ana+MEEM+FATHA+ALEF)
-                self.conj_display.add(tense, vconst.PronounAntum, 
-                conj_ana+MEEM)
-                self.conj_display.add(tense, vconst.PronounAntunna, 
-                conj_ana+NOON+SHADDA+FATHA)
-                self.conj_display.add(tense, vconst.PronounAna, conj_ana)
+                row[vconst.PronounAnta] = conj_ana_without_last_mark+FATHA
+                row[vconst.PronounAnti] = conj_ana_without_last_mark+KASRA
+                row[vconst.PronounAntuma] = conj_ana+MEEM+FATHA+ALEF
+                row[vconst.PronounAntuma_f] = conj_ana+MEEM+FATHA+ALEF
+                row[vconst.PronounAntum] = conj_ana+MEEM
+                row[vconst.PronounAntunna] = conj_ana+NOON+SHADDA+FATHA
+                row[vconst.PronounAna] = conj_ana
 
                 conj_nahnu = self.conjugate_tense_pronoun(tense, 
                 vconst.PronounNahnu)
-                self.conj_display.add(tense, vconst.PronounNahnu, 
-                conj_nahnu)
+                row[vconst.PronounNahnu] = conj_nahnu
 
                 conj_hunna = self.conjugate_tense_pronoun(tense, 
                 vconst.PronounHunna)
-                self.conj_display.add(tense, vconst.PronounHunna, 
-                conj_hunna)
+                row[vconst.PronounHunna] = conj_hunna
 
                 conj_hunna = self.conjugate_tense_pronoun(tense, 
                 vconst.PronounHunna)
-                self.conj_display.add(tense, vconst.PronounHunna, 
-                conj_hunna)
+                row[vconst.PronounHunna] = conj_hunna
 
                 conj_huwa = self.conjugate_tense_pronoun(tense, 
                 vconst.PronounHuwa)
-                self.conj_display.add(tense, vconst.PronounHuwa, conj_huwa)
+                row[vconst.PronounHuwa] = conj_huwa
                 conj_hum = self.conjugate_tense_pronoun(tense, 
                 vconst.PronounHum)
-                self.conj_display.add(tense, vconst.PronounHum, conj_hum)
+                row[vconst.PronounHum] = conj_hum
 # حالة الفعل مهموز الآخر
                 if conj_huwa.endswith(YEH+HAMZA+FATHA) :
-                    self.conj_display.add(tense, vconst.PronounHya, 
-                    conj_huwa[:-2]+YEH_HAMZA+FATHA+TEH+SUKUN)
-                    self.conj_display.add(tense, vconst.PronounHuma_f, 
-                    conj_huwa[:-2]+YEH_HAMZA+FATHA+TEH+FATHA+ALEF)
+                    row[vconst.PronounHya] = (conj_huwa[:-2]
+                    +YEH_HAMZA+FATHA+TEH+SUKUN)
+                    row[vconst.PronounHuma_f] = (conj_huwa[:-2]
+                    +YEH_HAMZA+FATHA+TEH+FATHA+ALEF)
 ##                       conj_huma=self.conjugate_tense_pronoun(tense, 
 ##                        vconst.PronounHuma)
-                    self.conj_display.add(tense, vconst.PronounHuma, 
-                    conj_huwa[:-2]+YEH_HAMZA+FATHA+ALEF)
+                    row[vconst.PronounHuma] = (conj_huwa[:-2]
+                    +YEH_HAMZA+FATHA+ALEF)
 
 ##                       conj_hum=self.conjugate_tense_pronoun(tense,
 #                             vconst.PronounHum)
-                    self.conj_display.add(tense, vconst.PronounHum, 
-                    conj_huwa[:-2]+YEH_HAMZA+DAMMA+WAW+ALEF)
+                    row[vconst.PronounHum] = (conj_huwa[:-2]
+                    +YEH_HAMZA+DAMMA+WAW+ALEF)
 
                 else :
-                    self.conj_display.add(tense, vconst.PronounHya, 
-                    conj_huwa+TEH+SUKUN)
-                    self.conj_display.add(tense, vconst.PronounHuma_f, 
-                    conj_huwa+TEH+FATHA+ALEF)
-                    self.conj_display.add(tense, vconst.PronounHuma, 
-                    conj_huwa+ALEF)
+                    row[vconst.PronounHya] = conj_huwa+TEH+SUKUN
+                    row[vconst.PronounHuma_f] = conj_huwa+TEH+FATHA+ALEF
+                    row[vconst.PronounHuma] = conj_huwa+ALEF
                     #~ if conj_huwa.endswith(KASRA+YEH+FATHA):
                         #~ self.conj_display.add(tense, vconst.PronounHum, 
                         #~ conj_huwa[:-3]+DAMMA+WAW+ALEF)
@@ -666,66 +751,49 @@ class VerbClass:
             vconst.TensePassiveConfirmedFuture):
                 conj_ana = self.conjugate_tense_pronoun(tense, 
                 vconst.PronounAna)
-                self.conj_display.add(tense, vconst.PronounAna, 
-                conj_ana)
+                row[vconst.PronounAna] = conj_ana
 
                 conj_anta = self.conjugate_tense_pronoun(tense, 
                 vconst.PronounAnta)
-                self.conj_display.add(tense, vconst.PronounAnta, 
-                conj_anta)
+                row[vconst.PronounAnta] = conj_anta
                 conj_anta_without_future_letter = conj_anta[1:]
 ##                    self.conj_display.add(tense, vconst.PronounAnta, 
 ##                  TEH+conj_ana_without_future_letter)
-                self.conj_display.add(tense, vconst.PronounNahnu, 
-                NOON+conj_anta_without_future_letter)
-                self.conj_display.add(tense, vconst.PronounHuwa, 
-                YEH+conj_anta_without_future_letter)
-                self.conj_display.add(tense, vconst.PronounHya, 
-                TEH+conj_anta_without_future_letter)
+                row[vconst.PronounNahnu] = NOON+conj_anta_without_future_letter
+                row[vconst.PronounHuwa] = YEH+conj_anta_without_future_letter
+                row[vconst.PronounHya] = TEH+conj_anta_without_future_letter
 
                 conj_anti = self.conjugate_tense_pronoun(tense, 
                 vconst.PronounAnti)
-                self.conj_display.add(tense, vconst.PronounAnti, 
-                conj_anti)
+                row[vconst.PronounAnti] = conj_anti
 
                 conj_antuma = self.conjugate_tense_pronoun(tense, 
                 vconst.PronounAntuma)
-                self.conj_display.add(tense, vconst.PronounAntuma, 
-                conj_antuma)
-                self.conj_display.add(tense, vconst.PronounAntuma_f, 
-                conj_antuma)
-                self.conj_display.add(tense, vconst.PronounHuma_f, 
-                conj_antuma)
-                self.conj_display.add(tense, vconst.PronounHuma, 
-                YEH+conj_antuma[1:])
+                row[vconst.PronounAntuma] = conj_antuma
+                row[vconst.PronounAntuma_f] = conj_antuma
+                row[vconst.PronounHuma_f] = conj_antuma
+                row[vconst.PronounHuma] = YEH+conj_antuma[1:]
 
                 conj_antum = self.conjugate_tense_pronoun(tense, 
                 vconst.PronounAntum)
-                self.conj_display.add(tense, vconst.PronounAntum, 
-                conj_antum)
-                self.conj_display.add(tense, vconst.PronounHum, 
-                YEH+conj_antum[1:])
+                row[vconst.PronounAntum] = conj_antum
+                row[vconst.PronounHum] = YEH+conj_antum[1:]
 
                 conj_antunna = self.conjugate_tense_pronoun(tense, 
                 vconst.PronounAntunna)
-                self.conj_display.add(tense, vconst.PronounAntunna, 
-                conj_antunna)
-                self.conj_display.add(tense, vconst.PronounHunna, 
-                YEH+conj_antunna[1:])
+                row[vconst.PronounAntunna] = conj_antunna
+                row[vconst.PronounHunna] = YEH+conj_antunna[1:]
             elif tense == vconst.TenseImperative or \
              tense == vconst.TenseConfirmedImperative:
                 for pron in  vconst.ImperativePronouns:
                     conj  =  self.conjugate_tense_pronoun(tense, pron)
-                    self.conj_display.add(tense, pron, conj)
+                    row[pron] = conj
         if not self.transitive:
             for tense in vconst.TablePassiveTense:
-                for pron in vconst.PronounsTableNotPassiveForUntransitive:
-                    self.conj_display.add(tense, pron, u"")
-# if the result is not diplyed directely on the screen, we return it
-        result  =  self.conj_display.display(self.conj_display.mode, 
-        listtense)
-        if result:
-            return result
+                if tense in table:
+                    for pron in vconst.PronounsTableNotPassiveForUntransitive:
+                        table[tense][pron] = u""
+        return table
 
     def conjugate_tense_for_pronoun(self, tense, pronoun):
         """
@@ -744,6 +812,8 @@ class VerbClass:
         #  for each tense we have two pronouns lists: 
         #    - direct conjugated pronouns.
         #    - indirect conjugated pronouns.
+        if self.conj_display is None:
+            self._create_display()
 
         if tense == vconst.TensePast:
             # direct concongated pronouns
@@ -1079,6 +1149,8 @@ class VerbClass:
         @return : conjugated form of verb if exists.
         @rtype : unicode
         """
+        if self.conj_display is None:
+            return u""
         return self.conj_display.get_conj(tense, pronoun)
 
     def get_pronoun_features(self, pronoun):
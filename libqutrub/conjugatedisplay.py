@@ -468,13 +468,17 @@ class ConjugateDisplay:
                 hight_text += text[i]
         return hight_text
 
-    def display_table(self, listtense):
+    def display_table(self, listtense, listpronoun = None):
         """Display The conjugation result for a list of tenses, as array.
         @param listtense: the given tenses list to display result
         @type listtense: list of unicode
+        @param listpronoun: the displayed pronouns, default all pronouns.
+        @type listpronoun: list of unicode
         @return: the result as table, the table[0] contains pronouns.
         @rtype: dict with number indice.
         """    
+        if not listpronoun:
+            listpronoun = vconst.PronounsTable
         table = {}
 
         j = 0
@@ -482,7 +486,7 @@ class ConjugateDisplay:
         for j in range(len(listtense)):
             table[0][j+1] = listtense[j]
         i = 1
-        for pronoun in vconst.PronounsTable:
+        for pronoun in listpronoun:
             table[i] = {}
             table[i][0] = pronoun
             j = 1
@@ -0,0 +1,384 @@
+#!/usr/bin/python
+# -*- coding=utf-8 -*-
+#************************************************************************
+# Conjugation store
+#
+# Description:
+# Precomputed conjugations of the lexicon verbs, stored in SQLite
+#
+# Copyright (c) 2026, Qutrub-ng Project
+#
+#***********************************************************************/
+"""
+The conjugation store keeps the conjugation of all lexicon verbs
+(verbdict and verbmore tables) in all tenses, in an SQLite file.
+Every verb is stored in one row, indexed by
+(verb, future type, transitive), the conjugation table is packed and
+compressed.
+The store is built by tools/build_conjugation_store.py, if the store file
+is not found, the lookup gives None and the verb is conjugated.
+The store keeps a hash of the conjugation sources and of the dictionary
+it's built from, a store which doesn't match them is not used. The store
+file is checked again when it's replaced, a rebuilt store is used
+without restart.
+"""
+import os
+import json
+import zlib
+import hashlib
+import sqlite3
+import logging
+import threading
+
+import pyarabic.araby as araby
+import libqutrub.ar_verb as ar_verb
+import libqutrub.verb_const as vconst
+import libqutrub.verb_valid as verb_valid
+import libqutrub.verb_template as verb_template
+import libqutrub.db_pool as db_pool
+
+# the store format version, a store with another version is not used
+STORE_VERSION = "2"
+# the default store file
+STORE_PATH = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "data", "conjugations.db")
+# the tenses and pronouns are packed by their index in those tables
+TENSES = list(vconst.TABLE_TENSE)
+PRONOUNS = list(vconst.PronounsTable)
+# number of verbs written in one transaction
+BUILD_BATCH_SIZE = 500
+# the modules of the conjugation engine, a store built by other sources
+# is not used
+SOURCE_FILES = ("ar_verb.py", "classverb.py", "verb_const.py",
+    "verb_template.py", "verb_valid.py")
+# the lexicon verbs, with their future type and transitivity
+LEXICON_QUERY = """select verb_vocalised, haraka, transitive
+                from verbdict
+                union
+                select verb, ?, transitive
+                from verbmore"""
+
+# the store file, its state, its dictionary file and the signature of
+# both files when the store is checked
+_store = {"path":STORE_PATH, "valid":None, "dictionary":None,
+    "signature":None}
+_lock = threading.Lock()
+# the hash of the conjugation sources, computed once
+_sources = {}
+
+
+def set_store_path(path):
+    """
+    Set the store file, the lookups use the new file.
+    @param path: the store file path, None to disable the store.
+    @type path: string.
+    """
+    with _lock:
+        if _store["path"]:
+            db_pool.reset(_store["path"])
+        _store["path"] = path
+        _store["valid"] = None
+        _store["dictionary"] = None
+        _store["signature"] = None
+
+
+def pack_table(table):
+    """
+    Pack a raw conjugation table as compressed bytes.
+    @param table: conjugation table {tense:{pronoun:conjugated}}
+    @type table: dict of dict
+    @return: packed table.
+    @rtype: bytes
+    """
+    # the order of pronouns is kept, it's used by the display
+    packed = []
+    for tense in table:
+        packed.append([TENSES.index(tense), [[PRONOUNS.index(pronoun),
+            table[tense][pronoun]] for pronoun in table[tense]]])
+    return zlib.compress(json.dumps(packed, ensure_ascii=False,
+        separators=(",", ":")).encode("utf-8"), 9)
+
+
+def unpack_table(packed, listtense = None):
+    """
+    Unpack a conjugation table packed by pack_table.
+    @param packed: packed table.
+    @type packed: bytes
+    @param listtense: the tenses to unpack, default all tenses.
+    @type listtense: list of unicode.
+    @return: conjugation table {tense:{pronoun:conjugated}}
+    @rtype: dict of dict
+    """
+    if not listtense:
+        listtense = vconst.TABLE_TENSE
+    full_table = {}
+    for (tense, cells) in json.loads(zlib.decompress(packed).decode("utf-8")):
+        full_table[TENSES[tense]] = dict((PRONOUNS[pronoun], conj)
+            for (pronoun, conj) in cells)
+    table = {}
+    for tense in listtense:
+        table[tense] = full_table.get(tense, {})
+    return table
+
+
+def file_signature(path):
+    """
+    Get the signature of a file, changed when it's written or replaced.
+    @return: (modification time, size, inode), None if the file is missing.
+    @rtype: tuple
+    """
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def sources_hash():
+    """
+    Get the hash of the conjugation engine sources (SOURCE_FILES).
+    @rtype: string
+    """
+    if "hash" not in _sources:
+        digest = hashlib.blake2b(STORE_VERSION.encode("utf-8"),
+            digest_size=16)
+        directory = os.path.dirname(os.path.abspath(__file__))
+        for name in SOURCE_FILES:
+            with open(os.path.join(directory, name), "rb") as source:
+                digest.update(source.read())
+        _sources["hash"] = digest.hexdigest()
+    return _sources["hash"]
+
+
+def lexicon_rows(db_file):
+    """
+    Get the (verb, haraka, transitive) rows of the lexicon database,
+    read only.
+    @param db_file: the verbdict database file.
+    @type db_file: string.
+    @rtype: list of tuple.
+    @raise sqlite3.Error: the database can't be read.
+    """
+    with db_pool.connection(db_file) as conn:
+        return conn.execute(LEXICON_QUERY, (u"فتحة", )).fetchall()
+
+
+def dictionary_hash(db_file):
+    """
+    Get the hash of the lexicon verbs of a dictionary, the other columns
+    and the file layout are not hashed.
+    @param db_file: the verbdict database file.
+    @type db_file: string.
+    @return: the hash, None if the dictionary can't be read.
+    @rtype: string
+    """
+    try:
+        rows = lexicon_rows(db_file)
+    except sqlite3.Error:
+        return None
+    digest = hashlib.blake2b(digest_size=16)
+    for row in sorted(rows, key=lambda row: [field or "" for field in row]):
+        digest.update(json.dumps(row, ensure_ascii=False).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def check_store(path):
+    """
+    Check that a store can be used: it has the store version, and it's
+    built by the same conjugation sources, from the same dictionary.
+    @param path: the store file.
+    @type path: string.
+    @return: (valid, dictionary file), the dictionary file is None if the
+    store is not built from a dictionary.
+    @rtype: tuple
+    """
+    if not os.path.exists(path):
+        return (False, None)
+    try:
+        with db_pool.connection(path) as conn:
+            info = dict(conn.execute("select key, value from store_info"))
+    except sqlite3.Error:
+        logging.exception("conjugation store: can't open %s", path)
+        return (False, None)
+    if info.get("version") != STORE_VERSION:
+        logging.warning("conjugation store: %s has another version", path)
+        return (False, None)
+    if info.get("sources") != sources_hash():
+        logging.warning("conjugation store: %s is built by other "
+            "conjugation sources", path)
+        return (False, None)
+    dictionary = None
+    if info.get("dictionary_file"):
+        # the dictionary is given relative to the store directory
+        dictionary = os.path.join(os.path.dirname(path),
+            info["dictionary_file"])
+        if dictionary_hash(dictionary) != info.get("dictionary"):
+            logging.warning("conjugation store: %s is built from another "
+                "dictionary", path)
+            return (False, dictionary)
+    return (True, dictionary)
+
+
+def _get_pool():
+    """
+    Get the connection pool of the store, the store is checked on the
+    first use, and again when the store or its dictionary are changed.
+    @return: a connection pool or None if the store is not available.
+    @rtype: db_pool.ConnectionPool
+    """
+    path = _store["path"]
+    if not path:
+        return None
+    signature = (file_signature(path), file_signature(_store["dictionary"]))
+    if signature != _store["signature"]:
+        with _lock:
+            if path == _store["path"] and signature != _store["signature"]:
+                # the connections to a replaced store are dropped
+                db_pool.reset(path)
+                (valid, dictionary) = check_store(path)
+                _store["valid"] = valid
+                _store["dictionary"] = dictionary
+                _store["signature"] = (file_signature(path),
+                    file_signature(dictionary))
+    if not _store["valid"]:
+        return None
+    return db_pool.get_pool(path)
+
+
+def load():
+    """
+    Open the store, it's opened on the first lookup if not loaded.
+    @return: True if the store is available.
+    @rtype: Boolean
+    """
+    return _get_pool() is not None
+
+
+def lookup(word, future_type, transitive, listtense = None):
+    """
+    Get the precomputed conjugation of a verb.
+    @param word: the given verb.
+    @type word: unicode.
+    @param future_type: the future mark (Fatha, Damma, Kasra).
+    @type future_type: unicode char.
+    @param transitive: the verb is transitive or not.
+    @type transitive: Boolean.
+    @param listtense: the conjugated tenses, default all tenses.
+    @type listtense: list of unicode.
+    @return: (conjugation table, verb type, future form),
+    or None if the verb is not stored.
+    @rtype: tuple
+    """
+    pool = _get_pool()
+    if pool is None:
+        return None
+    with pool.connection() as conn:
+        row = conn.execute("""select vtype, future_form, forms
+                    from conjugation
+                    where verb = ? and future_type = ? and transitive = ?""",
+            (word, future_type, int(bool(transitive)))).fetchone()
+    if not row:
+        return None
+    return (unpack_table(row[2], listtense), row[0], row[1])
+
+
+def lexicon_entries(db_file):
+    """
+    Get the verbs of the lexicon database, with their future type
+    and transitivity settings.
+    The common verbs are given as transitive and intransitive.
+    @param db_file: the verbdict database file.
+    @type db_file: string.
+    @return: (verb, future_type, transitive)
+    @rtype: generator of tuple.
+    """
+    for (verb, haraka, transitive) in lexicon_rows(db_file):
+        if not verb:
+            continue
+        future_type = ar_verb.get_future_type_by_name(haraka)
+        # MEEM is transitive, LAM is intransitive
+        # KAF, and LAM with MEEM are common
+        if transitive == araby.KAF or (transitive and
+           araby.LAM in transitive and araby.MEEM in transitive):
+            settings = (True, False)
+        else:
+            settings = (transitive == araby.MEEM, )
+        for setting in settings:
+            yield (verb, future_type, setting)
+
+
+def build(db_file, store_file, entries = None):
+    """
+    Build the conjugation store of the lexicon verbs.
+    @param db_file: the verbdict database file.
+    @type db_file: string.
+    @param store_file: the store file, replaced if it exists.
+    @type store_file: string.
+    @param entries: (verb, future_type, transitive) to store,
+    default all verbs of the lexicon.
+    @type entries: iterable of tuple.
+    @return: number of stored conjugations.
+    @rtype: integer
+    """
+    info = [("version", STORE_VERSION), ("sources", sources_hash())]
+    if db_file:
+        info.append(("dictionary", dictionary_hash(db_file)))
+        info.append(("dictionary_file", os.path.relpath(
+            os.path.abspath(db_file),
+            os.path.dirname(os.path.abspath(store_file)))))
+    if entries is None:
+        entries = lexicon_entries(db_file)
+    tmp_file = store_file + ".tmp"
+    if os.path.exists(tmp_file):
+        os.remove(tmp_file)
+    conn = sqlite3.connect(tmp_file)
+    conn.execute("""create table conjugation (
+                verb text not null,
+                future_type text not null,
+                transitive integer not null,
+                vtype text,
+                future_form text,
+                forms blob,
+                primary key (verb, future_type, transitive)
+                ) without rowid""")
+    conn.execute("create table store_info (key text primary key, value text)")
+    conn.executemany("insert into store_info values (?, ?)", info)
+    count = 0
+    batch = []
+    seen = set()
+    for (verb, future_type, transitive) in entries:
+        key = (verb, future_type, bool(transitive))
+        if key in seen or not verb_valid.is_valid_infinitive_verb(verb):
+            continue
+        seen.add(key)
+        try:
+            (table, vtype, future_form) = verb_template.conjugate_raw(verb,
+                future_type, transitive)
+        except Exception:
+            logging.exception("conjugation store: can't conjugate %s", verb)
+            continue
+        batch.append((verb, future_type, int(bool(transitive)), vtype,
+            future_form, pack_table(table)))
+        if len(batch) >= BUILD_BATCH_SIZE:
+            count += _write_batch(conn, batch)
+            batch = []
+    count += _write_batch(conn, batch)
+    conn.close()
+    os.replace(tmp_file, store_file)
+    db_pool.reset(store_file)
+    set_store_path(_store["path"])
+    return count
+
+
+def _write_batch(conn, batch):
+    """
+    Write a batch of packed conjugations in one transaction.
+    @return: number of written rows.
+    @rtype: integer
+    """
+    with conn:
+        conn.executemany("insert into conjugation values (?, ?, ?, ?, ?, ?)",
+            batch)
+    return len(batch)
@@ -22,9 +22,13 @@ Just a wraper for mosaref_main
 The main function to call qutrub conjugation from other programs.
 """
 #
+import itertools
+import logging
 import libqutrub.mosaref_main
 from . import verb_form_detector
 from . import verb_const
+# default number of verbs sent together to a worker process
+BATCH_CHUNK_SIZE = 64
 # rename the function
 def conjugate(word, future_type, alltense = True, past = False, future = False,
 passive = False, imperative = False, future_moode = False, confirmed = False,
@@ -94,6 +98,103 @@ passive , imperative , future_moode , confirmed ,
  transitive , display_format)
 
 
+def conjugate_many(verbs, alltense = True, past = False, future = False,
+passive = False, imperative = False, future_moode = False, confirmed = False,
+ display_format = "DICT", max_workers = None, chunksize = BATCH_CHUNK_SIZE,
+ ordered = True):
+    """
+    Conjugate a batch of verbs, the work is spread over a process pool.
+    Example:
+        >>> verbs = [(u"كَتَبَ", u"ضمة", True), (u"اِسْتَعْمَلَ", u"فتحة", True)]
+        >>> for item, table in conjugate_many(verbs):
+        ...     print(item[0], table[u"الماضي المعلوم"][u"هو"])
+    @param verbs: verbs to conjugate, as (verb, future_type, transitive)
+    @type verbs: iterable of tuples.
+    @param alltense: conjugate in all arabic tenses.
+    @type alltense: Boolean, default(True)
+    @param past: conjugate in past tense ألماضي
+    @type past: Boolean, default(False)
+    @param future: conjugate in arabic present and future tenses المضارع
+    @type future: Boolean, default(False)
+    @param passive: conjugate in passive voice  المبني للمجهول
+    @type passive: Boolean, default(False)
+    @param imperative: conjugate in imperative tense الأمر
+    @type imperative: Boolean, default(False)
+    @param future_moode: conjugate in future moode tenses المضارع المنصوب والمجزوم
+    @type future_moode: Boolean, default(False)
+    @param confirmed: conjugate in confirmed cases tense المؤكّد
+    @type confirmed: Boolean, default(False)
+    @param display_format: the display format, see conjugate.
+    @type display_format: string, default("DICT")
+    @param max_workers: number of worker processes, default the number
+    of CPUs; 1 conjugates in the current process.
+    @type max_workers: int or None
+    @param chunksize: number of verbs sent together to a worker.
+    @type chunksize: int
+    @param ordered: yield results in the input order if True,
+    else as they are completed.
+    @type ordered: Boolean, default(True)
+    @return: (verb tuple, conjugation result) for every given verb,
+    the result is None if the verb is invalid.
+    @rtype: generator of tuples.
+    """
+    options = (alltense, past, future, passive, imperative, future_moode,
+        confirmed, display_format)
+    chunks = _split_chunks(verbs, max(1, chunksize))
+    if max_workers == 1:
+        for chunk in chunks:
+            for item_result in _conjugate_chunk(chunk, options):
+                yield item_result
+        return
+    # the process pool is imported only when it's used
+    import concurrent.futures
+    with concurrent.futures.ProcessPoolExecutor(max_workers) as executor:
+        if ordered:
+            results = executor.map(_conjugate_chunk, chunks,
+                itertools.repeat(options))
+        else:
+            jobs = [executor.submit(_conjugate_chunk, chunk, options)
+                for chunk in chunks]
+            results = (job.result() for job in
+                concurrent.futures.as_completed(jobs))
+        for chunk_result in results:
+            for item_result in chunk_result:
+                yield item_result
+
+
+def _split_chunks(verbs, chunksize):
+    """
+    Split the verbs iterable into lists of chunksize items.
+    """
+    iterator = iter(verbs)
+    chunk = list(itertools.islice(iterator, chunksize))
+    while chunk:
+        yield chunk
+        chunk = list(itertools.islice(iterator, chunksize))
+
+
+def _conjugate_chunk(chunk, options):
+    """
+    Conjugate a list of (verb, future_type, transitive),
+    used as the worker function of conjugate_many.
+    @return: list of (verb tuple, conjugation result)
+    @rtype: list of tuples.
+    """
+    (alltense, past, future, passive, imperative, future_moode, confirmed,
+        display_format) = options
+    results = []
+    for item in chunk:
+        (word, future_type, transitive) = item
+        try:
+            result = libqutrub.mosaref_main.do_sarf(word, future_type,
+                alltense, past, future, passive, imperative, future_moode,
+                confirmed, transitive, display_format)
+        except Exception:
+            logging.exception("conjugate_many: can't conjugate %s", word)
+            result = None
+        results.append((item, result))
+    return results
+
 def create_verb_forms_table(word, form_filter=None, transitive=False):
     """
     Create a table showing all 10 Arabic verb forms for a given verb
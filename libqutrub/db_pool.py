@@ -0,0 +1,210 @@
+#!/usr/bin/python
+# -*- coding=utf-8 -*-
+#************************************************************************
+# Database pool
+#
+# Description:
+# Pooled read-only connections to the SQLite data files
+#
+# Copyright (c) 2026, Qutrub-ng Project
+#
+#***********************************************************************/
+"""
+Read-only connections to the SQLite data files (verb dictionary,
+conjugation store, analyzer index).
+The connections of a file are kept in a pool and reused by all threads,
+a connection is used by one thread at a time. A connection is opened in
+read-only URI mode, with query_only, memory map and cache pragmas, and
+its prepared statements are kept by the sqlite3 statement cache, so the
+same query text is prepared once by connection.
+The files which are never written while open can be opened as
+immutable, sqlite doesn't lock them. The verb dictionary is not
+immutable, it's updated in place by the tools (prepare_database,
+build_future_forms), its readers must see the writes or the old state.
+All connections are closed at exit.
+A connection can't be used across fork: a forked process (worker pools)
+drops the pools of its parent, without closing them, and opens its own
+connections.
+
+    with db_pool.connection(path) as conn:
+        rows = conn.execute(query, args).fetchall()
+"""
+import os
+import atexit
+import sqlite3
+import threading
+import contextlib
+import urllib.parse
+
+# maximum number of idle connections kept by file
+POOL_SIZE = 8
+# number of prepared statements kept by connection
+STATEMENT_CACHE_SIZE = 128
+# pragmas of every connection
+PRAGMAS = ["pragma query_only = 1",
+    # memory mapped size in bytes
+    "pragma mmap_size = %d" % (64 * 1024 * 1024),
+    # page cache size in KiB
+    "pragma cache_size = -%d" % (8 * 1024),
+    ]
+
+
+class ConnectionPool:
+    """
+    A pool of read-only connections to an SQLite file.
+    """
+    def __init__(self, path, immutable=False, maxsize=POOL_SIZE):
+        """
+        init method
+        @param path: the database file.
+        @type path: string.
+        @param immutable: the file is not changed while it's open.
+        @type immutable: Boolean.
+        @param maxsize: maximum number of idle connections.
+        @type maxsize: integer.
+        """
+        self.path = os.path.abspath(path)
+        self.immutable = immutable
+        self.maxsize = maxsize
+        self.closed = False
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _open(self):
+        """
+        Open a new connection.
+        @rtype: sqlite3.Connection
+        """
+        uri = "file:%s?mode=ro" % urllib.parse.quote(self.path)
+        if self.immutable:
+            uri += "&immutable=1"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self):
+        """
+        Get an idle connection, or open a new one.
+        @return: a connection, to be given back by release.
+        @rtype: sqlite3.Connection
+        """
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._open()
+
+    def release(self, conn):
+        """
+        Give back a connection to the pool, it's closed if the pool is full
+        or closed.
+        @param conn: a connection given by acquire.
+        @type conn: sqlite3.Connection
+        """
+        with self._lock:
+            if not self.closed and len(self._idle) < self.maxsize:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    @contextlib.contextmanager
+    def connection(self):
+        """
+        Use a connection of the pool inside a with block.
+        """
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        """
+        Close the idle connections, the used connections are closed
+        when they are released.
+        """
+        with self._lock:
+            self.closed = True
+            idle = self._idle
+            self._idle = []
+        for conn in idle:
+            conn.close()
+
+
+# the pools by (file path, immutable)
+_pools = {}
+_lock = threading.Lock()
+# the pools of the parent process, kept in a forked process: their
+# connections can't be used nor closed there
+_inherited = []
+
+
+def get_pool(path, immutable=False):
+    """
+    Get the connection pool of a file.
+    @param path: the database file.
+    @type path: string.
+    @param immutable: the file is not changed while it's open.
+    @type immutable: Boolean.
+    @rtype: ConnectionPool
+    """
+    key = (os.path.abspath(path), immutable)
+    pool = _pools.get(key)
+    if pool is None:
+        with _lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = ConnectionPool(path, immutable)
+                _pools[key] = pool
+    return pool
+
+
+def connection(path, immutable=False):
+    """
+    Use a pooled connection to a file inside a with block.
+    @param path: the database file.
+    @type path: string.
+    @param immutable: the file is not changed while it's open.
+    @type immutable: Boolean.
+    """
+    return get_pool(path, immutable).connection()
+
+
+def reset(path):
+    """
+    Close the connections to a file, used when the file is replaced.
+    @param path: the database file.
+    @type path: string.
+    """
+    path = os.path.abspath(path)
+    with _lock:
+        pools = [_pools.pop(key) for key in list(_pools) if key[0] == path]
+    for pool in pools:
+        pool.close()
+
+
+def close_all():
+    """
+    Close all connections, called at exit.
+    """
+    with _lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+def _after_fork():
+    """
+    Drop the pools of the parent process in a forked process, the
+    connections are opened again on the next use.
+    """
+    global _lock
+    _lock = threading.Lock()
+    _inherited.append(list(_pools.values()))
+    _pools.clear()
+
+atexit.register(close_all)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
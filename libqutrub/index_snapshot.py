@@ -0,0 +1,222 @@
+#!/usr/bin/python
+# -*- coding=utf-8 -*-
+#************************************************************************
+# Index snapshot
+#
+# Description:
+# Prebuilt lookup structures, loaded in one read at start
+#
+# Copyright (c) 2026, Qutrub-ng Project
+#
+#***********************************************************************/
+"""
+The index snapshot keeps the lookup structures derived from the verbs
+data (the compact triliteral verbs lexicon) and from the verb dictionary
+(the verbmore stamp index, the verb search index), which are built at
+every process start otherwise.
+The snapshot is one file, marshaled dicts by section, with a format
+version and the hash of the source data files, a snapshot with another
+version or hash is not used, and the structures are built from the source.
+The dictionary sections are kept with the hash of the dictionary file
+they are built from, they are decoded on their first use, and not used
+for another dictionary.
+The snapshot is built by tools/build_index_snapshot.py.
+
+    state = index_snapshot.get_section("triverb_lexicon")
+    state = index_snapshot.get_dictionary_section("verbmore_stamps", db_file)
+"""
+import os
+import marshal
+import logging
+import threading
+
+# the snapshot format version, a snapshot with another version is not used
+SNAPSHOT_VERSION = 3
+# the file starts with a magic string
+SNAPSHOT_MAGIC = b"QUTRUBIX"
+LIB_DIR = os.path.dirname(os.path.abspath(__file__))
+# the default snapshot file
+SNAPSHOT_PATH = os.path.join(os.path.dirname(LIB_DIR), "data",
+    "index.snapshot")
+# the source data files of the snapshot sections
+SOURCE_FILES = [os.path.join(LIB_DIR, "triverbtable.py")]
+# the default dictionary file of the dictionary sections
+DICTIONARY_PATH = os.path.join(os.path.dirname(LIB_DIR), "data",
+    "verbdict.db")
+
+# the snapshot file and its loaded sections
+_snapshot = {"path":SNAPSHOT_PATH, "sections":None}
+_lock = threading.Lock()
+# the hashes of the dictionary files {path:(signature, hash)}
+_dictionary_hashes = {}
+
+
+def set_snapshot_path(path):
+    """
+    Set the snapshot file, the loaded sections are dropped.
+    @param path: the snapshot file path, None to disable the snapshot.
+    @type path: string.
+    """
+    with _lock:
+        _snapshot["path"] = path
+        _snapshot["sections"] = None
+
+
+def source_hash(files = None):
+    """
+    Get the hash of the source data files.
+    @param files: the source files, default SOURCE_FILES.
+    @type files: list of string.
+    @return: sha1 hex digest.
+    @rtype: string
+    """
+    # hashlib is imported when the snapshot is read only
+    import hashlib
+    digest = hashlib.sha1()
+    for filename in files or SOURCE_FILES:
+        digest.update(os.path.basename(filename).encode("utf-8"))
+        with open(filename, "rb") as infile:
+            digest.update(infile.read())
+    return digest.hexdigest()
+
+
+def dictionary_hash(db_file):
+    """
+    Get the hash of a dictionary file content, computed again when the
+    file is changed.
+    @param db_file: the verbdict database file.
+    @type db_file: string.
+    @return: sha1 hex digest, None if the file is missing.
+    @rtype: string
+    """
+    import hashlib
+    db_file = os.path.abspath(db_file)
+    try:
+        stat = os.stat(db_file)
+    except OSError:
+        return None
+    signature = (stat.st_mtime_ns, stat.st_size)
+    known = _dictionary_hashes.get(db_file)
+    if known is None or known[0] != signature:
+        digest = hashlib.sha1()
+        with open(db_file, "rb") as infile:
+            for block in iter(lambda: infile.read(1024 * 1024), b""):
+                digest.update(block)
+        known = (signature, digest.hexdigest())
+        _dictionary_hashes[db_file] = known
+    return known[1]
+
+
+def _read(path):
+    """
+    Read the sections of a snapshot file.
+    @return: the sections or None if the file is missing or not valid.
+    @rtype: dict
+    """
+    try:
+        with open(path, "rb") as infile:
+            data = infile.read()
+    except OSError:
+        return None
+    if not data.startswith(SNAPSHOT_MAGIC):
+        logging.warning("index snapshot: %s is not a snapshot", path)
+        return None
+    try:
+        snapshot = marshal.loads(memoryview(data)[len(SNAPSHOT_MAGIC):])
+    except (EOFError, ValueError, TypeError):
+        logging.warning("index snapshot: %s is corrupted", path)
+        return None
+    if not isinstance(snapshot, dict) \
+       or snapshot.get("version") != SNAPSHOT_VERSION:
+        logging.warning("index snapshot: %s has another version", path)
+        return None
+    if snapshot.get("source_hash") != source_hash():
+        logging.warning("index snapshot: %s is older than the data", path)
+        return None
+    return snapshot["sections"]
+
+
+def load():
+    """
+    Load the snapshot, once.
+    @return: the sections {name:structure}, None if not available.
+    @rtype: dict
+    """
+    if _snapshot["sections"] is None:
+        with _lock:
+            if _snapshot["sections"] is None:
+                path = _snapshot["path"]
+                _snapshot["sections"] = (path and _read(path)) or {}
+    return _snapshot["sections"] or None
+
+
+def get_section(name):
+    """
+    Get a section of the snapshot.
+    @param name: section name.
+    @type name: string.
+    @return: the structure of the section, None if not available.
+    """
+    sections = load()
+    if not sections:
+        return None
+    return sections.get(name)
+
+
+def get_dictionary_section(name, db_file):
+    """
+    Get a dictionary section of the snapshot, if it's built from the
+    given dictionary file.
+    @param name: section name.
+    @type name: string.
+    @param db_file: the verbdict database file.
+    @type db_file: string.
+    @return: the structure of the section, None if not available.
+    """
+    section = get_section(name)
+    if not section:
+        return None
+    if section["dictionary"] != dictionary_hash(db_file):
+        logging.info("index snapshot: %s is built from another dictionary",
+            name)
+        return None
+    return marshal.loads(section["data"])
+
+
+def build(path = None, db_file = None):
+    """
+    Build the snapshot from the source data.
+    @param path: the snapshot file, default SNAPSHOT_PATH.
+    @type path: string.
+    @param db_file: the verbdict database file of the dictionary sections,
+    default DICTIONARY_PATH, they are not built if it's missing.
+    @type db_file: string.
+    @return: the names of the sections.
+    @rtype: list of string
+    """
+    import libqutrub.verb_db as verb_db
+    import libqutrub.verb_search as verb_search
+    path = path or SNAPSHOT_PATH
+    db_file = db_file or DICTIONARY_PATH
+    lexicon = verb_db.TriVerbLexicon.from_table(
+        verb_db.load_triverbtable_source())
+    sections = {"triverb_lexicon":lexicon.get_state(),
+        }
+    if os.path.exists(db_file):
+        digest = dictionary_hash(db_file)
+        for (name, index) in (
+                ("verbmore_stamps", verb_db.build_stamp_index(db_file)),
+                ("verb_search", verb_search.SearchIndex(
+                    verb_search.lexicon_entries(db_file)))):
+            # the section is decoded on its first use
+            sections[name] = {"dictionary":digest,
+                "data":marshal.dumps(index.get_state())}
+    data = marshal.dumps({"version":SNAPSHOT_VERSION,
+        "source_hash":source_hash(), "sections":sections})
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as outfile:
+        outfile.write(SNAPSHOT_MAGIC)
+        outfile.write(data)
+    os.replace(tmp_path, path)
+    set_snapshot_path(_snapshot["path"])
+    return sorted(sections)
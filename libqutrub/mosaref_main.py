@@ -26,9 +26,12 @@ import libqutrub.verb_valid  as verb_valid
 import libqutrub.verb_const  as vconst
 import pyarabic.araby as araby
 import libqutrub.verb_db  as verb_db
-verb_db.create_index_triverbtable()
-#~ """ you need to create the trileteral verb dictionary  
-# index to search within triverbs."""
+import libqutrub.verb_cache  as verb_cache
+import libqutrub.verb_template  as verb_template
+import libqutrub.conjugation_store  as conjugation_store
+import libqutrub.verb_search  as verb_search
+# the trileteral verb dictionary and its index are loaded on the first use,
+# servers can load them at start with warmup()
 
 def do_sarf(word, future_type, alltense = True, past = False, future = False, 
 passive = False, imperative = False, future_moode = False, confirmed = False,
@@ -80,12 +83,8 @@ passive = False, imperative = False, future_moode = False, confirmed = False,
     if valid:
         future_type = ar_verb.get_future_type_by_name(future_type)
         #~ bab_sarf = 0
-        #init the verb class to treat the verb
-        vbc = classverb.VerbClass(word, transitive, future_type)
-        vbc.set_display(display_format)
-
         if alltense :
-            result =  vbc.conjugate_all_tenses()
+            listetenses = vconst.TABLE_TENSE
         else :
             listetenses = []
             if past :
@@ -111,30 +110,127 @@ passive = False, imperative = False, future_moode = False, confirmed = False,
                 listetenses.append(vconst.TensePassiveJussiveFuture)
             if imperative :
                 listetenses.append(vconst.TenseImperative)
-            result  = vbc.conjugate_all_tenses(listetenses)
-        return result
+        if not listetenses:
+            listetenses = vconst.TABLE_TENSE
+        conj_display = get_conjugation_display(word, future_type, transitive,
+         listetenses)
+        conj_display.setmode(display_format)
+        result = conj_display.display(display_format, listetenses)
+        if result:
+            return result
+        return None
     else: return None
 
-def get_future_form(verb_vocalised, haraka = araby.FATHA):
+def get_conjugation_display(word, future_type, transitive, listtense = None):
+    """
+    Get a display object filled with the conjugation of a verb.
+    The raw conjugation table is kept in the result cache,
+    a verb conjugated before is not conjugated again.
+    @param word: the given verb.
+    @type word: unicode.
+    @param future_type: the future mark, or its name (فتحة، ضمة، كسرة).
+    @type future_type: unicode.
+    @param transitive: the verb transitivity التعدي واللزوم
+    @type transitive: Boolean.
+    @param listtense: the conjugated tenses, default all tenses.
+    @type listtense: list of unicode.
+    @return: the display object with the conjugation result.
+    @rtype: conjugatedisplay.ConjugateDisplay
+    """
+    future_type = ar_verb.get_future_type_by_name(future_type)
+    (table, vtype, future_form) = get_conjugation_raw(word, future_type,
+     transitive, listtense)
+    return classverb.create_display(word, transitive, future_type, vtype,
+     future_form, table)
+
+def get_conjugation_raw(word, future_type, transitive, listtense = None):
+    """
+    Get the raw conjugation table of a verb, without display object.
+    The result is kept in the result cache, it must not be modified.
+    @param word: the given verb.
+    @type word: unicode.
+    @param future_type: the future mark, or its name (فتحة، ضمة، كسرة).
+    @type future_type: unicode.
+    @param transitive: the verb transitivity التعدي واللزوم
+    @type transitive: Boolean.
+    @param listtense: the conjugated tenses, default all tenses.
+    @type listtense: list of unicode.
+    @return: (conjugation table {tense:{pronoun:conjugated}}, verb type,
+    future form)
+    @rtype: tuple
+    """
+    future_type = ar_verb.get_future_type_by_name(future_type)
+    if not listtense:
+        listtense = vconst.TABLE_TENSE
+    key = verb_cache.result_key(word, future_type, transitive, listtense)
+    result = verb_cache.RESULT_CACHE.get(key)
+    if result is None:
+        # the lexicon verbs are precomputed in the conjugation store
+        result = conjugation_store.lookup(word, future_type, transitive,
+         listtense)
+        if result is None:
+            # verbs of the same class share the same paradigm template
+            result = verb_template.conjugate_raw(word, future_type,
+             transitive, listtense)
+        verb_cache.RESULT_CACHE.set(key, result)
+    return result
+
+def get_future_form(verb_vocalised, haraka = araby.FATHA, db_base_path = None):
     """
     Get The future form of a verb. for example the future form of
      qal with Damma as a Haraka of future verb, we get yqolu.
     الحصول على صيغة الفعل في المضارع، فالفعل قال، وحركة عينه في المضارع صمة، نحصل على يقول.
+    The future form is taken from the future form cache, or from the
+    precomputed future forms of the dictionary, else the verb is conjugated.
     @param verb_vocalised: given verb.
     @type verb_vocalised:unicode.
     @param haraka: the future mark for triverbs.
     @type haraka: unicode.
+    @param db_base_path: the database path of the dictionary,
+    if None, the dictionary is not used.
+    @type db_base_path: path string.
     @return: The conjugated form in the future tense.
     @rtype: unicode.
     """
     word = verb_vocalised
-    transitive = True
     future_type = haraka
     if future_type not in (araby.FATHA, araby.DAMMA, araby.KASRA):
         future_type = ar_verb.get_future_type_by_name(future_type)
-    vbc = classverb.VerbClass(word, transitive, future_type)
-    #vb.verb_class()
-    return vbc.conjugate_tense_pronoun(vconst.TenseFuture, vconst.PronounHuwa)
+    key = (word, future_type)
+    future_form = verb_cache.FUTURE_CACHE.get(key)
+    if future_form is None:
+        if db_base_path is not None:
+            future_form = verb_db.find_future_form(db_base_path, word,
+                future_type)
+        if not future_form:
+            future_form = compute_future_form(word, future_type)
+        verb_cache.FUTURE_CACHE.set(key, future_form)
+    return future_form
+
 
+def compute_future_form(verb_vocalised, future_type = araby.FATHA):
+    """
+    Conjugate the future form of a verb, without the future form cache.
+    Only the future stems are prepared, without display object.
+    @param verb_vocalised: given verb.
+    @type verb_vocalised:unicode.
+    @param future_type: the future mark (Fatha, Damma, Kasra).
+    @type future_type: unicode char.
+    @return: The conjugated form in the future tense.
+    @rtype: unicode.
+    """
+    vbc = classverb.VerbClass(verb_vocalised, True, future_type,
+        display=False, past=False)
+    return vbc.get_future_form()
 
 
+def warmup():
+    """
+    Load the data used by the conjugator, which is loaded on the first use
+    otherwise: the trileteral verb dictionary and its index,
+    the conjugation store and the verb search index.
+    It's used by servers at start, to not slow down the first requests.
+    """
+    verb_db.create_index_triverbtable()
+    conjugation_store.load()
+    verb_search.load()
@@ -0,0 +1,331 @@
+#!/usr/bin/python
+# -*- coding=utf-8 -*-
+#************************************************************************
+# Verb analyzer
+#
+# Description:
+# Reverse index from conjugated forms to verbs, tenses and pronouns
+#
+# Copyright (c) 2026, Qutrub-ng Project
+#
+#***********************************************************************/
+"""
+Analyze conjugated verbs by a reverse index.
+The index is built from every conjugated form of the lexicon verbs,
+it gives for a conjugated form its analyses as
+(verb, bab, tense, pronoun, voice) tuples.
+The forms are indexed twice:
+    - vocalized: the conjugated form as given by the conjugator.
+    - unvocalized: the form without tashkeel, with normalized hamza.
+The index is an SQLite file built by tools/build_analyzer_index.py,
+the analyses of a form are packed as an array of integers
+(verb number, tense and pronoun number).
+"""
+import os
+import sys
+import array
+import sqlite3
+import logging
+import threading
+
+import pyarabic.araby as araby
+import libqutrub.ar_verb as ar_verb
+import libqutrub.verb_const as vconst
+import libqutrub.verb_valid as verb_valid
+import libqutrub.verb_cache as verb_cache
+import libqutrub.verb_template as verb_template
+import libqutrub.db_pool as db_pool
+
+# the default index file
+INDEX_PATH = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "data", "analyzer.db")
+# number of analyzed forms kept in the analysis cache
+ANALYSIS_CACHE_SIZE = 100000
+# maximum number of forms in one query
+QUERY_BATCH_SIZE = 500
+# the voice of tenses
+VOICE_ACTIVE = u"معلوم"
+VOICE_PASSIVE = u"مجهول"
+# the cells of a conjugation table, a cell number is packed in an analysis
+CELLS = [(tense, pronoun) for tense in vconst.TABLE_TENSE
+    for pronoun in vconst.PronounsTable]
+CELL_INDEX = dict((cell, i) for (i, cell) in enumerate(CELLS))
+CELL_BITS = 8
+
+_index = {"path":INDEX_PATH, "generation":0, "verbs":None}
+_lock = threading.Lock()
+
+# the global analysis cache
+ANALYSIS_CACHE = verb_cache.LRUCache(ANALYSIS_CACHE_SIZE)
+
+
+def set_index_path(path):
+    """
+    Set the index file, the lookups use the new file.
+    @param path: the index file path, None to disable the analyzer.
+    @type path: string.
+    """
+    with _lock:
+        if _index["path"]:
+            db_pool.reset(_index["path"])
+        _index["path"] = path
+        _index["generation"] += 1
+        _index["verbs"] = None
+        ANALYSIS_CACHE.clear()
+
+
+def unvocalized_key(word):
+    """
+    Get the unvocalized key of a word, without tashkeel and tatweel,
+    with normalized hamza.
+    @param word: given word.
+    @type word: unicode.
+    @return: the key.
+    @rtype: unicode.
+    """
+    return araby.normalize_hamza(araby.strip_tatweel(
+        araby.strip_tashkeel(word)))
+
+
+def _pack(analyses):
+    """
+    Pack analyses numbers as little endian bytes.
+    """
+    packed = array.array("I", analyses)
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _unpack(blob):
+    """
+    Unpack analyses numbers packed by _pack.
+    """
+    packed = array.array("I")
+    packed.frombytes(blob)
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return packed
+
+
+def _get_pool():
+    """
+    Get the connection pool of the index, the verbs are loaded
+    on the first use.
+    @return: a connection pool or None if the index is not available.
+    @rtype: db_pool.ConnectionPool
+    """
+    path = _index["path"]
+    generation = _index["generation"]
+    if not path or not os.path.exists(path):
+        return None
+    pool = db_pool.get_pool(path)
+    if _index["verbs"] is None:
+        try:
+            with pool.connection() as conn:
+                verbs = conn.execute("""select verb, bab from verbs
+                            order by id""").fetchall()
+        except sqlite3.Error:
+            logging.exception("verb analyzer: can't open %s", path)
+            return None
+        with _lock:
+            if _index["generation"] == generation:
+                _index["verbs"] = verbs
+    return pool
+
+
+def load():
+    """
+    Open the index, it's opened on the first lookup if not loaded.
+    @return: True if the index is available.
+    @rtype: Boolean
+    """
+    return _get_pool() is not None
+
+
+def _decode(blob, verbs):
+    """
+    Decode packed analyses as tuples.
+    """
+    analyses = []
+    for number in _unpack(blob):
+        (verb, bab) = verbs[number >> CELL_BITS]
+        (tense, pronoun) = CELLS[number & ((1 << CELL_BITS) - 1)]
+        if tense in vconst.TablePassiveTense:
+            voice = VOICE_PASSIVE
+        else:
+            voice = VOICE_ACTIVE
+        analyses.append((verb, bab, tense, pronoun, voice))
+    return analyses
+
+
+def _lookup_keys(table, keys):
+    """
+    Lookup many keys in an index table, the results are cached.
+    @param table: 'vocalized' or 'unvocalized'.
+    @type table: string.
+    @param keys: the keys.
+    @type keys: list of unicode.
+    @return: analyses by key.
+    @rtype: dict
+    """
+    results = {}
+    missing = []
+    for key in keys:
+        cached = ANALYSIS_CACHE.get((table, key))
+        if cached is not None:
+            results[key] = cached
+        elif key not in results:
+            results[key] = []
+            missing.append(key)
+    pool = _get_pool()
+    if pool is None or not missing:
+        return results
+    verbs = _index["verbs"]
+    with pool.connection() as conn:
+        for start in range(0, len(missing), QUERY_BATCH_SIZE):
+            batch = missing[start:start + QUERY_BATCH_SIZE]
+            query = "select form, analyses from %s where form in (%s)" % (
+                table, ",".join("?" * len(batch)))
+            for (form, blob) in conn.execute(query, batch):
+                results[form] = _decode(blob, verbs)
+    for key in missing:
+        ANALYSIS_CACHE.set((table, key), results[key])
+    return results
+
+
+def analyze(word, vocalized = None):
+    """
+    Analyze a conjugated verb.
+    @param word: the given conjugated form.
+    @type word: unicode.
+    @param vocalized: lookup the vocalized form, if None, the vocalized
+    form is used if the word is vocalized.
+    @type vocalized: Boolean.
+    @return: list of (verb, bab, tense, pronoun, voice),
+    the list must not be modified.
+    @rtype: list of tuple.
+    """
+    return analyze_tokens([word], vocalized)[0][1]
+
+
+def analyze_tokens(tokens, vocalized = None):
+    """
+    Analyze a list of tokens, every distinct token is looked up once.
+    @param tokens: the given words.
+    @type tokens: iterable of unicode.
+    @param vocalized: lookup the vocalized forms, if None, the vocalized
+    form is used for vocalized tokens.
+    @type vocalized: Boolean.
+    @return: list of (token, analyses), in the order of tokens.
+    @rtype: list of tuple.
+    """
+    tokens = list(tokens)
+    keys = []
+    for token in tokens:
+        if vocalized or (vocalized is None and araby.is_vocalized(token)):
+            keys.append(("vocalized", token))
+        else:
+            keys.append(("unvocalized", unvocalized_key(token)))
+    results = {}
+    for table in ("vocalized", "unvocalized"):
+        table_keys = [key for (kind, key) in keys if kind == table]
+        if table_keys:
+            results[table] = _lookup_keys(table, table_keys)
+    return [(token, results[kind][key]) for (token, (kind, key))
+        in zip(tokens, keys)]
+
+
+def lexicon_verbs(db_file):
+    """
+    Get the verbs of the lexicon database with their future type, bab
+    and transitivity.
+    @param db_file: the verbdict database file.
+    @type db_file: string.
+    @return: (verb, future_type, bab, transitive)
+    @rtype: generator of tuple.
+    """
+    with db_pool.connection(db_file) as conn:
+        rows = conn.execute("""select verb_vocalised, haraka, bab, transitive
+                from verbdict""").fetchall()
+        rows += conn.execute("""select verb, ?, 0, transitive
+                from verbmore""", (u"فتحة", )).fetchall()
+    verbs = {}
+    for (verb, haraka, bab, transitive) in rows:
+        if not verb:
+            continue
+        future_type = ar_verb.get_future_type_by_name(haraka)
+        # MEEM is transitive, KAF is common, LAM is intransitive,
+        # a verb given with several codes is transitive if one of them is
+        transitive = bool(transitive) and (araby.MEEM in transitive
+            or araby.KAF in transitive)
+        key = (verb, future_type)
+        if key in verbs:
+            verbs[key][3] = verbs[key][3] or transitive
+        else:
+            verbs[key] = [verb, future_type, bab or 0, transitive]
+    for item in verbs.values():
+        yield tuple(item)
+
+
+def build(db_file, index_file, verbs = None):
+    """
+    Build the reverse index of the conjugated forms of the lexicon verbs.
+    Verbs are conjugated with their transitivity, the passive forms of
+    the intransitive verbs are only those given by the conjugator.
+    @param db_file: the verbdict database file.
+    @type db_file: string.
+    @param index_file: the index file, replaced if it exists.
+    @type index_file: string.
+    @param verbs: (verb, future_type, bab, transitive) to index,
+    default all verbs of the lexicon.
+    @type verbs: iterable of tuple.
+    @return: number of indexed verbs and forms.
+    @rtype: tuple
+    """
+    if verbs is None:
+        verbs = lexicon_verbs(db_file)
+    verb_rows = []
+    forms = {"vocalized":{}, "unvocalized":{}}
+    for (verb, future_type, bab, transitive) in verbs:
+        if not verb_valid.is_valid_infinitive_verb(verb):
+            continue
+        try:
+            table = verb_template.conjugate_raw(verb, future_type,
+                transitive)[0]
+        except Exception:
+            logging.exception("verb analyzer: can't conjugate %s", verb)
+            continue
+        verb_number = len(verb_rows) << CELL_BITS
+        verb_rows.append((len(verb_rows), verb, future_type, bab))
+        for tense in table:
+            for pronoun in table[tense]:
+                conj = table[tense][pronoun]
+                if not conj:
+                    continue
+                number = verb_number | CELL_INDEX[(tense, pronoun)]
+                for (kind, key) in (("vocalized", conj),
+                        ("unvocalized", unvocalized_key(conj))):
+                    analyses = forms[kind].setdefault(key, [])
+                    if number not in analyses:
+                        analyses.append(number)
+    tmp_file = index_file + ".tmp"
+    if os.path.exists(tmp_file):
+        os.remove(tmp_file)
+    conn = sqlite3.connect(tmp_file)
+    with conn:
+        conn.execute("""create table verbs (id integer primary key,
+                    verb text, future_type text, bab integer)""")
+        conn.executemany("insert into verbs values (?, ?, ?, ?)", verb_rows)
+        for kind in ("vocalized", "unvocalized"):
+            conn.execute("""create table %s (form text primary key,
+                        analyses blob) without rowid""" % kind)
+            conn.executemany("insert into %s values (?, ?)" % kind,
+                ((key, _pack(forms[kind][key]))
+                for key in sorted(forms[kind])))
+    conn.execute("vacuum")
+    conn.close()
+    os.replace(tmp_file, index_file)
+    db_pool.reset(index_file)
+    set_index_path(_index["path"])
+    return (len(verb_rows), len(forms["vocalized"]))
@@ -0,0 +1,210 @@
+#!/usr/bin/python
+# -*- coding=utf-8 -*-
+#************************************************************************
+# Verb cache
+#
+# Description:
+# Caches used to avoid repeated conjugation work
+#
+# Copyright (c) 2026, Qutrub-ng Project
+#
+#***********************************************************************/
+"""
+Caches used by the conjugation engine.
+The result cache stores the raw conjugation table (tense x pronoun)
+of recently conjugated verbs, any display format can be rendered from it.
+The future form cache stores the future form of recently used verbs.
+The standard cache stores the results of the orthographic treatments
+(standardisation, treat_sukun and suffix uniformation).
+All caches are bounded and can be used from many threads.
+"""
+import collections
+import threading
+
+# number of conjugation tables kept in the result cache
+RESULT_CACHE_SIZE = 1024
+# number of future forms kept in the future form cache
+FUTURE_CACHE_SIZE = 10000
+# number of entries kept in every orthographic sub-cache
+STANDARD_CACHE_SIZE = {'standard':100000,
+                    'sukun':100000,
+                    'suffix':1000}
+
+
+class LRUCache:
+    """
+    A size-bounded dictionary, when the cache is full,
+    the least recently used entry is evicted.
+    The cache counts hits, misses and evictions.
+    """
+    def __init__(self, maxsize=1024):
+        """
+        init method
+        @param maxsize: the maximum number of entries, None for unbounded.
+        @type maxsize: integer.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Get a cached value and mark it as recently used.
+        @param key: the entry key.
+        @type key: hashable.
+        @param default: value returned if the key is not cached.
+        @return: the cached value or default.
+        """
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key, value):
+        """
+        Store a value, evict the least recently used entries if needed.
+        @param key: the entry key.
+        @type key: hashable.
+        @param value: the value to store.
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self._evict()
+
+    def resize(self, maxsize):
+        """
+        Change the capacity of the cache,
+        extra entries are evicted.
+        @param maxsize: the maximum number of entries, None for unbounded.
+        @type maxsize: integer.
+        """
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def clear(self):
+        """
+        Remove all entries and reset counters.
+        """
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        """
+        Get the cache counters.
+        @return: size, maxsize, hits, misses and evictions.
+        @rtype: dict.
+        """
+        with self._lock:
+            return {"size":len(self._data),
+                "maxsize":self.maxsize,
+                "hits":self.hits,
+                "misses":self.misses,
+                "evictions":self.evictions,
+                }
+
+    def _evict(self):
+        """
+        Evict the least recently used entries over the capacity,
+        the lock must be held.
+        """
+        if self.maxsize is None:
+            return
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+
+class StandardCache:
+    """
+    The cache of orthographic treatments, shared by all verbs.
+    It's composed of three sub-caches:
+        - 'standard': standard orthographic form (ar_verb.standard2)
+        - 'sukun': treated marks (ar_verb.treat_sukun2)
+        - 'suffix': uniformated suffixes (ar_verb.uniformate_suffix)
+    """
+    def __init__(self, sizes=None):
+        """
+        init method
+        @param sizes: maximum number of entries for every sub-cache,
+        default STANDARD_CACHE_SIZE.
+        @type sizes: dict.
+        """
+        if not sizes:
+            sizes = STANDARD_CACHE_SIZE
+        self.caches = {}
+        for name in STANDARD_CACHE_SIZE:
+            self.caches[name] = LRUCache(sizes.get(name,
+                 STANDARD_CACHE_SIZE[name]))
+
+    def __getitem__(self, name):
+        """
+        Get a sub-cache by name ('standard', 'sukun', 'suffix').
+        """
+        return self.caches[name]
+
+    def resize(self, sizes):
+        """
+        Change the capacity of sub-caches.
+        @param sizes: maximum number of entries by sub-cache name.
+        @type sizes: dict.
+        """
+        for name in sizes:
+            self.caches[name].resize(sizes[name])
+
+    def clear(self):
+        """
+        Clear all sub-caches.
+        """
+        for cache in self.caches.values():
+            cache.clear()
+
+    def stats(self):
+        """
+        Get counters of all sub-caches.
+        @return: stats by sub-cache name.
+        @rtype: dict.
+        """
+        return dict((name, cache.stats()) for name, cache in
+            self.caches.items())
+
+
+def result_key(word, future_type, transitive, listtense):
+    """
+    Build the result cache key of a conjugation request.
+    The word is kept as given, because its hamza forms and harakat
+    are used to guess the verb marks.
+    @param word: the given verb.
+    @type word: unicode.
+    @param future_type: the future mark (Fatha, Damma, Kasra).
+    @type future_type: unicode char.
+    @param transitive: the verb is transitive or not.
+    @type transitive: Boolean.
+    @param listtense: the conjugated tenses.
+    @type listtense: list of unicode.
+    @return: a hashable key.
+    @rtype: tuple.
+    """
+    return (word, future_type, bool(transitive), tuple(listtense))
+
+
+# the global result cache, shared by do_sarf and QutrubApi
+RESULT_CACHE = LRUCache(RESULT_CACHE_SIZE)
+# the future forms (verb, future type): future form, used by suggestions
+FUTURE_CACHE = LRUCache(FUTURE_CACHE_SIZE)
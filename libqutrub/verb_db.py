@@ -27,25 +27,243 @@ import os
 # the db file
 db_path = os.path.join(os.path.dirname(__file__), "data/verbdict.db")
 
+import threading
+import array
+import sqlite3
+import collections.abc
 import pyarabic.araby as araby
-import libqutrub.triverbtable as triverbtable
-TRIVERBTABLE_INDEX = {}
+import libqutrub.ar_verb as ar_verb
+import libqutrub.verb_cache as verb_cache
+import libqutrub.db_pool as db_pool
+import libqutrub.index_snapshot as index_snapshot
+# the triliteral verbs lexicon is loaded on the first use,
+# or by create_index_triverbtable, from the index snapshot if available
+_lexicon = {}
+_index_lock = threading.Lock()
 import logging
-def create_index_triverbtable():
-    """ Create index from the verb dictionary
-    to accelerate the search in the dictionary for verbs
-    @return: create the TRIVERBTABLE_INDEX
-    @rtype: None
+# the fields of a triliteral verb entry
+TRIVERB_FIELDS = ('verb', 'root', 'bab', 'transitive', 'haraka')
+# a group of entries is packed in the index as start << GROUP_BITS | count
+GROUP_BITS = 8
+# maximum number of verbs in one query
+QUERY_BATCH_SIZE = 500
+# the precomputed future form column of the verbdict and verbmore tables,
+# added by build_future_forms
+FUTURE_FORM_COLUMN = "future_form"
+# the dictionaries which have the future form column {db path:Boolean}
+_future_forms = {}
+# the stamp indexes of the verbmore tables {db path:StampIndex}
+_stamp_index = {"enabled":True, "indexes":{}}
+
+
+class TriVerbLexicon(collections.abc.Mapping):
+    """
+    The triliteral verbs table, in parallel arrays: all vocalized verbs
+    in one string with their offsets, all roots in one string, and small
+    codes for the bab, the transitivity and the future haraka.
+    The entries are sorted by normalized unvocalized verb, the index gives
+    the group of entries of a normalized verb.
+    It's a read only mapping like the TriVerbTable, the key is the
+    vocalized verb + the bab number, and the value is the entry dict,
+    created on every access.
+    """
+    __slots__ = ("_verbs", "_offsets", "_roots", "_babs", "_transitives",
+        "_transitive_values", "_harakat", "_haraka_values", "_index")
+
+    def __init__(self, verbs, offsets, roots, babs, transitives,
+            transitive_values, harakat, haraka_values, index):
+        """
+        init method, the arrays are given by from_table or by a snapshot.
+        """
+        self._verbs = verbs
+        self._offsets = offsets
+        self._roots = roots
+        self._babs = babs
+        self._transitives = transitives
+        self._transitive_values = transitive_values
+        self._harakat = harakat
+        self._haraka_values = haraka_values
+        self._index = index
+
+    @classmethod
+    def from_table(cls, triverbtable):
+        """
+        Create the lexicon of a triliteral verbs table.
+        @param triverbtable: the triliteral verbs table {key:entry}.
+        @type triverbtable: dict
+        @rtype: TriVerbLexicon
+        """
+        groups = build_index_triverbtable(triverbtable)
+        transitive_values = tuple(sorted(set(entry['transitive']
+            for entry in triverbtable.values())))
+        haraka_values = tuple(sorted(set(entry['haraka']
+            for entry in triverbtable.values())))
+        verbs = []
+        offsets = array.array("I", [0])
+        roots = []
+        babs = []
+        transitives = []
+        harakat = []
+        index = {}
+        for normverb in groups:
+            keys = groups[normverb]
+            if len(keys) >= 1 << GROUP_BITS:
+                raise ValueError("too many verbs %s" % normverb)
+            index[normverb] = len(babs) << GROUP_BITS | len(keys)
+            for key in keys:
+                entry = triverbtable[key]
+                verbs.append(entry['verb'])
+                offsets.append(offsets[-1] + len(entry['verb']))
+                roots.append(entry['root'])
+                babs.append(entry['bab'])
+                transitives.append(transitive_values.index(
+                    entry['transitive']))
+                harakat.append(haraka_values.index(entry['haraka']))
+        return cls(u"".join(verbs), offsets, u"".join(roots), bytes(babs),
+            bytes(transitives), transitive_values, bytes(harakat),
+            haraka_values, index)
+
+    def get_state(self):
+        """
+        Get the arrays of the lexicon, to be saved in a snapshot.
+        @return: the arguments of the init method, with offsets as bytes.
+        @rtype: tuple
+        """
+        return (self._verbs, self._offsets.tobytes(), self._roots,
+            self._babs, self._transitives, self._transitive_values,
+            self._harakat, self._haraka_values, self._index)
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Create the lexicon from the arrays given by get_state.
+        @rtype: TriVerbLexicon
+        """
+        offsets = array.array("I")
+        offsets.frombytes(state[1])
+        return cls(state[0], offsets, *state[2:])
+
+    def find(self, normalized):
+        """
+        Get the positions of the entries of a normalized unvocalized verb.
+        @param normalized: verb without harakat, with normalized hamza.
+        @type normalized: unicode.
+        @rtype: range
+        """
+        group = self._index.get(normalized)
+        if group is None:
+            return range(0)
+        start = group >> GROUP_BITS
+        return range(start, start + (group & ((1 << GROUP_BITS) - 1)))
+
+    def verb(self, pos):
+        """
+        Get the vocalized verb of an entry.
+        """
+        return self._verbs[self._offsets[pos]:self._offsets[pos + 1]]
+
+    def haraka(self, pos):
+        """
+        Get the future haraka of an entry.
+        """
+        return self._haraka_values[self._harakat[pos]]
+
+    def entry(self, pos):
+        """
+        Get an entry as a dict like the TriVerbTable values.
+        @rtype: dict
+        """
+        return {'verb':self.verb(pos),
+            'root':self._roots[3 * pos:3 * pos + 3],
+            'bab':self._babs[pos],
+            'transitive':self._transitive_values[self._transitives[pos]],
+            'haraka':self.haraka(pos),
+            }
+
+    def entries(self):
+        """
+        Get all entries as dicts.
+        @rtype: generator of dict
+        """
+        for pos in range(len(self._babs)):
+            yield self.entry(pos)
+
+    def __len__(self):
+        return len(self._babs)
+
+    def __iter__(self):
+        for pos in range(len(self._babs)):
+            yield self.verb(pos) + str(self._babs[pos])
+
+    def __getitem__(self, key):
+        verb = key[:-1]
+        normalized = araby.normalize_hamza(araby.strip_harakat(verb))
+        for pos in self.find(normalized):
+            if self.verb(pos) == verb and str(self._babs[pos]) == key[-1:]:
+                return self.entry(pos)
+        raise KeyError(key)
+
+
+def load_triverbtable_source():
+    """ Load the triliteral verbs table from its source module.
+    @return: the triliteral verbs table.
+    @rtype: dict
     """
+    import libqutrub.triverbtable as triverbtable
+    return triverbtable.TriVerbTable
+
+
+def build_index_triverbtable(triverbtable):
+    """ Build the index of the triliteral verbs table,
+    by normalized unvocalized verb.
+    @param triverbtable: the triliteral verbs table.
+    @type triverbtable: dict
+    @return: the index {normalized verb:[table keys]}
+    @rtype: dict
+    """
+    index = {}
     # the key is the vocverb + the bab number
-    for key in triverbtable.TriVerbTable.keys():
-        vocverb = triverbtable.TriVerbTable[key]['verb']
+    for key in triverbtable.keys():
+        vocverb = triverbtable[key]['verb']
         unvverb = araby.strip_harakat(vocverb)
         normverb = araby.normalize_hamza(unvverb)
-        if normverb in TRIVERBTABLE_INDEX:
-            TRIVERBTABLE_INDEX[normverb].append(key)
+        if normverb in index:
+            index[normverb].append(key)
+        else:
+            index[normverb] = [key, ]
+    return index
+
+
+def get_triverbtable():
+    """ Get the triliteral verbs lexicon, it's loaded on the first use.
+    @return: the triliteral verbs lexicon.
+    @rtype: TriVerbLexicon
+    """
+    lexicon = _lexicon.get("triverb")
+    if lexicon is None:
+        create_index_triverbtable()
+        lexicon = _lexicon["triverb"]
+    return lexicon
+
+
+def create_index_triverbtable():
+    """ Create the compact lexicon and its index from the verb dictionary
+    to accelerate the search in the dictionary for verbs,
+    the lexicon is loaded once, from the index snapshot
+    if it's available, or built from the source table.
+    @rtype: None
+    """
+    if "triverb" in _lexicon:
+        return
+    with _index_lock:
+        if "triverb" in _lexicon:
+            return
+        state = index_snapshot.get_section("triverb_lexicon")
+        if state:
+            lexicon = TriVerbLexicon.from_state(state)
         else:
-            TRIVERBTABLE_INDEX[normverb] = [key, ]
+            lexicon = TriVerbLexicon.from_table(load_triverbtable_source())
+        _lexicon["triverb"] = lexicon
 
 
 
@@ -78,16 +296,15 @@ vocalised_entree = False):
         verb_nm = triverb
 
     normalized = araby.normalize_hamza(verb_nm)
-    if normalized in TRIVERBTABLE_INDEX:
-        for verb_voc_id in TRIVERBTABLE_INDEX[normalized]:
-            if triverb == triverbtable.TriVerbTable[verb_voc_id]['verb'] and \
-             givenharaka == triverbtable.TriVerbTable[verb_voc_id]['haraka']:
-                liste.insert(0, triverbtable.TriVerbTable[verb_voc_id])
-#            if VocalisedEntree:
-                #if verb_voc_id[:-1] == triverb:
-                #    liste.append(TriVerbTable[verb_voc_id])
+    lexicon = get_triverbtable()
+    positions = lexicon.find(normalized)
+    if positions:
+        for pos in positions:
+            if triverb == lexicon.verb(pos) and \
+             givenharaka == lexicon.haraka(pos):
+                liste.insert(0, lexicon.entry(pos))
             else:
-                liste.append(triverbtable.TriVerbTable[verb_voc_id])
+                liste.append(lexicon.entry(pos))
     else:
         print("triverb has no verb")
     return liste
@@ -107,44 +324,432 @@ def find_triliteral_verb(db_base_path, triliteralverb, givenharaka):
     @return: list of triliteral verbs.
     @rtype: list of unicode.
     """
-    liste = []
-    try:
-        import sqlite3 as sqlite
-        import os
-#     db_path = os.path.join(_base_directory(req), "data/verbdict.db")
+    results = find_triliteral_verbs(db_base_path, [triliteralverb],
+        givenharaka)
+    if results is None:
+        return None
+    return results[triliteralverb]
+
+
+def find_triliteral_verbs(db_base_path, triliteralverbs, givenharaka,
+        rows = None):
+    """
+    Find many triliteral verbs in the dictionary, with one query
+    by QUERY_BATCH_SIZE verbs,
+    return a list of possible verb forms for every verb,
+    the precomputed future forms of the found verbs are kept in the
+    future form cache.
+    @param db_base_path: the database path
+    @type db_base_path: path string.
+    @param triliteralverbs: given verbs.
+    @type triliteralverbs: list of unicode.
+    @param givenharaka: given haraka of tuture type of the verbs.
+    @type givenharaka: unicode.
+    @param rows: the rows given by fetch_triliteral_rows for some verbs,
+    the other verbs are fetched.
+    @type rows: dict of list.
+    @return: {verb:list of triliteral verbs}, like find_triliteral_verb.
+    @rtype: dict of list.
+    """
+    unvocalized = list(dict.fromkeys(araby.strip_harakat(verb)
+        for verb in triliteralverbs))
+    rows_by_verb = dict(rows or {})
+    missing = [verb for verb in unvocalized if verb not in rows_by_verb]
+    if missing:
+        fetched = fetch_triliteral_rows(db_base_path, missing)
+        if fetched is None:
+            return None
+        rows_by_verb.update(fetched)
+    return dict((triliteralverb, order_triliteral_rows(triliteralverb,
+        rows_by_verb.get(araby.strip_harakat(triliteralverb), []),
+        givenharaka)) for triliteralverb in triliteralverbs)
 
+
+def fetch_triliteral_rows(db_base_path, unvocalized):
+    """
+    Read the rows of many unvocalized triliteral verbs in the dictionary,
+    with one query by QUERY_BATCH_SIZE verbs, the precomputed future
+    forms of the found verbs are kept in the future form cache.
+    @param db_base_path: the database path
+    @type db_base_path: path string.
+    @param unvocalized: the verbs without harakat, the shadda is kept.
+    @type unvocalized: list of unicode.
+    @return: {unvocalized verb:rows (vocalized verb, haraka, transitive,
+    future form)} in table order, None if the dictionary is not available.
+    @rtype: dict of list.
+    """
+    try:
         db_path = os.path.join(db_base_path, "data/verbdict.db")
-        # ~ logging.debug("verb_db:"+ db_path)        
-        conn  =  sqlite.connect(db_path)
-        cursor  =  conn.cursor()
-        verb_nm = araby.strip_harakat(triliteralverb)
-        tup = (verb_nm, )
-        cursor.execute("""select verb_vocalised, haraka, transitive 
-                    from verbdict
-                    where verb_unvocalised = ?""", tup)
-        for row in cursor:
-            verb_vocalised = row[0]
-            haraka = row[1]
-            transitive = row[2]
-            # Return the transitivity option
-            #MEEM is transitive
-            # KAF is commun ( transitive and intransitive)
-            # LAM is intransitive
-            if transitive in (araby.KAF, araby.MEEM):
-                transitive = True
-            else:
-                transitive = False
+        # the rows of every unvocalized verb, in the table order
+        rows_by_verb = dict((verb, []) for verb in unvocalized)
+        unvocalized = list(rows_by_verb)
+        # the future form is read with the verb if it's precomputed
+        future_form = FUTURE_FORM_COLUMN if has_future_forms(db_path) \
+            else "null"
+        # the dictionary is opened once and shared by all lookups
+        with db_pool.connection(db_path) as conn:
+            for start in range(0, len(unvocalized), QUERY_BATCH_SIZE):
+                batch = unvocalized[start:start + QUERY_BATCH_SIZE]
+                rows = conn.execute("""select verb_unvocalised,
+                        verb_vocalised, haraka, transitive, %s
+                        from verbdict
+                        where verb_unvocalised in (%s)""" % (future_form,
+                    ", ".join("?" * len(batch))), batch).fetchall()
+                for row in rows:
+                    rows_by_verb[row[0]].append(row[1:])
+                    keep_future_form(row[1], row[2], row[4])
+    except IOError:
+        return None
+    return rows_by_verb
+
+
+def order_triliteral_rows(triliteralverb, rows, givenharaka):
+    """
+    Get the verbs of the rows of a triliteral verb, the given verb with
+    the given haraka is first.
+    @param triliteralverb: given verb.
+    @type triliteralverb: unicode.
+    @param rows: the verb rows, given by fetch_triliteral_rows.
+    @type rows: list of tuple.
+    @param givenharaka: given haraka of tuture type of the verb.
+    @type givenharaka: unicode.
+    @return: list of triliteral verbs, like find_triliteral_verb.
+    @rtype: list of dict.
+    """
+    liste = []
+    for row in rows:
+        verb_vocalised = row[0]
+        haraka = row[1]
+        transitive = row[2]
+        # Return the transitivity option
+        #MEEM is transitive
+        # KAF is commun ( transitive and intransitive)
+        # LAM is intransitive
+        if transitive in (araby.KAF, araby.MEEM):
+            transitive = True
+        else:
+            transitive = False
 # if the given verb is the list, 
 #it will be inserted in the top of the list, 
 #to be treated in prior
-            if triliteralverb == verb_vocalised and givenharaka == haraka:
-                liste.insert(0, {"verb":verb_vocalised, 
-                "haraka":haraka, "transitive":transitive})
+        if triliteralverb == verb_vocalised and givenharaka == haraka:
+            liste.insert(0, {"verb":verb_vocalised, 
+            "haraka":haraka, "transitive":transitive})
 # else the verb is appended in the liste
-            else:
-                liste.append({"verb":verb_vocalised, 
-                "haraka":haraka, "transitive":transitive})
-        cursor.close()
-        return liste
-    except IOError:
+        else:
+            liste.append({"verb":verb_vocalised, 
+            "haraka":haraka, "transitive":transitive})
+    return liste
+
+
+class StampIndex:
+    """
+    The non triliteral verbs of the verbmore table, by stamp, in memory.
+    The entries (vocalized verb, transitive, future form) of a stamp are
+    kept in the lookup order: the verbs of the given unmarked form first,
+    in reverse table order, then the other verbs in table order.
+    """
+    __slots__ = ("_by_stamp", "_by_form")
+
+    def __init__(self, rows):
+        """
+        init method
+        @param rows: (stamp, vocalized verb, unmarked verb, transitive code,
+        future form) in table order.
+        @type rows: iterable of tuple.
+        """
+        # stamp: (unmarked verb, entry) of the stamp
+        grouped = {}
+        for (stamp, verb, unmarked, transitive, future_form) in rows:
+            # MEEM is transitive, KAF is commun, LAM is intransitive
+            entry = (verb, transitive in (araby.KAF, araby.MEEM), future_form)
+            grouped.setdefault(stamp, []).append((unmarked, entry))
+        # the entries of a stamp when the unmarked form is not in the stamp
+        self._by_stamp = {}
+        # the entries of a stamp when the unmarked form is in the stamp,
+        # if the order is not the stamp order
+        self._by_form = {}
+        for (stamp, items) in grouped.items():
+            entries = tuple(entry for (unmarked, entry) in items)
+            self._by_stamp[stamp] = entries
+            for unmarked in dict.fromkeys(unmarked for (unmarked, entry)
+                    in items):
+                ordered = tuple([entry for (other, entry) in reversed(items)
+                    if other == unmarked] + [entry for (other, entry) in items
+                    if other != unmarked])
+                if ordered != entries:
+                    self._by_form[(stamp, unmarked)] = ordered
+
+    def get_state(self):
+        """
+        Get the tables of the index, to be saved in a snapshot.
+        @rtype: tuple
+        """
+        return (self._by_stamp, self._by_form)
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Create the index from the tables given by get_state.
+        @rtype: StampIndex
+        """
+        index = cls(())
+        (index._by_stamp, index._by_form) = state
+        return index
+
+    def lookup(self, stamp, unmarked):
+        """
+        Get the entries of a verb.
+        @param stamp: the verb stamp.
+        @type stamp: unicode.
+        @param unmarked: the verb without harakat, the shadda is kept.
+        @type unmarked: unicode.
+        @return: (vocalized verb, transitive, future form) in lookup order.
+        @rtype: tuple of tuple
+        """
+        entries = self._by_form.get((stamp, unmarked))
+        if entries is None:
+            entries = self._by_stamp.get(stamp, ())
+        return entries
+
+    def __len__(self):
+        """
+        The number of stamps.
+        """
+        return len(self._by_stamp)
+
+
+def set_stamp_index(enabled):
+    """
+    Enable or disable the in-memory stamp index of the non triliteral
+    verbs, the verbmore table is queried if it's disabled.
+    The built indexes are dropped.
+    @param enabled: use the stamp index.
+    @type enabled: Boolean.
+    """
+    with _index_lock:
+        _stamp_index["enabled"] = enabled
+        _stamp_index["indexes"].clear()
+
+
+def reset_stamp_index():
+    """
+    Drop the built stamp indexes, used when the dictionary is changed,
+    they are built again on the next lookup.
+    """
+    with _index_lock:
+        _stamp_index["indexes"].clear()
+
+
+def get_stamp_index(db_path):
+    """
+    Get the stamp index of the verbmore table of a dictionary, loaded
+once from the index snapshot, or built from the dictionary.
+    @param db_path: the dictionary file.
+    @type db_path: path string.
+    @return: the index, None if it's disabled or the file is not available.
+    @rtype: StampIndex
+    """
+    if not _stamp_index["enabled"]:
+        return None
+    indexes = _stamp_index["indexes"]
+    if db_path not in indexes:
+        with _index_lock:
+            if db_path not in indexes:
+                index = None
+                if os.path.exists(db_path):
+                    # the index of the snapshot, if it's built from the
+                    # same dictionary
+                    state = index_snapshot.get_dictionary_section(
+                        "verbmore_stamps", db_path)
+                    try:
+                        if state:
+                            index = StampIndex.from_state(state)
+                        else:
+                            index = build_stamp_index(db_path)
+                    except sqlite3.Error:
+                        logging.exception("verb_db: can't open %s", db_path)
+                indexes[db_path] = index
+    return indexes[db_path]
+
+
+def build_stamp_index(db_path):
+    """
+    Build the stamp index of the verbmore table of a dictionary.
+    @param db_path: the dictionary file.
+    @type db_path: path string.
+    @rtype: StampIndex
+    @raise sqlite3.Error: the dictionary can't be read.
+    """
+    future_form = FUTURE_FORM_COLUMN if has_future_forms(db_path) else "null"
+    with db_pool.connection(db_path) as conn:
+        return StampIndex(conn.execute("""select stamp,
+                verb, unmarked, transitive, %s
+                from verbmore
+                order by stamp, rowid""" % future_form))
+
+
+def reset_future_forms():
+    """
+    Drop the tests of the future form column, used when the dictionary is
+    changed, the column is tested again on the next lookup.
+    """
+    _future_forms.clear()
+
+
+def has_future_forms(db_path):
+    """
+    Test if the dictionary has the precomputed future forms,
+    the test is done once by file.
+    @param db_path: the dictionary file.
+    @type db_path: path string.
+    @rtype: Boolean
+    """
+    available = _future_forms.get(db_path)
+    if available is None:
+        available = False
+        if os.path.exists(db_path):
+            try:
+                with db_pool.connection(db_path) as conn:
+                    available = all(FUTURE_FORM_COLUMN in [row[1] for row in
+                        conn.execute("pragma table_info(%s)" % table)]
+                        for table in ("verbdict", "verbmore"))
+            except sqlite3.Error:
+                logging.exception("verb_db: can't open %s", db_path)
+        _future_forms[db_path] = available
+    return available
+
+
+def keep_future_form(verb, haraka, future_form):
+    """
+    Keep a precomputed future form in the future form cache,
+    used by mosaref.get_future_form.
+    @param verb: the vocalized verb.
+    @type verb: unicode.
+    @param haraka: the future type or its arabic name.
+    @type haraka: unicode.
+    @param future_form: the future form, None if not precomputed.
+    @type future_form: unicode.
+    """
+    if future_form:
+        if haraka not in (araby.FATHA, araby.DAMMA, araby.KASRA):
+            haraka = ar_verb.get_future_type_by_name(haraka)
+        verb_cache.FUTURE_CACHE.set((verb, haraka), future_form)
+
+
+def find_future_form(db_base_path, verb, haraka):
+    """
+    Get the precomputed future form of a verb of the dictionary.
+    @param db_base_path: the database path
+    @type db_base_path: path string.
+    @param verb: the vocalized verb.
+    @type verb: unicode.
+    @param haraka: the future type or its arabic name.
+    @type haraka: unicode.
+    @return: the future form, None if the verb is not found,
+    or the future forms are not precomputed.
+    @rtype: unicode
+    """
+    db_path = os.path.join(db_base_path, "data/verbdict.db")
+    if not has_future_forms(db_path):
+        return None
+    if haraka not in (araby.FATHA, araby.DAMMA, araby.KASRA):
+        haraka = ar_verb.get_future_type_by_name(haraka)
+    with db_pool.connection(db_path) as conn:
+        rows = conn.execute("""select haraka, future_form
+                from verbdict
+                where verb_vocalised = ?
+                union all
+                select ?, future_form
+                from verbmore
+                where verb = ?""", (verb, u"فتحة", verb)).fetchall()
+    for (row_haraka, future_form) in rows:
+        if future_form and ar_verb.get_future_type_by_name(row_haraka) \
+           == haraka:
+            return future_form
+    return None
+
+
+def frequent_verbs(db_base_path, limit):
+    """
+    Get the most frequent verbs of the corpus, from the freq_verbs table.
+    @param db_base_path: the database path
+    @type db_base_path: path string.
+    @param limit: the number of verbs.
+    @type limit: integer.
+    @return: the verbs without harakat, the shadda is kept,
+    by decreasing frequency.
+    @rtype: list of unicode.
+    """
+    db_path = os.path.join(db_base_path, "data/verbdict.db")
+    with db_pool.connection(db_path) as conn:
+        rows = conn.execute("""select verb from freq_verbs
+                order by freq desc
+                limit ?""", (limit, )).fetchall()
+    return list(dict.fromkeys(araby.strip_harakat(verb) for (verb, ) in rows
+        if verb))
+
+
+def build_future_forms(db_file):
+    """
+    Precompute the future form of all verbs of the verbdict and verbmore
+    tables, in the future form column, the column and the indexes used by
+    find_future_form are created if they don't exist.
+    The verbmore verbs are conjugated with Fatha as future type.
+    @param db_file: the verbdict database file, updated.
+    @type db_file: string.
+    @return: number of updated rows.
+    @rtype: integer
+    """
+    # imported here, the conjugator uses this module
+    import libqutrub.mosaref_main as mosaref
+    conn = sqlite3.connect(db_file)
+    count = 0
+    try:
+        for (table, verb_column) in (("verbdict", "verb_vocalised"),
+                ("verbmore", "verb")):
+            columns = [row[1] for row in
+                conn.execute("pragma table_info(%s)" % table)]
+            with conn:
+                if FUTURE_FORM_COLUMN not in columns:
+                    conn.execute("alter table %s add column %s text" % (
+                        table, FUTURE_FORM_COLUMN))
+                conn.execute("create index if not exists %s_%s on %s (%s)" % (
+                    table, verb_column, table, verb_column))
+        updates = []
+        for (verb, haraka) in conn.execute("""select distinct
+                verb_vocalised, haraka from verbdict""").fetchall():
+            updates.append((_compute_future_form(mosaref, verb, haraka),
+                verb, haraka))
+        with conn:
+            count += conn.executemany("""update verbdict set future_form = ?
+                where verb_vocalised = ? and haraka = ?""", updates).rowcount
+        updates = []
+        for (verb, ) in conn.execute("""select distinct verb
+                from verbmore""").fetchall():
+            updates.append((_compute_future_form(mosaref, verb, u"فتحة"),
+                verb))
+        with conn:
+            count += conn.executemany("""update verbmore set future_form = ?
+                where verb = ?""", updates).rowcount
+    finally:
+        conn.close()
+    db_pool.reset(db_file)
+    reset_future_forms()
+    return count
+
+
+def _compute_future_form(mosaref, verb, haraka):
+    """
+    Conjugate the future form of a verb, used to build the future forms.
+    @return: the future form, None if the verb can't be conjugated.
+    @rtype: unicode
+    """
+    if not verb:
+        return None
+    try:
+        return mosaref.compute_future_form(verb,
+            ar_verb.get_future_type_by_name(haraka))
+    except Exception:
+        logging.exception("verb_db: no future form for %s", verb)
         return None
@@ -0,0 +1,350 @@
+#!/usr/bin/python
+# -*- coding=utf-8 -*-
+#************************************************************************
+# Verb search
+#
+# Description:
+# Approximate search of misspelled verbs in the lexicon
+#
+# Copyright (c) 2026, Qutrub-ng Project
+#
+#***********************************************************************/
+"""
+Search the lexicon verbs near a misspelled verb.
+The unvocalized forms of the verbdict and verbmore tables are indexed by
+a search key, without tashkeel, where the hamza seats, the alef maksura
+and yeh, the teh marbuta and heh are not distinguished.
+Every key is indexed with all its deletions of one letter, a query
+looks up its key and its deletions, the found keys are one or two edits
+away, the edits cost less for the common confusions of arabic letters,
+and they are ranked by edit cost and corpus frequency (freq_verbs table).
+The index is built from the dictionary on the first search, or loaded
+from the index snapshot.
+
+    results = verb_search.search(u"استعملو")
+    [(u"استعمل", 0.5, 1234), ...]
+"""
+import os
+import sqlite3
+import logging
+import threading
+
+import pyarabic.araby as araby
+import libqutrub.verb_cache as verb_cache
+import libqutrub.db_pool as db_pool
+import libqutrub.index_snapshot as index_snapshot
+
+# the default dictionary file
+DB_PATH = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "data", "verbdict.db")
+# maximum edit cost of the results
+MAX_DISTANCE = 2.0
+# default number of results
+SEARCH_LIMIT = 10
+# number of searches kept in the search cache
+SEARCH_CACHE_SIZE = 10000
+# the letters which are not distinguished in the search keys
+KEY_TRANSLATION = dict((ord(letter), normalized) for (letter, normalized) in (
+    (araby.ALEF_HAMZA_ABOVE, araby.ALEF),
+    (araby.ALEF_HAMZA_BELOW, araby.ALEF),
+    (araby.ALEF_MADDA, araby.ALEF),
+    (araby.ALEF_WASLA, araby.ALEF),
+    (araby.WAW_HAMZA, araby.HAMZA),
+    (araby.YEH_HAMZA, araby.HAMZA),
+    (araby.ALEF_MAKSURA, araby.YEH),
+    (araby.TEH_MARBUTA, araby.HEH),
+    ))
+# the letters often confused, a substitution costs CONFUSION_COST
+CONFUSIONS = [(araby.HAMZA, araby.ALEF), (araby.HAMZA, araby.WAW),
+    (araby.HAMZA, araby.YEH), (araby.ALEF, araby.WAW),
+    (araby.ALEF, araby.YEH), (araby.WAW, araby.YEH),
+    (araby.TEH, araby.HEH), (araby.TEH, araby.TAH), (araby.HEH, araby.HAH),
+    (araby.SEEN, araby.SAD), (araby.SEEN, araby.THEH),
+    (araby.DAL, araby.THAL), (araby.ZAIN, araby.THAL),
+    (araby.DAD, araby.ZAH), (araby.DAD, araby.DAL),
+    (araby.QAF, araby.KAF), (araby.GHAIN, araby.AIN)]
+CONFUSION_COST = 0.5
+# the weak letters, often omitted or added, an insertion or a deletion
+# costs WEAK_COST
+WEAK_LETTERS = (araby.ALEF, araby.WAW, araby.YEH, araby.HAMZA)
+WEAK_COST = 0.5
+
+# the cost of the substitutions of the confused letters
+SUBSTITUTION_COSTS = dict([(pair, CONFUSION_COST) for pair in CONFUSIONS]
+    + [((second, first), CONFUSION_COST) for (first, second) in CONFUSIONS])
+# the cost of the insertions and deletions of the weak letters
+LETTER_COSTS = dict((letter, WEAK_COST) for letter in WEAK_LETTERS)
+# the index entries are key number << POSITION_BITS | deleted letter position
+POSITION_BITS = 4
+# the position of the entry of the key itself, the keys are shorter
+KEY_POSITION = (1 << POSITION_BITS) - 1
+
+# the search indexes by dictionary file
+_indexes = {}
+_lock = threading.Lock()
+
+# the global search cache
+SEARCH_CACHE = verb_cache.LRUCache(SEARCH_CACHE_SIZE)
+
+
+def search_key(word):
+    """
+    Get the search key of a word, without tashkeel and tatweel,
+    with the confused letters normalized.
+    @param word: given word.
+    @type word: unicode.
+    @return: the key.
+    @rtype: unicode.
+    """
+    return araby.strip_tatweel(araby.strip_tashkeel(word)).translate(
+        KEY_TRANSLATION)
+
+
+def _deletions(key):
+    """
+    Get the deletions of one letter of a key, with the key itself.
+    @return: (position of the deleted letter, deletion)
+    @rtype: list of tuple
+    """
+    deletions = [(KEY_POSITION, key)]
+    for i in range(len(key)):
+        deletions.append((i, key[:i] + key[i + 1:]))
+    return deletions
+
+
+def edit_cost(key, i, other, j):
+    """
+    Get the cost of the edits given by the index, between a key without
+    its letter i and another key without its letter j: an insertion,
+    a deletion, a substitution, an adjacent transposition, or a deletion
+    and an insertion.
+    The confused letters substitutions and the weak letters insertions
+    and deletions cost less.
+    @param key: a search key.
+    @type key: unicode.
+    @param i: the deleted letter position of key, KEY_POSITION for none.
+    @type i: integer.
+    @param other: another search key.
+    @type other: unicode.
+    @param j: the deleted letter position of other, KEY_POSITION for none.
+    @type j: integer.
+    @rtype: float
+    """
+    if i == KEY_POSITION:
+        if j == KEY_POSITION:
+            return 0.0
+        return LETTER_COSTS.get(other[j], 1.0)
+    if j == KEY_POSITION:
+        return LETTER_COSTS.get(key[i], 1.0)
+    if i == j:
+        return SUBSTITUTION_COSTS.get((key[i], other[j]), 1.0)
+    if abs(i - j) == 1 and key[i] == other[j] and key[j] == other[i]:
+        # adjacent transposition
+        return 1.0
+    return LETTER_COSTS.get(key[i], 1.0) + LETTER_COSTS.get(other[j], 1.0)
+
+
+class SearchIndex:
+    """
+    The deletion index of the lexicon verbs.
+    """
+    __slots__ = ("keys", "verbs", "freqs", "deletions")
+
+    def __init__(self, entries):
+        """
+        init method
+        @param entries: (unvocalized verb, frequency) of the lexicon.
+        @type entries: iterable of tuple.
+        """
+        # key number: key, lexicon verbs and frequency
+        self.keys = []
+        self.verbs = []
+        self.freqs = []
+        numbers = {}
+        for (verb, freq) in entries:
+            key = search_key(verb)
+            if not key or len(key) >= KEY_POSITION:
+                continue
+            number = numbers.get(key)
+            if number is None:
+                number = len(self.keys)
+                numbers[key] = number
+                self.keys.append(key)
+                self.verbs.append([])
+                self.freqs.append(0)
+            if verb not in self.verbs[number]:
+                self.verbs[number].append(verb)
+            self.freqs[number] = max(self.freqs[number], freq or 0)
+        self.verbs = [tuple(verbs) for verbs in self.verbs]
+        # a deletion or a key: the key numbers and the deleted positions
+        deletions = {}
+        for (number, key) in enumerate(self.keys):
+            for (position, deletion) in _deletions(key):
+                deletions.setdefault(deletion, []).append(
+                    number << POSITION_BITS | position)
+        self.deletions = dict((deletion, tuple(entries))
+            for (deletion, entries) in deletions.items())
+
+    def get_state(self):
+        """
+        Get the tables of the index, to be saved in a snapshot.
+        @rtype: tuple
+        """
+        return (self.keys, self.verbs, self.freqs, self.deletions)
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Create the index from the tables given by get_state.
+        @rtype: SearchIndex
+        """
+        index = cls(())
+        (index.keys, index.verbs, index.freqs, index.deletions) = state
+        return index
+
+    def search(self, word, limit = SEARCH_LIMIT):
+        """
+        Search the lexicon verbs near a word.
+        @param word: given word.
+        @type word: unicode.
+        @param limit: maximum number of results.
+        @type limit: integer.
+        @return: (lexicon verb, distance, frequency), by distance and
+        frequency.
+        @rtype: list of tuple.
+        """
+        key = search_key(word)
+        if not key:
+            return []
+        costs = {}
+        for (i, deletion) in _deletions(key):
+            for entry in self.deletions.get(deletion, ()):
+                number = entry >> POSITION_BITS
+                cost = edit_cost(key, i, self.keys[number],
+                    entry & KEY_POSITION)
+                if cost < costs.get(number, MAX_DISTANCE + 1):
+                    costs[number] = cost
+        found = sorted((cost, -self.freqs[number], self.keys[number], number)
+            for (number, cost) in costs.items() if cost <= MAX_DISTANCE)
+        results = []
+        for (cost, freq, other, number) in found:
+            for verb in self.verbs[number]:
+                results.append((verb, cost, -freq))
+                if len(results) >= limit:
+                    return results
+        return results
+
+
+def lexicon_entries(db_file):
+    """
+    Get the unvocalized verbs of the dictionary, with their frequency.
+    @param db_file: the verbdict database file.
+    @type db_file: string.
+    @return: (unvocalized verb, frequency)
+    @rtype: list of tuple.
+    """
+    with db_pool.connection(db_file) as conn:
+        freqs = {}
+        for (verb, freq) in conn.execute("""select unvocalized, freq
+                from freq_verbs"""):
+            key = search_key(verb or u"")
+            freqs[key] = max(freqs.get(key, 0), freq or 0)
+        rows = conn.execute("""select verb_unvocalised from verbdict
+                union all
+                select unmarked from verbmore""").fetchall()
+    return [(verb, freqs.get(search_key(verb), 0)) for (verb, ) in rows
+        if verb]
+
+
+def get_index(db_file = DB_PATH):
+    """
+    Get the search index of a dictionary, built on the first use.
+    @param db_file: the verbdict database file.
+    @type db_file: string.
+    @return: the index, None if the dictionary is not available.
+    @rtype: SearchIndex
+    """
+    db_file = os.path.abspath(db_file)
+    if db_file not in _indexes:
+        with _lock:
+            if db_file not in _indexes:
+                index = None
+                if os.path.exists(db_file):
+                    # the index of the snapshot, if it's built from the
+                    # same dictionary
+                    state = index_snapshot.get_dictionary_section(
+                        "verb_search", db_file)
+                    try:
+                        if state:
+                            index = SearchIndex.from_state(state)
+                        else:
+                            index = SearchIndex(lexicon_entries(db_file))
+                    except sqlite3.Error:
+                        logging.exception("verb search: can't open %s",
+                            db_file)
+                _indexes[db_file] = index
+    return _indexes[db_file]
+
+
+def load(db_file = DB_PATH):
+    """
+    Build the search index, it's built on the first search if not loaded.
+    @return: True if the index is available.
+    @rtype: Boolean
+    """
+    return get_index(db_file) is not None
+
+
+def reset():
+    """
+    Drop the search indexes and the search cache, used when the
+    dictionary is changed.
+    """
+    with _lock:
+        _indexes.clear()
+        SEARCH_CACHE.clear()
+
+
+def search(word, limit = SEARCH_LIMIT, db_file = DB_PATH):
+    """
+    Search the lexicon verbs near a misspelled verb.
+    @param word: given word.
+    @type word: unicode.
+    @param limit: maximum number of results.
+    @type limit: integer.
+    @param db_file: the verbdict database file.
+    @type db_file: string.
+    @return: (lexicon verb, distance, frequency), by distance and
+    frequency, the list must not be modified.
+    @rtype: list of tuple.
+    """
+    return search_many([word], limit, db_file)[0]
+
+
+def search_many(words, limit = SEARCH_LIMIT, db_file = DB_PATH):
+    """
+    Search many words, every distinct word is searched once,
+    the results are cached.
+    @param words: given words.
+    @type words: iterable of unicode.
+    @param limit: maximum number of results by word.
+    @type limit: integer.
+    @param db_file: the verbdict database file.
+    @type db_file: string.
+    @return: the results of every word, in the order of words,
+    the lists must not be modified.
+    @rtype: list of list.
+    """
+    index = get_index(db_file)
+    results = []
+    for word in words:
+        if index is None:
+            results.append([])
+            continue
+        cache_key = (index, word, limit)
+        found = SEARCH_CACHE.get(cache_key)
+        if found is None:
+            found = index.search(word, limit)
+            SEARCH_CACHE.set(cache_key, found)
+        results.append(found)
+    return results
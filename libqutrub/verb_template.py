@@ -0,0 +1,212 @@
+#!/usr/bin/python
+# -*- coding=utf-8 -*-
+#************************************************************************
+# Verb template
+#
+# Description:
+# Conjugation by root substitution in paradigm templates
+#
+# Copyright (c) 2026, Qutrub-ng Project
+#
+#***********************************************************************/
+"""
+Conjugation by root substitution.
+Verbs which have the same length, marks, weak letters, hamza and shadda
+positions are conjugated in the same way, only the radical letters differ.
+A paradigm template is made once for every class of verbs, by conjugating
+a verb where plain radical letters are replaced by placeholders,
+the same rules of ar_verb are used.
+A verb of the same class is conjugated by putting its radical letters
+in the template.
+Verbs which can't be templated (irregular verbs, verbs starting by
+alef madda) are conjugated by the rules.
+"""
+import os
+import pyarabic.araby as araby
+import libqutrub.ar_verb as ar_verb
+import libqutrub.verb_const as vconst
+import libqutrub.classverb as classverb
+import libqutrub.verb_cache as verb_cache
+import libqutrub.db_pool as db_pool
+
+# the default dictionary file, its verbmore verbs are verified
+DB_PATH = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "data", "verbdict.db")
+# number of paradigm templates kept in the templates cache
+TEMPLATE_CACHE_SIZE = 4096
+# letters which are not used by conjugation rules,
+# the weak letters, hamza forms, alef forms, Teh and Noon are used by rules
+PLAIN_LETTERS = frozenset(u"بثجحخدذرزسشصضطظعغفقكلمه")
+# placeholders of radical letters, private use characters
+PLACEHOLDERS = u"".join([chr(0xE000 + i) for i in range(10)])
+# the letters of irregular verbs, those verbs are not templated
+IRREGULAR_LETTERS = frozenset([key[:3] for key in vconst.IRREGULAR_VERB_CONJUG])
+
+# the global templates cache
+TEMPLATE_CACHE = verb_cache.LRUCache(TEMPLATE_CACHE_SIZE)
+
+
+def get_signature(word):
+    """
+    Get the class signature of a verb, the verb where plain letters
+    are replaced by placeholders, the same letters have the same placeholder.
+    @param word: the given verb.
+    @type word: unicode.
+    @return: (signature, radicals) or None if the verb can't be templated.
+    @rtype: tuple of unicode.
+    """
+    if not word or word.startswith(araby.ALEF_MADDA):
+        return None
+    letters = ar_verb.uniformate_verb(word)[0]
+    if len(letters) == 3 and letters in IRREGULAR_LETTERS:
+        return None
+    placeholders = {}
+    radicals = []
+    signature = []
+    for char in word:
+        if char in PLAIN_LETTERS:
+            if char not in placeholders:
+                placeholders[char] = PLACEHOLDERS[len(radicals)]
+                radicals.append(char)
+            signature.append(placeholders[char])
+        else:
+            signature.append(char)
+    if not radicals:
+        return None
+    return (u"".join(signature), u"".join(radicals))
+
+
+def conjugate_by_rules(word, future_type, transitive, listtense = None):
+    """
+    Conjugate a verb by the rule pipeline.
+    @param word: the given verb.
+    @type word: unicode.
+    @param future_type: the future mark (Fatha, Damma, Kasra).
+    @type future_type: unicode char.
+    @param transitive: the verb is transitive or not.
+    @type transitive: Boolean.
+    @param listtense: the conjugated tenses, default all tenses.
+    @type listtense: list of unicode.
+    @return: (conjugation table, verb type, future form)
+    @rtype: tuple
+    """
+    vbc = classverb.VerbClass(word, transitive, future_type, display=False)
+    return (vbc.conjugate_raw(listtense), vbc.vtype, vbc.get_future_form())
+
+
+def get_template(signature, future_type, transitive, listtense):
+    """
+    Get the paradigm template of a verb class, the template is made
+    by conjugating the signature, and kept in the templates cache.
+    @param signature: the class signature given by get_signature.
+    @type signature: unicode.
+    @param future_type: the future mark (Fatha, Damma, Kasra).
+    @type future_type: unicode char.
+    @param transitive: the verb is transitive or not.
+    @type transitive: Boolean.
+    @param listtense: the conjugated tenses.
+    @type listtense: list of unicode.
+    @return: (conjugation table, verb type, future form) with placeholders.
+    @rtype: tuple
+    """
+    key = verb_cache.result_key(signature, future_type, transitive,
+     listtense)
+    template = TEMPLATE_CACHE.get(key)
+    if template is None:
+        template = conjugate_by_rules(signature, future_type, transitive,
+         listtense)
+        TEMPLATE_CACHE.set(key, template)
+    return template
+
+
+def conjugate_raw(word, future_type, transitive, listtense = None):
+    """
+    Conjugate a verb by root substitution in the template of its class,
+    the verbs which can't be templated are conjugated by rules.
+    @param word: the given verb.
+    @type word: unicode.
+    @param future_type: the future mark, or its name (فتحة، ضمة، كسرة).
+    @type future_type: unicode.
+    @param transitive: the verb is transitive or not.
+    @type transitive: Boolean.
+    @param listtense: the conjugated tenses, default all tenses.
+    @type listtense: list of unicode.
+    @return: (conjugation table {tense:{pronoun:conjugated}}, verb type,
+    future form)
+    @rtype: tuple
+    """
+    future_type = ar_verb.get_future_type_by_name(future_type)
+    if not listtense:
+        listtense = vconst.TABLE_TENSE
+    sig = get_signature(word)
+    if not sig:
+        return conjugate_by_rules(word, future_type, transitive, listtense)
+    (signature, radicals) = sig
+    (template, vtype, future_form) = get_template(signature, future_type,
+     transitive, listtense)
+    translation = dict((ord(PLACEHOLDERS[i]), radicals[i])
+        for i in range(len(radicals)))
+    table = {}
+    for tense in template:
+        row = {}
+        for pronoun in template[tense]:
+            row[pronoun] = template[tense][pronoun].translate(translation)
+        table[tense] = row
+    return (table, vtype, future_form.translate(translation))
+
+
+def verify(verbs = None, listtense = None):
+    """
+    Compare the templates conjugation with the rule pipeline.
+    @param verbs: list of (verb, future_type, transitive),
+    default all verbs of the lexicon, transitive and not.
+    @type verbs: iterable of tuple.
+    @param listtense: the conjugated tenses, default all tenses.
+    @type listtense: list of unicode.
+    @return: the verbs which have a different conjugation.
+    @rtype: list of tuple.
+    """
+    if verbs is None:
+        verbs = lexicon_verbs()
+    mismatches = []
+    for (verb, future_type, transitive) in verbs:
+        future_type = ar_verb.get_future_type_by_name(future_type)
+        expected = conjugate_by_rules(verb, future_type, transitive,
+         listtense)
+        if conjugate_raw(verb, future_type, transitive,
+           listtense) != expected:
+            mismatches.append((verb, future_type, transitive))
+    return mismatches
+
+
+def lexicon_verbs(db_file = DB_PATH):
+    """
+    Get all verbs of the lexicon, transitive and not: the triliteral verbs
+    lexicon, and the verbmore verbs of the dictionary, conjugated with
+    Fatha as future type.
+    @param db_file: the verbdict database file, its verbmore verbs are
+    skipped if it's not available.
+    @type db_file: string.
+    @return: (verb, future_type, transitive)
+    @rtype: generator of tuple.
+    """
+    import libqutrub.verb_db as verb_db
+    for entry in verb_db.get_triverbtable().entries():
+        for transitive in (True, False):
+            yield (entry['verb'], entry['haraka'], transitive)
+    if not os.path.exists(db_file):
+        return
+    with db_pool.connection(db_file) as conn:
+        rows = conn.execute("""select verb from verbmore
+                order by rowid""").fetchall()
+    # the verbs are kept in the table order, once
+    for verb in dict.fromkeys(verb for (verb, ) in rows if verb):
+        for transitive in (True, False):
+            yield (verb, u"فتحة", transitive)
+
+
+if __name__ == "__main__":
+    MISMATCHES = verify()
+    for item in MISMATCHES:
+        print(u"\t".join([item[0], item[1], str(item[2])]))
+    print("%d mismatches" % len(MISMATCHES))
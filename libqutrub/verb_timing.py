@@ -0,0 +1,154 @@
+#!/usr/bin/python
+# -*- coding=utf-8 -*-
+#************************************************************************
+# Verb timing
+#
+# Description:
+# Optional timing of the conjugation stages
+#
+# Copyright (c) 2026, Qutrub-ng Project
+#
+#***********************************************************************/
+"""
+Time the stages of the conjugation engine.
+When enabled, the functions of every stage are replaced by wrappers
+which count the calls and the cumulative time of the stage, when
+disabled, the original functions are restored, so the timing has no
+cost if it's not used.
+The time of a stage includes the time of the stages called by it.
+
+    import libqutrub.verb_timing as verb_timing
+    with verb_timing.timing():
+        do_sarf(...)
+    stats = verb_timing.get_stats()
+"""
+import time
+import functools
+import threading
+import contextlib
+
+import libqutrub.ar_verb as ar_verb
+import libqutrub.classverb as classverb
+import libqutrub.verb_cache as verb_cache
+import libqutrub.verb_template as verb_template
+import libqutrub.conjugatedisplay as conjugatedisplay
+import libqutrub.conjugation_store as conjugation_store
+
+# the timed stages, (stage name, owner, function name)
+STAGES = [
+    ("uniformate_verb", ar_verb, "uniformate_verb"),
+    ("prepare_past_stem", classverb.VerbClass, "_prepare_past_stem"),
+    ("prepare_passive_past_stem", classverb.VerbClass,
+        "_prepare_passive_past_stem"),
+    ("prepare_future_imperative_stem", classverb.VerbClass,
+        "_prepare_future_imperative_stem"),
+    ("prepare_irregular_stem", classverb.VerbClass,
+        "_prepare_irregular_future_imperative_stem"),
+    ("conjugate_tense_pronoun", classverb.VerbClass, "conjugate_tense_pronoun"),
+    ("uniformate_suffix", ar_verb, "uniformate_suffix"),
+    ("treat_sukun", ar_verb, "treat_sukun2"),
+    ("standard", ar_verb, "standard2"),
+    ("template_conjugation", verb_template, "conjugate_raw"),
+    ("cache_lookup", verb_cache.LRUCache, "get"),
+    ("store_lookup", conjugation_store, "lookup"),
+    ("display_create", classverb, "create_display"),
+    ("display_fill", classverb.VerbClass, "render_raw"),
+    ("display_render", conjugatedisplay.ConjugateDisplay, "display"),
+]
+
+# the original functions of the timed stages, when enabled
+_originals = {}
+# stage name: [calls, cumulative time]
+_stats = dict((name, [0, 0.0]) for (name, owner, attribute) in STAGES)
+_lock = threading.Lock()
+
+
+def _timed(name, function):
+    """
+    Wrap a function to count its calls and time in a stage.
+    """
+    counter = _stats[name]
+    clock = time.perf_counter
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            elapsed = clock() - start
+            with _lock:
+                counter[0] += 1
+                counter[1] += elapsed
+    return wrapper
+
+
+def enable():
+    """
+    Start timing the conjugation stages.
+    """
+    with _lock:
+        if _originals:
+            return
+        for (name, owner, attribute) in STAGES:
+            function = owner.__dict__[attribute]
+            _originals[name] = function
+            setattr(owner, attribute, _timed(name, function))
+
+
+def disable():
+    """
+    Stop timing, the original functions are restored,
+    the collected stats are kept.
+    """
+    with _lock:
+        for (name, owner, attribute) in STAGES:
+            if name in _originals:
+                setattr(owner, attribute, _originals.pop(name))
+
+
+def is_enabled():
+    """
+    Test if the stages are timed.
+    @rtype: Boolean
+    """
+    return bool(_originals)
+
+
+def reset():
+    """
+    Clear the collected stats.
+    """
+    with _lock:
+        for counter in _stats.values():
+            counter[0] = 0
+            counter[1] = 0.0
+
+
+@contextlib.contextmanager
+def timing():
+    """
+    Time the conjugation stages inside a with block.
+    The timing is disabled at the end of the block, if it was not enabled.
+    """
+    enabled = is_enabled()
+    enable()
+    try:
+        yield _stats
+    finally:
+        if not enabled:
+            disable()
+
+
+def get_stats():
+    """
+    Get the collected stats of the stages.
+    @return: {stage:{'calls':calls, 'total':seconds, 'mean':seconds}}
+    @rtype: dict
+    """
+    with _lock:
+        stats = {}
+        for (name, owner, attribute) in STAGES:
+            (calls, total) = _stats[name]
+            stats[name] = {"calls":calls, "total":total,
+                "mean":total / calls if calls else 0.0}
+    return stats
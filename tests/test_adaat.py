@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for the conjugation service of the interfaces
+"""
+import unittest
+import sys
+import os
+BASE_DIR = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, BASE_DIR)
+
+import libqutrub.verb_cache as verb_cache
+import libqutrub.verb_const as vconst
+import core.qutrub_api as qutrub_api
+import core.adaat as adaat
+import config.qutrub_config
+
+
+class AdaatTestCase(unittest.TestCase):
+    """Tests for the conjugation service"""
+
+    def setUp(self):
+        self.db_base_path = config.qutrub_config.DB_BASE_PATH
+        config.qutrub_config.DB_BASE_PATH = BASE_DIR
+
+    def tearDown(self):
+        config.qutrub_config.DB_BASE_PATH = self.db_base_path
+
+    def test_warmup(self):
+        """The warm-up fills the result cache in background"""
+        verb_cache.RESULT_CACHE.clear()
+        thread = adaat.start_warmup(20, 60)
+        thread.join()
+        self.assertGreaterEqual(len(verb_cache.RESULT_CACHE), 20)
+        hits = verb_cache.RESULT_CACHE.hits
+        adaat.conjugate(u"كان", dict(adaat.WARMUP_OPTIONS))
+        self.assertGreater(verb_cache.RESULT_CACHE.hits, hits)
+        # the time budget is spent
+        self.assertEqual(adaat.warmup(20, -1), 0)
+        self.assertEqual(adaat.warmup(0), 0)
+
+    def test_conjugation_service(self):
+        """The service is reused, and gives the results of the api"""
+        service = adaat.get_service()
+        self.assertIs(adaat.get_service(), service)
+        options = {"all":True, "future_type":u"فتحة", "transitive":True}
+        api = qutrub_api.QutrubApi(db_path=BASE_DIR)
+        for word in (u"كتب", u"استعمل"):
+            verb = api.find_verb(word, u"فتحة")[0]
+            expected = adaat.do_sarf(api, verb["verb"], verb["haraka"],
+                transitive=verb["transitive"])
+            result = adaat.conjugate(word, options)
+            self.assertEqual(result["table"], expected["table"])
+            self.assertEqual(result["verb_info"], api.format_verb_info(
+                expected["verb_info"], True))
+            self.assertEqual(result["suggest"],
+                api.suggest_similar_verb_list(verb["verb"], verb["haraka"]))
+        # a misspelled verb
+        result = adaat.conjugate(u"كتبة", options)
+        self.assertEqual(result["table"], [])
+        self.assertEqual(result["suggest"],
+            api.suggest_similar_verb_list(u"كتبة", u"فتحة"))
+
+    def test_conjugation_filters(self):
+        """Only the given sections, tenses and pronouns are computed"""
+        options = {"all":True, "transitive":True, "fields":["table"],
+            "tenses":[vconst.TensePast, vconst.TenseFuture],
+            "pronouns":[u"هو"]}
+        result = adaat.conjugate(u"كتب", options)
+        self.assertEqual(result["table"], {0:{0:u"الضمائر",
+            1:vconst.TensePast, 2:vconst.TenseFuture},
+            1:{0:u"هو", 1:u"كَتَبَ", 2:u"يَكْتُبُ"}})
+        self.assertEqual((result["verb_info"], result["suggest"]), ("", []))
+        # the passive tenses of intransitive verbs are not given
+        options = {"transitive":False, "fields":["table"],
+            "tenses":[vconst.TensePassivePast]}
+        self.assertFalse(adaat.conjugate(u"جلس", options)["table"])
+        # no suggestion is searched for a misspelled verb
+        result = adaat.conjugate(u"كتبة", {"fields":["verb_info"]})
+        self.assertEqual(result["suggest"], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
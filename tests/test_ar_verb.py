@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for the orthographic treatment of conjugated verbs
+"""
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pyarabic.araby as araby
+import libqutrub.ar_verb as ar_verb
+import libqutrub.verb_const as vconst
+import libqutrub.classverb as classverb
+
+
+class OrthographicTreatmentTestCase(unittest.TestCase):
+    """Tests for geminating, hamza and weak letters treatment"""
+
+    # (verb, future type, past with أنا, past with هم, present with هم,
+    # imperative with أنتما, jussive with أنتم)
+    VERBS = [
+        (u"مَدَّ", araby.DAMMA,
+         [u"مَدَدْتُ", u"مَدُّوا", u"يَمُدُّونَ", u"مُدَّا", u"تَمُدُّوا"]),
+        (u"رَمَى", araby.KASRA,
+         [u"رَمَيْتُ", u"رَمَوْا", u"يَرْمُونَ", u"اِرْمِيَا", u"تَرْمُوا"]),
+        (u"سَأَلَ", araby.FATHA,
+         [u"سَأَلْتُ", u"سَأَلُوا", u"يَسْأَلُونَ", u"اِسْأَلَا", u"تَسْأَلُوا"]),
+        (u"قَالَ", araby.DAMMA,
+         [u"قُلْتُ", u"قَالُوا", u"يَقُولُونَ", u"قُولَا", u"تَقُولُوا"]),
+        (u"وَعَدَ", araby.KASRA,
+         [u"وَعَدْتُ", u"وَعَدُوا", u"يَعِدُونَ", u"عِدَا", u"تَعِدُوا"]),
+    ]
+    CELLS = [(vconst.TensePast, u"أنا"), (vconst.TensePast, u"هم"),
+        (vconst.TenseFuture, u"هم"), (vconst.TenseImperative, u"أنتما"),
+        (vconst.TenseJussiveFuture, u"أنتم")]
+
+    def test_conjugation(self):
+        """Geminated, hamzated and weak verbs are written correctly"""
+        for (verb, future_type, expected) in self.VERBS:
+            vbc = classverb.VerbClass(verb, True, future_type, display=False)
+            table = vbc.conjugate_raw(None)
+            self.assertEqual([table[tense][pronoun]
+                for (tense, pronoun) in self.CELLS], expected)
+
+    def test_unchanged(self):
+        """Words without the treated letters are not changed"""
+        self.assertEqual(ar_verb.geminating(u"كتب", u"ـَـ"), (u"كتب", u"ـَـ"))
+        self.assertEqual(ar_verb.homogenize(u"كتب", u"َََ"), (u"كتب", u"َََ"))
+        self.assertEqual(ar_verb.tahmeez2(u"كتب", u"َََ"), u"كتب")
+        self.assertEqual(ar_verb.treat_sukun2(u"كتب", u"َََ"), u"َََ")
+
+    def test_inequal_length(self):
+        """Letters and harakat of different length are refused"""
+        self.assertEqual(ar_verb.tahmeez2(u"سءل", u"َ"), u"")
+        self.assertEqual(ar_verb.treat_sukun2(u"كتب", u"َْ"), u"َْ")
+
+
+if __name__ == '__main__':
+    unittest.main()
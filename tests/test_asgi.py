@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for the asyncio entry point of the web interface
+"""
+import unittest
+import sys
+import os
+import json
+import asyncio
+import urllib.parse
+BASE_DIR = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, BASE_DIR)
+
+import config.qutrub_config
+import core.response_cache as response_cache
+import libqutrub.verb_cache as verb_cache
+import asgi
+
+
+def call(method, path, args = None, headers = None, body = b""):
+    """
+    Send a request to the application.
+    @return: (status, headers, body)
+    @rtype: tuple
+    """
+    scope = {"type":"http", "method":method, "path":path,
+        "query_string":urllib.parse.urlencode(args or {}).encode("ascii"),
+        "headers":[(name.encode("latin-1"), value.encode("latin-1"))
+            for (name, value) in (headers or {}).items()]}
+    messages = []
+    async def receive():
+        return {"type":"http.request", "body":body, "more_body":False}
+    async def send(message):
+        messages.append(message)
+    asyncio.run(asgi.application(scope, receive, send))
+    start = messages[0]
+    return (start["status"], dict((name.decode("latin-1"),
+        value.decode("latin-1")) for (name, value) in start["headers"]),
+        b"".join(message.get("body", b"") for message in messages[1:]))
+
+
+class AsgiTestCase(unittest.TestCase):
+    """Tests for the ASGI application"""
+
+    def setUp(self):
+        self.config = dict((name, getattr(config.qutrub_config, name))
+            for name in ("DB_BASE_PATH", "ASGI_WORKERS", "ASGI_MAX_PENDING",
+                "ASGI_TIMEOUT", "ASGI_PROCESSES", "BATCH_MAX_SIZE",
+                "WARMUP_VERBS"))
+        config.qutrub_config.DB_BASE_PATH = BASE_DIR
+        asgi._pool.clear()
+        response_cache.invalidate()
+
+    def tearDown(self):
+        for (name, value) in self.config.items():
+            setattr(config.qutrub_config, name, value)
+        if "pool" in asgi._pool:
+            asgi._pool.pop("pool").shutdown()
+        response_cache.invalidate()
+
+    def test_api(self):
+        """The /api responses are cached, with an ETag"""
+        args = {"verb":u"كتب", "haraka":"u"}
+        (status, headers, body) = call("GET", "/api", args)
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["content-type"],
+            "application/json; charset=utf-8")
+        self.assertEqual(headers["etag"], '"%s"'
+            % response_cache.content_etag(body))
+        self.assertEqual(headers["cache-control"], "public, max-age=%d"
+            % config.qutrub_config.RESPONSE_MAX_AGE)
+        self.assertEqual(headers["access-control-allow-origin"], "*")
+        self.assertTrue(json.loads(body)["result"])
+        # the verb and the future mark given in the path
+        self.assertEqual(call("GET", "/api/%s/u" % u"كتب")[2], body)
+        # a HEAD request gets the headers only
+        (status, headers2, body2) = call("HEAD", "/api", args)
+        self.assertEqual((status, body2), (200, b""))
+        self.assertEqual(headers2["content-length"], str(len(body)))
+        # the client has the response
+        (status, headers3, body3) = call("GET", "/api", args,
+            {"If-None-Match":'"other", W/%s' % headers["etag"]})
+        self.assertEqual((status, body3), (304, b""))
+        self.assertEqual(headers3["etag"], headers["etag"])
+        self.assertEqual(call("GET", "/api", {"response_type":
+            "get_random_text"})[0], 200)
+
+    def test_ajax(self):
+        """The GET and POST /ajaxGet requests, the invalid requests"""
+        args = {"text":u"استعمل", "action":"Conjugate", "all":True}
+        (status, headers, body) = call("POST", "/ajaxGet",
+            body=json.dumps({"data":args}).encode("utf-8"))
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["content-type"], "application/json")
+        self.assertTrue(json.loads(body)["result"])
+        self.assertEqual(call("GET", "/ajaxGet", {"text":u"استعمل",
+            "action":"Conjugate", "all":"true"})[0], 200)
+        for data in (b"{", b"[1]", b'{"text":1}', b'{"data":[1]}',
+                b'{"data":"text"}'):
+            (status, headers, body) = call("POST", "/ajaxGet", body=data)
+            self.assertEqual(status, 400, data)
+            self.assertEqual(json.loads(body), {"error":"invalid request"})
+        # the posted request is too long
+        self.assertEqual(call("POST", "/ajaxGet",
+            body=b" " * (asgi.MAX_BODY_SIZE + 1))[0], 413)
+
+    def test_routes(self):
+        """The redirections and the unknown requests"""
+        (status, headers, body) = call("GET", "/verb/%s/%s" % (u"كتب",
+            u"ضمة"))
+        self.assertEqual(status, 302)
+        self.assertEqual(urllib.parse.unquote(headers["location"]),
+            u"/?verb=كتب&haraka=ضمة&trans=False")
+        for (method, path) in (("GET", "/none"), ("POST", "/api"),
+                ("GET", "/api/batch/x/y"), ("GET", "/verb")):
+            self.assertEqual(call(method, path)[0], 404, path)
+
+    def test_busy(self):
+        """A full pool gives 503, a late conjugation gives 504"""
+        config.qutrub_config.ASGI_MAX_PENDING = 0
+        (status, headers, body) = call("GET", "/api", {"verb":u"جلس"})
+        self.assertEqual(status, 503)
+        self.assertEqual(headers["retry-after"], "1")
+        self.assertEqual(json.loads(body), {"error":"busy"})
+        asgi._pool.pop("pool").shutdown()
+        config.qutrub_config.ASGI_MAX_PENDING = 4
+        config.qutrub_config.ASGI_TIMEOUT = 0
+        (status, headers, body) = call("GET", "/api", {"verb":u"جلس"})
+        self.assertEqual(status, 504)
+        self.assertEqual(json.loads(body), {"error":"timeout"})
+        self.assertEqual(asgi.get_pool().stats()["timeouts"], 1)
+        # the errors are not cached
+        config.qutrub_config.ASGI_TIMEOUT = None
+        asgi._pool.pop("pool").shutdown()
+        self.assertEqual(call("GET", "/api", {"verb":u"جلس"})[0], 200)
+
+    def test_batch(self):
+        """The batch lines are the /api responses, as they are done"""
+        config.qutrub_config.ASGI_WORKERS = 2
+        # the batch doesn't fill the pool
+        config.qutrub_config.ASGI_MAX_PENDING = 1
+        verbs = [u"كتب", {"verb":u"قال", "haraka":"u"}, 5, u"جلس", u"ذهب"]
+        (status, headers, body) = call("POST", "/api/batch",
+            body=json.dumps(verbs).encode("utf-8"))
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["content-type"], "application/x-ndjson")
+        lines = dict((line["index"], line) for line in map(json.loads,
+            body.splitlines()))
+        self.assertEqual(sorted(lines), [0, 1, 2, 3, 4])
+        self.assertEqual(lines[2], {"index":2, "verb":None,
+            "error":"a verb is expected"})
+        for index in (0, 1, 3, 4):
+            self.assertNotIn("error", lines[index])
+        self.assertEqual(lines[1]["response"], json.loads(call("GET", "/api",
+            {"verb":u"قال", "haraka":"u"})[2]))
+        self.assertEqual(asgi.get_pool().stats()["refused"], 0)
+
+    def test_batch_errors(self):
+        """The invalid and too long batches"""
+        for data in (b"{", b'{"verb":"x"}', b'"x"'):
+            self.assertEqual(call("POST", "/api/batch", body=data)[0], 400)
+        config.qutrub_config.BATCH_MAX_SIZE = 2
+        self.assertEqual(call("POST", "/api/batch",
+            body=json.dumps([u"كتب"] * 3).encode("utf-8"))[0], 413)
+        self.assertEqual(call("POST", "/api/batch",
+            body=json.dumps([u"كتب"] * 2).encode("utf-8"))[0], 200)
+
+    def test_lifespan(self):
+        """The pool is started at startup and stopped at shutdown"""
+        config.qutrub_config.WARMUP_VERBS = 0
+        messages = [{"type":"lifespan.startup"}, {"type":"lifespan.shutdown"}]
+        sent = []
+        states = []
+        async def receive():
+            states.append("pool" in asgi._pool)
+            return messages.pop(0)
+        async def send(message):
+            sent.append(message["type"])
+        asyncio.run(asgi.application({"type":"lifespan"}, receive, send))
+        self.assertEqual(sent, ["lifespan.startup.complete",
+            "lifespan.shutdown.complete"])
+        self.assertEqual(states, [False, True])
+        self.assertNotIn("pool", asgi._pool)
+
+    def test_lifespan_processes(self):
+        """The worker processes warm up, the main process doesn't"""
+        config.qutrub_config.ASGI_PROCESSES = True
+        config.qutrub_config.ASGI_WORKERS = 2
+        config.qutrub_config.WARMUP_VERBS = 5
+        warmups = []
+        results = []
+        async def get(verb):
+            messages = []
+            async def send(message):
+                messages.append(message)
+            await asgi.application({"type":"http", "method":"GET",
+                "path":"/api", "query_string":urllib.parse.urlencode(
+                    {"verb":verb}).encode("ascii"), "headers":[]},
+                None, send)
+            return (messages[0]["status"], messages[1]["body"])
+        async def receive():
+            if not results:
+                results.append(None)
+                return {"type":"lifespan.startup"}
+            # the requests are served by the started worker processes
+            results.extend([await get(verb)
+                for verb in (u"كتب", u"قال", u"جلس")])
+            return {"type":"lifespan.shutdown"}
+        async def send(message):
+            pass
+        start_warmup = asgi.core.adaat.start_warmup
+        try:
+            asgi.core.adaat.start_warmup = lambda: warmups.append(True)
+            asyncio.run(asgi.application({"type":"lifespan"}, receive, send))
+        finally:
+            asgi.core.adaat.start_warmup = start_warmup
+        self.assertEqual(warmups, [])
+        self.assertEqual([status for (status, body) in results[1:]],
+            [200, 200, 200])
+        self.assertTrue(json.loads(results[1][1])["result"])
+
+    def test_worker_database(self):
+        """The workers drop their dictionary data if it's changed"""
+        config.qutrub_config.WARMUP_VERBS = 0
+        asgi.init_worker()
+        db_file = response_cache._database["path"]
+        self.assertEqual(db_file, os.path.abspath(os.path.join(BASE_DIR,
+            "data", "verbdict.db")))
+        verb_cache.FUTURE_CACHE.set((u"x", u"y"), u"z")
+        asgi.compute_response("api", u"كتب", "Conjugate", {})
+        self.assertIn((u"x", u"y"), verb_cache.FUTURE_CACHE)
+        # the dictionary is replaced
+        response_cache._database["signature"] = (0, 0)
+        asgi.compute_response("api", u"كتب", "Conjugate", {})
+        self.assertNotIn((u"x", u"y"), verb_cache.FUTURE_CACHE)
+        self.assertEqual(response_cache._database["signature"],
+            response_cache.database_signature(db_file))
+
+
+if __name__ == '__main__':
+    unittest.main()
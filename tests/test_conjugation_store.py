@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for the precomputed conjugation store
+"""
+import unittest
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pyarabic.araby as araby
+import libqutrub.mosaref_main
+import libqutrub.verb_cache as verb_cache
+import libqutrub.verb_template as verb_template
+import libqutrub.conjugation_store as conjugation_store
+
+
+class ConjugationStoreTestCase(unittest.TestCase):
+    """Tests for the conjugation store"""
+
+    VERBS = [(u"كَتَبَ", araby.DAMMA, True), (u"كَتَبَ", araby.DAMMA, False),
+        (u"رَمَى", araby.KASRA, True), (u"اِسْتَعْمَلَ", araby.FATHA, True)]
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store_file = os.path.join(self.tmpdir, "conjugations.db")
+        self.path = conjugation_store._store["path"]
+        conjugation_store.build(None, self.store_file, self.VERBS)
+        conjugation_store.set_store_path(self.store_file)
+        verb_cache.RESULT_CACHE.clear()
+
+    def tearDown(self):
+        conjugation_store.set_store_path(self.path)
+        verb_cache.RESULT_CACHE.clear()
+        shutil.rmtree(self.tmpdir)
+
+    def test_lookup(self):
+        """Stored verbs have the same conjugation as the engine"""
+        for (verb, future_type, transitive) in self.VERBS:
+            expected = verb_template.conjugate_by_rules(verb, future_type,
+                transitive)
+            result = conjugation_store.lookup(verb, future_type, transitive)
+            self.assertEqual(result, expected)
+            # the pronouns order is kept
+            self.assertEqual([list(row) for row in result[0].values()],
+                [list(row) for row in expected[0].values()])
+        tenses = [u"الماضي المعلوم", u"الأمر"]
+        self.assertEqual(conjugation_store.lookup(u"كَتَبَ", araby.DAMMA,
+            False, tenses), verb_template.conjugate_by_rules(u"كَتَبَ",
+            araby.DAMMA, False, tenses))
+        self.assertIsNone(conjugation_store.lookup(u"ضَرَبَ", araby.KASRA,
+            True))
+
+    def test_do_sarf(self):
+        """do_sarf gives the same result with and without the store"""
+        with_store = libqutrub.mosaref_main.do_sarf(u"رَمَى", u"كسرة",
+            transitive=True, display_format="DICT")
+        conjugation_store.set_store_path(None)
+        verb_cache.RESULT_CACHE.clear()
+        without_store = libqutrub.mosaref_main.do_sarf(u"رَمَى", u"كسرة",
+            transitive=True, display_format="DICT")
+        self.assertEqual(with_store, without_store)
+
+    def test_missing_store(self):
+        """A missing store file gives no result"""
+        conjugation_store.set_store_path(os.path.join(self.tmpdir, "none"))
+        self.assertIsNone(conjugation_store.lookup(u"كَتَبَ", araby.DAMMA,
+            True))
+
+    def test_rebuilt_store(self):
+        """A replaced store is checked again and used without restart"""
+        self.assertIsNone(conjugation_store.lookup(u"ضَرَبَ", araby.KASRA,
+            True))
+        conjugation_store.build(None, self.store_file + ".new",
+            self.VERBS + [(u"ضَرَبَ", araby.KASRA, True)])
+        os.replace(self.store_file + ".new", self.store_file)
+        self.assertIsNotNone(conjugation_store.lookup(u"ضَرَبَ", araby.KASRA,
+            True))
+
+    def test_store_fingerprint(self):
+        """A store built by other sources or dictionary is not used"""
+        try:
+            conjugation_store._sources["hash"] = "other"
+            conjugation_store.set_store_path(self.store_file)
+            self.assertIsNone(conjugation_store.lookup(u"كَتَبَ", araby.DAMMA,
+                True))
+        finally:
+            conjugation_store._sources.clear()
+        # the store is built from a copy of the dictionary
+        db_file = os.path.join(self.tmpdir, "verbdict.db")
+        shutil.copy(os.path.join(os.path.dirname(__file__), "..", "data",
+            "verbdict.db"), db_file)
+        conjugation_store.build(db_file, self.store_file, self.VERBS)
+        self.assertIsNotNone(conjugation_store.lookup(u"كَتَبَ", araby.DAMMA,
+            True))
+        # the other columns are not hashed
+        conn = sqlite3.connect(db_file)
+        with conn:
+            conn.execute("update verbdict set idverb = ''")
+        self.assertIsNotNone(conjugation_store.lookup(u"كَتَبَ", araby.DAMMA,
+            True))
+        with conn:
+            conn.execute("delete from verbdict where verb_vocalised = ?",
+                (u"كَتَبَ", ))
+        conn.close()
+        self.assertIsNone(conjugation_store.lookup(u"كَتَبَ", araby.DAMMA,
+            True))
+
+
+if __name__ == '__main__':
+    unittest.main()
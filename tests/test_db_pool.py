@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for the pooled read-only database connections
+"""
+import unittest
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import libqutrub.db_pool as db_pool
+import libqutrub.verb_db as verb_db
+
+
+class DbPoolTestCase(unittest.TestCase):
+    """Tests for the connection pool"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.tmpdir, "test.db")
+        conn = sqlite3.connect(self.db_file)
+        with conn:
+            conn.execute("create table verbs (verb text)")
+            conn.execute("insert into verbs values (?)", (u"كتب", ))
+        conn.close()
+
+    def tearDown(self):
+        db_pool.reset(self.db_file)
+        shutil.rmtree(self.tmpdir)
+
+    def test_reuse(self):
+        """A released connection is reused"""
+        with db_pool.connection(self.db_file) as conn:
+            self.assertEqual(conn.execute("select verb from verbs").fetchall(),
+                [(u"كتب", )])
+        with db_pool.connection(self.db_file) as conn2:
+            self.assertIs(conn2, conn)
+            # two connections are used at the same time
+            with db_pool.connection(self.db_file) as conn3:
+                self.assertIsNot(conn3, conn2)
+
+    def test_read_only(self):
+        """The connections can't write"""
+        with db_pool.connection(self.db_file) as conn:
+            self.assertRaises(sqlite3.Error, conn.execute,
+                "insert into verbs values ('x')")
+
+    def test_threads(self):
+        """A connection is used by other threads"""
+        with db_pool.connection(self.db_file) as conn:
+            pass
+        results = []
+        def lookup():
+            with db_pool.connection(self.db_file) as conn2:
+                results.append((conn2 is conn,
+                    conn2.execute("select count(*) from verbs").fetchone()))
+        thread = threading.Thread(target=lookup)
+        thread.start()
+        thread.join()
+        self.assertEqual(results, [(True, (1, ))])
+
+    def test_reset(self):
+        """The connections are closed by reset"""
+        with db_pool.connection(self.db_file) as conn:
+            pass
+        db_pool.reset(self.db_file)
+        self.assertRaises(sqlite3.ProgrammingError, conn.execute,
+            "select 1")
+        with db_pool.connection(self.db_file) as conn2:
+            self.assertIsNot(conn2, conn)
+
+    def test_writes_seen(self):
+        """The pooled connections see the writes of other connections"""
+        with db_pool.connection(self.db_file) as conn:
+            self.assertEqual(conn.execute("select count(*) from verbs"
+                ).fetchone(), (1, ))
+        writer = sqlite3.connect(self.db_file)
+        with writer:
+            writer.execute("insert into verbs values (?)", (u"قال", ))
+        writer.close()
+        with db_pool.connection(self.db_file) as conn2:
+            self.assertIs(conn2, conn)
+            self.assertEqual(conn2.execute("select count(*) from verbs"
+                ).fetchone(), (2, ))
+
+    @unittest.skipUnless(hasattr(os, "fork"), "fork is not available")
+    def test_fork(self):
+        """A forked process opens its own connections"""
+        with db_pool.connection(self.db_file) as conn:
+            pass
+        (read_fd, write_fd) = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                with db_pool.connection(self.db_file) as conn2:
+                    result = b"%d%d" % (conn2 is not conn, conn2.execute(
+                        "select count(*) from verbs").fetchone()[0])
+            except BaseException:
+                result = b"error"
+            os.write(write_fd, result)
+            os._exit(0)
+        os.close(write_fd)
+        os.waitpid(pid, 0)
+        with os.fdopen(read_fd, "rb") as pipe:
+            self.assertEqual(pipe.read(), b"11")
+        # the parent keeps its connection
+        with db_pool.connection(self.db_file) as conn3:
+            self.assertIs(conn3, conn)
+
+    def test_missing_file(self):
+        """A missing file is not created"""
+        missing = os.path.join(self.tmpdir, "none.db")
+        def lookup():
+            with db_pool.connection(missing):
+                pass
+        self.assertRaises(sqlite3.OperationalError, lookup)
+        self.assertFalse(os.path.exists(missing))
+
+    def test_verb_db(self):
+        """The dictionary lookups use the pool"""
+        base_path = os.path.join(os.path.dirname(__file__), '..')
+        verbs = verb_db.find_triliteral_verb(base_path, u"كتب", u"ضمة")
+        self.assertIn(u"كَتَبَ", [item["verb"] for item in verbs])
+        self.assertEqual(verb_db.find_triliteral_verb(base_path, u"كتب",
+            u"ضمة"), verbs)
+
+
+if __name__ == '__main__':
+    unittest.main()
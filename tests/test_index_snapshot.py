@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for the index snapshot
+"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import libqutrub.index_snapshot as index_snapshot
+import libqutrub.db_pool as db_pool
+import libqutrub.verb_db as verb_db
+import libqutrub.verb_search as verb_search
+
+BASE_DIR = os.path.join(os.path.dirname(__file__), '..')
+
+
+class IndexSnapshotTestCase(unittest.TestCase):
+    """Tests for the index snapshot"""
+
+    def setUp(self):
+        self.path = index_snapshot._snapshot["path"]
+        self.tmpdir = tempfile.mkdtemp()
+        self.snapshot_file = os.path.join(self.tmpdir, "index.snapshot")
+
+    def tearDown(self):
+        index_snapshot.set_snapshot_path(self.path)
+        shutil.rmtree(self.tmpdir)
+
+    def test_build(self):
+        """The snapshot gives the structures built from the source"""
+        index_snapshot.build(self.snapshot_file)
+        index_snapshot.set_snapshot_path(self.snapshot_file)
+        table = verb_db.load_triverbtable_source()
+        state = index_snapshot.get_section("triverb_lexicon")
+        self.assertEqual(state,
+            verb_db.TriVerbLexicon.from_table(table).get_state())
+        self.assertEqual(dict(verb_db.TriVerbLexicon.from_state(state)),
+            table)
+
+    def test_dictionary_sections(self):
+        """The dictionary sections are used for the same dictionary"""
+        db_file = os.path.join(self.tmpdir, "verbdict.db")
+        shutil.copyfile(os.path.join(BASE_DIR, "data", "verbdict.db"),
+            db_file)
+        self.assertEqual(index_snapshot.build(self.snapshot_file, db_file),
+            ["triverb_lexicon", "verb_search", "verbmore_stamps"])
+        index_snapshot.set_snapshot_path(self.snapshot_file)
+        stamps = verb_db.build_stamp_index(db_file)
+        self.assertEqual(index_snapshot.get_dictionary_section(
+            "verbmore_stamps", db_file), stamps.get_state())
+        search_index = verb_search.SearchIndex(
+            verb_search.lexicon_entries(db_file))
+        self.assertEqual(index_snapshot.get_dictionary_section(
+            "verb_search", db_file), search_index.get_state())
+        # the lookups use the snapshot
+        build_stamp_index = verb_db.build_stamp_index
+        try:
+            verb_db.build_stamp_index = None
+            verb_db.reset_stamp_index()
+            index = verb_db.get_stamp_index(db_file)
+        finally:
+            verb_db.build_stamp_index = build_stamp_index
+            verb_db.reset_stamp_index()
+        self.assertEqual(index.get_state(), stamps.get_state())
+        self.assertEqual(verb_search.SearchIndex.from_state(
+            search_index.get_state()).search(u"استعملو"),
+            search_index.search(u"استعملو"))
+        # the sections are not used for another dictionary
+        db_pool.reset(db_file)
+        with open(db_file, "ab") as dbfile:
+            dbfile.write(b"changed")
+        self.assertIsNone(index_snapshot.get_dictionary_section(
+            "verbmore_stamps", db_file))
+        self.assertIsNotNone(index_snapshot.get_section("triverb_lexicon"))
+
+    def test_missing(self):
+        """A missing snapshot is not used"""
+        index_snapshot.set_snapshot_path(self.snapshot_file)
+        self.assertIsNone(index_snapshot.load())
+        self.assertIsNone(index_snapshot.get_section("triverb_lexicon"))
+
+    def test_invalid(self):
+        """A snapshot of other data or corrupted is not used"""
+        index_snapshot.build(self.snapshot_file)
+        source_file = os.path.join(self.tmpdir, "source.py")
+        with open(source_file, "w") as outfile:
+            outfile.write("# changed data")
+        index_snapshot.SOURCE_FILES.append(source_file)
+        try:
+            index_snapshot.set_snapshot_path(self.snapshot_file)
+            self.assertIsNone(index_snapshot.load())
+        finally:
+            index_snapshot.SOURCE_FILES.remove(source_file)
+        with open(self.snapshot_file, "r+b") as outfile:
+            outfile.truncate(100)
+        index_snapshot.set_snapshot_path(self.snapshot_file)
+        self.assertIsNone(index_snapshot.load())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for the incremental rebuild of the verbmore table
+"""
+import unittest
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+BASE_DIR = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.join(BASE_DIR, "tools"))
+sys.path.insert(0, BASE_DIR)
+
+import prepare_database
+
+
+class PrepareDatabaseTestCase(unittest.TestCase):
+    """Tests for the verbmore table rebuild"""
+
+    VERBS = [(u"كَاتَبَ", u"م", "3"), (u"اِسْتَعْمَلَ", u"م", "10"),
+        (u"اِنْطَلَقَ", u"ل", "7"), (u"تَكَاتَبَ", u"ك", "6")]
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.datafile = os.path.join(self.tmpdir, "verbs.csv")
+        self.db_file = os.path.join(self.tmpdir, "verbdict.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write_source(self, verbs):
+        with open(self.datafile, "w", encoding="utf8") as outfile:
+            outfile.write(u"# comment\nverb\ttransitive\tTable-base\n")
+            for fields in verbs:
+                outfile.write(u"\t".join(fields) + u"\n")
+
+    def rebuild(self, verbs, full = False):
+        self.write_source(verbs)
+        return prepare_database.rebuild(self.datafile, self.db_file, jobs=1,
+            full=full)
+
+    def table(self, order = "rowid"):
+        conn = sqlite3.connect(self.db_file)
+        try:
+            return conn.execute("""select id, verb, transitive, stamp
+                from verbmore order by %s""" % order).fetchall()
+        finally:
+            conn.close()
+
+    def test_incremental(self):
+        """The stored rows keep their ids and their place in the table"""
+        self.assertEqual(self.rebuild(self.VERBS), (4, 0))
+        self.assertEqual([row[0] for row in self.table()], [0, 1, 2, 3])
+        # an unchanged source doesn't replace the database
+        inode = os.stat(self.db_file).st_ino
+        self.assertEqual(self.rebuild(self.VERBS), (0, 0))
+        self.assertEqual(os.stat(self.db_file).st_ino, inode)
+        # a new verb, a changed verb and a removed verb
+        verbs = [(u"رَاسَلَ", u"م", "3")] + self.VERBS[:3]
+        verbs[3] = (u"اِنْطَلَقَ", u"م", "7")
+        self.assertEqual(self.rebuild(verbs), (2, 1))
+        table = self.table()
+        self.assertEqual(table, self.table("id"))
+        self.assertEqual([row[:3] for row in table], [(0, u"كَاتَبَ", u"م"),
+            (1, u"اِسْتَعْمَلَ", u"م"), (2, u"اِنْطَلَقَ", u"م"),
+            (4, u"رَاسَلَ", u"م")])
+        # the full rebuild gives the same table
+        incremental = self.table()
+        self.assertEqual(self.rebuild(verbs, full=True), (4, 0))
+        self.assertEqual(self.table(), incremental)
+        self.assertFalse(os.path.exists(self.db_file + ".tmp"))
+
+    def test_assign_ids(self):
+        """The duplicated rows keep their ids"""
+        existing = {0:(u"a", u"م", 1), 1:(u"a", u"م", 1), 2:(u"b", u"ل", 2)}
+        source = [(u"b", u"م", "2"), (u"a", u"م", "1"), (u"c", u"", "1")]
+        self.assertEqual(prepare_database.assign_ids(source, existing),
+            ([2, 0, 3], [1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -55,6 +55,22 @@ class QurtubTestCase(unittest.TestCase):
         #~ print(table)
         self.assertEqual(table_target, table)
 
+    def test_conjugate_many(self):
+        """Test batch conjugation"""
+        verbs = [(u"كَتَبَ", u"ضمة", True), (u"سعد", u"كسرة", True),
+            (u"كتبة", u"فتحة", True), (u"اِسْتَعْمَلَ", u"فتحة", False)]
+        expected = [libqutrub.conjugator.conjugate(verb, future_type,
+            transitive=transitive, display_format="DICT")
+            for verb, future_type, transitive in verbs]
+        serial = list(libqutrub.conjugator.conjugate_many(verbs,
+            max_workers=1, chunksize=3))
+        self.assertEqual([item for item, result in serial], verbs)
+        self.assertEqual([result for item, result in serial], expected)
+        self.assertIsNone(serial[2][1])
+        pooled = list(libqutrub.conjugator.conjugate_many(verbs,
+            max_workers=2, chunksize=1))
+        self.assertEqual(pooled, serial)
+
 
 
 if __name__ == '__main__':
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for the parameters and results of the web interface requests
+"""
+import unittest
+import sys
+import os
+import json
+BASE_DIR = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.join(BASE_DIR, "interfaces", "web"))
+sys.path.insert(0, BASE_DIR)
+
+import libqutrub.verb_const as vconst
+import core.response_cache as response_cache
+import qws_request
+
+
+class QwsRequestTestCase(unittest.TestCase):
+    """Tests for the web requests parameters"""
+
+    def test_split_values(self):
+        """The list arguments are given as lists or comma separated"""
+        self.assertEqual(qws_request.split_values(u"past, future"),
+            [u"past", u"future"])
+        self.assertEqual(qws_request.split_values([u" past", 1, None]),
+            [u"past"])
+        for value in (None, 1, {"past":1}):
+            self.assertEqual(qws_request.split_values(value), [])
+
+    def test_add_filters(self):
+        """The known sections, tenses and pronouns are selected"""
+        options = {}
+        qws_request.add_filters({"fields":u"suggest,result,xx",
+            "tenses":[u"PAST", u"passive_future", u" %s " % vconst.TensePast,
+                vconst.TenseImperative, u"xx"],
+            "pronouns":u"هو,هي,هو,xx"}, options)
+        self.assertEqual(options, {"fields":["table", "suggest"],
+            "tenses":[vconst.TensePast, vconst.TensePassiveFuture,
+                vconst.TenseImperative],
+            "pronouns":[u"هو", u"هي"]})
+        # the unknown values are ignored
+        options = {}
+        qws_request.add_filters({"fields":u"xx", "tenses":u"", "pronouns":1},
+            options)
+        self.assertEqual(options, {})
+        for tense in qws_request.TENSE_ALIASES.values():
+            self.assertIn(tense, vconst.TABLE_TENSE)
+
+    def test_unfiltered_key(self):
+        """The requests without known filter keep their cache key"""
+        (text, options) = qws_request.api_options({"verb":u"كتب"})
+        self.assertEqual(options, {"future_type":u"فتحة", "transitive":True,
+            "all":True})
+        key = response_cache.request_key("api", "Conjugate", text, options)
+        (text, options) = qws_request.api_options({"verb":u"كتب",
+            "fields":u"", "tenses":u"xx"})
+        self.assertEqual(response_cache.request_key("api", "Conjugate", text,
+            options), key)
+        (text, options) = qws_request.api_options({"verb":u"كتب",
+            "tenses":u"past"})
+        self.assertNotEqual(response_cache.request_key("api", "Conjugate",
+            text, options), key)
+        (text, action, options) = qws_request.ajax_options({"text":u"كتب",
+            "pronouns":u"xx"})
+        self.assertNotIn("pronouns", options)
+
+    def test_batch_items(self):
+        """The verbs of a batch are given as /api arguments"""
+        items = qws_request.batch_items([u"كتب", {"verb":u"قال",
+            "haraka":"u", "trans":0}, {"haraka":"u"}, 5, {"verb":["x"]}])
+        self.assertEqual(items[0], qws_request.api_options({"verb":u"كتب"})
+            + (None, ))
+        self.assertEqual(items[1], qws_request.api_options({"verb":u"قال",
+            "haraka":"u", "trans":"0"}) + (None, ))
+        self.assertFalse(items[1][1]["transitive"])
+        self.assertEqual(items[1][1]["future_type"], u"ضمة")
+        for item in items[2:]:
+            self.assertEqual(item, (None, None, "a verb is expected"))
+        # the verbs are given in a dict
+        self.assertEqual(qws_request.batch_items({"verbs":[u"كتب"]}),
+            items[:1])
+        for data in (None, u"كتب", {"verb":u"كتب"}, 5):
+            self.assertIsNone(qws_request.batch_items(data))
+        self.assertEqual(qws_request.batch_items([]), [])
+
+    def test_batch_line(self):
+        """A batch line is a JSON object ended by a new line"""
+        body = qws_request.dump_json({"result":{}, "suggest":[],
+            "verb_info":""})
+        line = qws_request.batch_line(3, u"كتب", body)
+        self.assertTrue(line.endswith(b"}\n"))
+        self.assertEqual(json.loads(line), {"index":3, "verb":u"كتب",
+            "response":json.loads(body)})
+        line = qws_request.batch_line(4, None, error="a verb is expected")
+        self.assertEqual(json.loads(line), {"index":4, "verb":None,
+            "error":"a verb is expected"})
+        self.assertEqual(line.count(b"\n"), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for the response cache of the web interface
+"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+BASE_DIR = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, BASE_DIR)
+
+import core.response_cache as response_cache
+import libqutrub.verb_cache as verb_cache
+import libqutrub.verb_db as verb_db
+
+
+class ResponseCacheTestCase(unittest.TestCase):
+    """Tests for the response cache"""
+
+    def test_request_key(self):
+        """The key of a request doesn't depend on the options order"""
+        key = response_cache.request_key("api", "Conjugate", u"كتب",
+            {"all":True, "transitive":False})
+        self.assertEqual(key, response_cache.request_key("api", "Conjugate",
+            u"كتب", {"transitive":False, "all":True}))
+        self.assertNotEqual(key, response_cache.request_key("ajax",
+            "Conjugate", u"كتب", {"all":True, "transitive":False}))
+        self.assertNotEqual(key, response_cache.request_key("api",
+            "Conjugate", u"كتب", {"all":True, "transitive":True}))
+
+    def test_store(self):
+        """The cached responses have a strong ETag of their content"""
+        response_cache.invalidate()
+        key = response_cache.request_key("api", "Conjugate", u"كتب", {})
+        self.assertIsNone(response_cache.get(key))
+        (body, etag) = response_cache.store(key, b'{"result":{}}')
+        self.assertEqual(response_cache.get(key), (body, etag))
+        self.assertEqual(etag, response_cache.content_etag(b'{"result":{}}'))
+        self.assertNotEqual(etag, response_cache.content_etag(b'{}'))
+        response_cache.invalidate()
+        self.assertIsNone(response_cache.get(key))
+
+    def test_database_change(self):
+        """The cache is dropped when the dictionary is changed"""
+        tmpdir = tempfile.mkdtemp()
+        try:
+            os.mkdir(os.path.join(tmpdir, "data"))
+            db_file = os.path.join(tmpdir, "data", "verbdict.db")
+            with open(db_file, "wb") as dbfile:
+                dbfile.write(b"old")
+            response_cache.check_database(tmpdir)
+            response_cache.store("key", b"{}")
+            self.assertFalse(response_cache.check_database(tmpdir))
+            self.assertIn("key", response_cache.RESPONSE_CACHE)
+            verb_cache.FUTURE_CACHE.set((u"قَالَ", u"ضمة"), u"يَقُولُ")
+            verb_db.has_future_forms(db_file)
+            with open(db_file, "wb") as dbfile:
+                dbfile.write(b"changed")
+            self.assertTrue(response_cache.check_database(tmpdir))
+            self.assertNotIn("key", response_cache.RESPONSE_CACHE)
+            # the data read from the dictionary is dropped
+            self.assertEqual(len(verb_cache.FUTURE_CACHE), 0)
+            self.assertNotIn(db_file, verb_db._future_forms)
+        finally:
+            shutil.rmtree(tmpdir)
+            response_cache.check_database()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for the conjugated verbs analyzer
+"""
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pyarabic.araby as araby
+import libqutrub.verb_analyzer as verb_analyzer
+
+
+class VerbAnalyzerTestCase(unittest.TestCase):
+    """Tests for the reverse index of conjugated forms"""
+
+    VERBS = [(u"كَتَبَ", araby.DAMMA, 1, True),
+        (u"سَأَلَ", araby.FATHA, 3, True),
+        (u"اِسْتَعْمَلَ", araby.FATHA, 0, True),
+        (u"جَلَسَ", araby.KASRA, 2, False)]
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.index_file = os.path.join(self.tmpdir, "analyzer.db")
+        self.path = verb_analyzer._index["path"]
+        verb_analyzer.build(None, self.index_file, self.VERBS)
+        verb_analyzer.set_index_path(self.index_file)
+
+    def tearDown(self):
+        verb_analyzer.set_index_path(self.path)
+        shutil.rmtree(self.tmpdir)
+
+    def test_vocalized(self):
+        """A vocalized form gives its exact analyses"""
+        self.assertEqual(verb_analyzer.analyze(u"كَتَبُوا"),
+            [(u"كَتَبَ", 1, u"الماضي المعلوم", u"هم", u"معلوم")])
+        self.assertIn((u"كَتَبَ", 1, u"الماضي المجهول", u"هو", u"مجهول"),
+            verb_analyzer.analyze(u"كُتِبَ"))
+
+    def test_unvocalized(self):
+        """An unvocalized form gives all its analyses"""
+        analyses = verb_analyzer.analyze(u"كتب")
+        self.assertIn((u"كَتَبَ", 1, u"الماضي المعلوم", u"هو", u"معلوم"),
+            analyses)
+        self.assertIn((u"كَتَبَ", 1, u"الماضي المجهول", u"هو", u"مجهول"),
+            analyses)
+        # the hamza is normalized
+        self.assertEqual(verb_analyzer.analyze(u"سئل"),
+            verb_analyzer.analyze(u"سأل"))
+        self.assertIn((u"سَأَلَ", 3, u"الماضي المجهول", u"هو", u"مجهول"),
+            verb_analyzer.analyze(u"سئل"))
+
+    def test_intransitive(self):
+        """An intransitive verb has only the passive forms of the conjugator"""
+        passive = [analysis for analysis in verb_analyzer.analyze(u"جلسوا")
+            if analysis[4] == verb_analyzer.VOICE_PASSIVE]
+        self.assertEqual(passive, [])
+        self.assertIn((u"جَلَسَ", 2, u"الماضي المجهول", u"هو", u"مجهول"),
+            verb_analyzer.analyze(u"جُلِسَ"))
+
+    def test_analyze_tokens(self):
+        """Tokens are analyzed in order"""
+        tokens = [u"يستعملون", u"كتبوا", u"شجرة", u"كتبوا"]
+        result = verb_analyzer.analyze_tokens(tokens)
+        self.assertEqual([token for (token, analyses) in result], tokens)
+        self.assertEqual(result[0][1][0][:2], (u"اِسْتَعْمَلَ", 0))
+        self.assertEqual(result[2][1], [])
+        self.assertEqual(result[1][1], result[3][1])
+
+    def test_missing_index(self):
+        """A missing index gives no analysis"""
+        verb_analyzer.set_index_path(os.path.join(self.tmpdir, "none"))
+        self.assertFalse(verb_analyzer.load())
+        self.assertEqual(verb_analyzer.analyze(u"كتب"), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
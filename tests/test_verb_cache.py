@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for the conjugation caches
+"""
+import unittest
+import sys
+import os
+import threading
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import libqutrub.mosaref_main
+import libqutrub.classverb as classverb
+import libqutrub.verb_cache as verb_cache
+
+
+class LRUCacheTestCase(unittest.TestCase):
+    """Tests for the bounded LRU cache"""
+
+    def test_eviction(self):
+        """The least recently used entry is evicted"""
+        cache = verb_cache.LRUCache(2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.set("c", 3)
+        self.assertEqual(len(cache), 2)
+        self.assertNotIn("b", cache)
+        self.assertIn("a", cache)
+        self.assertIsNone(cache.get("b"))
+
+    def test_stats_and_resize(self):
+        """Counters follow hits, misses and evictions"""
+        cache = verb_cache.LRUCache(3)
+        for key in "abc":
+            cache.set(key, key)
+        cache.get("a")
+        cache.get("z")
+        cache.resize(1)
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["evictions"], 2)
+        self.assertEqual(stats["size"], 1)
+        self.assertIn("a", cache)
+        cache.clear()
+        self.assertEqual(cache.stats()["hits"], 0)
+        self.assertEqual(len(cache), 0)
+
+    def test_concurrent_access(self):
+        """The cache stays bounded when used from many threads"""
+        cache = verb_cache.LRUCache(50)
+        def worker(start):
+            for i in range(start, start + 1000):
+                cache.set(i % 120, i)
+                cache.get((i * 7) % 120)
+        threads = [threading.Thread(target=worker, args=(n * 1000,))
+            for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(cache), 50)
+        stats = cache.stats()
+        self.assertEqual(stats["hits"] + stats["misses"], 8000)
+
+
+class StandardCacheTestCase(unittest.TestCase):
+    """Tests for the orthographic treatments cache"""
+
+    def test_verb_class_uses_cache(self):
+        """VerbClass fills the shared standard cache"""
+        classverb.cache_standard.clear()
+        vbc = classverb.VerbClass(u"كَتَبَ", True, u"ضمة")
+        vbc.fill_all_tenses()
+        stats = classverb.cache_standard.stats()
+        self.assertGreater(stats["standard"]["size"], 0)
+        self.assertGreater(stats["suffix"]["hits"], 0)
+
+    def test_resize(self):
+        """Sub-caches can be resized by name"""
+        cache = verb_cache.StandardCache({'standard':10})
+        self.assertEqual(cache['standard'].maxsize, 10)
+        cache.resize({'sukun':5})
+        self.assertEqual(cache.stats()['sukun']['maxsize'], 5)
+
+
+class RawConjugationTestCase(unittest.TestCase):
+    """Tests for the conjugation without display object"""
+
+    def test_raw_matches_display(self):
+        """The raw table gives the same forms as the display object"""
+        for verb, future_type, transitive in ((u"كَتَبَ", u"ضمة", True),
+                (u"رَمَى", u"كسرة", False), (u"اِسْتَعْمَلَ", u"فتحة", True)):
+            vbc = classverb.VerbClass(verb, transitive, future_type)
+            vbc.fill_all_tenses()
+            raw_vbc = classverb.VerbClass(verb, transitive, future_type,
+                display=False)
+            self.assertIsNone(raw_vbc.conj_display)
+            table = raw_vbc.conjugate_raw()
+            self.assertIsNone(raw_vbc.conj_display)
+            for tense in table:
+                for pronoun in table[tense]:
+                    self.assertEqual(table[tense][pronoun],
+                        vbc.get_conj(tense, pronoun))
+            self.assertEqual(raw_vbc.get_future_form(), vbc.future_form)
+            rendered = raw_vbc.render_raw(table)
+            self.assertEqual(rendered.display("DICT"),
+                vbc.conj_display.display("DICT"))
+
+    def test_raw_selected_tenses(self):
+        """Only the given tenses are conjugated"""
+        vbc = classverb.VerbClass(u"كَتَبَ", True, u"ضمة", display=False)
+        table = vbc.conjugate_raw([u"الأمر"])
+        self.assertEqual(list(table), [u"الأمر"])
+        self.assertNotIn(u"هو", table[u"الأمر"])
+        self.assertEqual(table[u"الأمر"][u"أنت"], u"اُكْتُبْ")
+
+
+class ResultCacheTestCase(unittest.TestCase):
+    """Tests for the conjugation result cache"""
+
+    def setUp(self):
+        verb_cache.RESULT_CACHE.clear()
+
+    def test_cached_result(self):
+        """A cache hit gives the same result in every display format"""
+        verb = u"كَتَبَ"
+        for display_format in ("DICT", "HTML", "ROWS", "TABLE"):
+            first = libqutrub.mosaref_main.do_sarf(verb, u"ضمة",
+                transitive=True, display_format=display_format)
+            second = libqutrub.mosaref_main.do_sarf(verb, u"ضمة",
+                transitive=True, display_format=display_format)
+            self.assertEqual(first, second)
+        self.assertEqual(len(verb_cache.RESULT_CACHE), 1)
+
+    def test_cached_result_is_not_shared(self):
+        """Modifying a returned table does not change the cached one"""
+        verb = u"ضَرَبَ"
+        table = libqutrub.mosaref_main.do_sarf(verb, u"كسرة",
+            transitive=True, display_format="DICT")
+        table[u"الماضي المعلوم"][u"هو"] = u""
+        table = libqutrub.mosaref_main.do_sarf(verb, u"كسرة",
+            transitive=True, display_format="DICT")
+        self.assertEqual(table[u"الماضي المعلوم"][u"هو"], u"ضَرَبَ")
+
+
+if __name__ == '__main__':
+    unittest.main()
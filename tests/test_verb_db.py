@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for the triliteral verbs table and the dictionary lookups
+"""
+import unittest
+import subprocess
+import sys
+import os
+import shutil
+import tempfile
+BASE_DIR = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, BASE_DIR)
+
+import libqutrub.verb_db as verb_db
+import libqutrub.verb_cache as verb_cache
+import libqutrub.mosaref_main as mosaref
+import core.qutrub_api as qutrub_api
+
+
+class VerbDbTestCase(unittest.TestCase):
+    """Tests for the triliteral verbs table"""
+
+    def test_lazy_import(self):
+        """The table is not loaded by the conjugator import"""
+        script = ("import sys, libqutrub.conjugator, libqutrub.verb_db;"
+            "print('libqutrub.triverbtable' in sys.modules,"
+            " bool(libqutrub.verb_db._lexicon))")
+        output = subprocess.check_output([sys.executable, "-c", script],
+            cwd=BASE_DIR)
+        self.assertEqual(output.split(), [b"False", b"False"])
+
+    def test_find_alltriverb(self):
+        """The index is created on the first lookup"""
+        verbs = verb_db.find_alltriverb(u"كتب", u"ضمة")
+        lexicon = verb_db.get_triverbtable()
+        self.assertIn(u"كَتَبَ", [item["verb"] for item in verbs])
+        # the matching haraka is given first
+        self.assertEqual(verbs[0]["haraka"], u"ضمة")
+        # the lexicon is created once
+        verb_db.create_index_triverbtable()
+        self.assertIs(verb_db.get_triverbtable(), lexicon)
+
+    def test_lexicon(self):
+        """The compact lexicon gives the entries of the table"""
+        table = verb_db.load_triverbtable_source()
+        lexicon = verb_db.TriVerbLexicon.from_table(table)
+        self.assertEqual(len(lexicon), len(table))
+        self.assertEqual(dict(lexicon), table)
+        self.assertEqual(list(lexicon.entries()), [lexicon[key]
+            for key in lexicon])
+        self.assertRaises(KeyError, lexicon.__getitem__, u"كَتَبَ9")
+        index = verb_db.build_index_triverbtable(table)
+        self.assertEqual([lexicon.verb(pos) for pos in lexicon.find(u"كتب")],
+            [table[key]["verb"] for key in index[u"كتب"]])
+        self.assertFalse(lexicon.find(u"xyz"))
+        # the lexicon is saved by its arrays
+        restored = verb_db.TriVerbLexicon.from_state(lexicon.get_state())
+        self.assertEqual(dict(restored), table)
+
+
+    def test_batch_lookup(self):
+        """The batched lookups give the results of the single lookups"""
+        api = qutrub_api.QutrubApi(db_path=BASE_DIR)
+        verbs = [u"كتب", u"قال", u"كَتَبَ", u"xyz", u"كتب"]
+        results = verb_db.find_triliteral_verbs(BASE_DIR, verbs, u"ضمة")
+        for verb in verbs:
+            self.assertEqual(results[verb],
+                verb_db.find_triliteral_verb(BASE_DIR, verb, u"ضمة"))
+        verbs = [u"استعجل", u"انطلق", u"تكاتب", u"xyzt"]
+        results = api.lookup_nontri_verbs(verbs)
+        for verb in verbs:
+            self.assertEqual(results[verb], api.lookup_nontri_verb(verb))
+        self.assertTrue(results[u"استعجل"])
+
+    def test_stamp_index(self):
+        """The stamp index gives the verbmore query results"""
+        api = qutrub_api.QutrubApi(db_path=BASE_DIR)
+        verbs = [u"استعجل", u"اِسْتَعْجَلَ", u"انطلق", u"تكاتب", u"كاتب",
+            u"xyzt"]
+        try:
+            verb_db.set_stamp_index(False)
+            expected = api.lookup_nontri_verbs(verbs)
+            verb_db.set_stamp_index(True)
+            self.assertIsNotNone(verb_db.get_stamp_index(os.path.join(
+                BASE_DIR, "data/verbdict.db")))
+            self.assertEqual(api.lookup_nontri_verbs(verbs), expected)
+        finally:
+            verb_db.set_stamp_index(True)
+        # the given verb is first
+        self.assertEqual(expected[u"كاتب"][0]["verb"], u"كاتَبَ")
+        self.assertIsNone(verb_db.get_stamp_index(os.path.join(BASE_DIR,
+            "data", "missing.db")))
+
+    def test_suggestions(self):
+        """The suggestions are unique, with their future form"""
+        api = qutrub_api.QutrubApi(db_path=BASE_DIR)
+        verb_cache.FUTURE_CACHE.clear()
+        for word in (u"كتب", u"كتبة"):
+            suggestions = api.suggest_similar_verb_list(word, u"فتحة")
+            self.assertTrue(suggestions)
+            keys = [(item["verb"], item["haraka"], item["transitive"])
+                for item in suggestions]
+            self.assertEqual(len(keys), len(set(keys)))
+            for item in suggestions:
+                self.assertTrue(item["future"])
+            self.assertEqual(api.suggest_similar_verb_list(word, u"فتحة"),
+                suggestions)
+        self.assertGreater(verb_cache.FUTURE_CACHE.hits, 0)
+
+
+    def test_future_forms(self):
+        """The precomputed future forms are the conjugated ones"""
+        tmpdir = tempfile.mkdtemp()
+        try:
+            os.mkdir(os.path.join(tmpdir, "data"))
+            db_file = os.path.join(tmpdir, "data", "verbdict.db")
+            shutil.copy(os.path.join(BASE_DIR, "data", "verbdict.db"),
+                db_file)
+            self.assertGreater(verb_db.build_future_forms(db_file), 20000)
+            self.assertTrue(verb_db.has_future_forms(db_file))
+            for (verb, haraka) in ((u"قَالَ", u"ضمة"), (u"كَتَبَ", u"ضمة"),
+                    (u"اِسْتَعْجَلَ", u"فتحة")):
+                future_form = verb_db.find_future_form(tmpdir, verb, haraka)
+                self.assertEqual(future_form, mosaref.compute_future_form(
+                    verb, mosaref.ar_verb.get_future_type_by_name(haraka)))
+                verb_cache.FUTURE_CACHE.clear()
+                self.assertEqual(mosaref.get_future_form(verb, haraka,
+                    tmpdir), future_form)
+            self.assertIsNone(verb_db.find_future_form(tmpdir, u"ضَرَبَ",
+                u"ضمة"))
+            # the verbs out of the dictionary are conjugated
+            verb_cache.FUTURE_CACHE.clear()
+            self.assertEqual(mosaref.get_future_form(u"ضَرَبَ", u"ضمة",
+                tmpdir), u"يَضْرُبُ")
+        finally:
+            verb_db.db_pool.reset(db_file)
+            shutil.rmtree(tmpdir)
+
+    def test_frequent_verbs(self):
+        """The frequent verbs are given by decreasing frequency"""
+        verbs = verb_db.frequent_verbs(BASE_DIR, 10)
+        self.assertEqual(len(verbs), 10)
+        self.assertEqual(verbs[:2], [u"كان", u"قال"])
+        # the shadda is kept
+        self.assertIn(u"تمّ", verbs)
+
+    def test_triliteral_rows(self):
+        """The rows read once are ordered as the lookup"""
+        rows = verb_db.fetch_triliteral_rows(BASE_DIR, [u"كتب", u"xyz"])
+        self.assertEqual(verb_db.order_triliteral_rows(u"كَتَبَ",
+            rows[u"كتب"], u"فتحة"),
+            verb_db.find_triliteral_verb(BASE_DIR, u"كَتَبَ", u"فتحة"))
+        self.assertEqual(rows[u"xyz"], [])
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for the approximate search of misspelled verbs
+"""
+import unittest
+import sys
+import os
+BASE_DIR = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, BASE_DIR)
+
+import libqutrub.verb_search as verb_search
+import core.qutrub_api as qutrub_api
+
+
+class VerbSearchTestCase(unittest.TestCase):
+    """Tests for the verb search index"""
+
+    def test_search_key(self):
+        """The confused letters have the same key"""
+        self.assertEqual(verb_search.search_key(u"إِسْتَغْفَرَ"),
+            verb_search.search_key(u"استغفر"))
+        self.assertEqual(verb_search.search_key(u"سئل"),
+            verb_search.search_key(u"سؤل"))
+        self.assertEqual(verb_search.search_key(u"رمى"),
+            verb_search.search_key(u"رمي"))
+
+    def test_edit_cost(self):
+        """The confusions and the weak letters cost less"""
+        key = u"كتب"
+        self.assertEqual(verb_search.edit_cost(key,
+            verb_search.KEY_POSITION, key, verb_search.KEY_POSITION), 0.0)
+        # insertion of alef, of lam
+        self.assertEqual(verb_search.edit_cost(key,
+            verb_search.KEY_POSITION, u"كاتب", 1), verb_search.WEAK_COST)
+        self.assertEqual(verb_search.edit_cost(key,
+            verb_search.KEY_POSITION, u"كتبل", 3), 1.0)
+        # substitution of confused letters
+        self.assertEqual(verb_search.edit_cost(key, 0, u"قتب", 0),
+            verb_search.CONFUSION_COST)
+        # transposition
+        self.assertEqual(verb_search.edit_cost(key, 1, u"كبت", 2), 1.0)
+
+    def test_search(self):
+        """The misspelled verbs are found, by cost and frequency"""
+        results = verb_search.search(u"استعملو")
+        self.assertEqual(results[0][0], u"استعمل")
+        results = verb_search.search(u"انطلك")
+        self.assertEqual(results[0][0], u"انطلق")
+        results = verb_search.search(u"يكتب")
+        self.assertIn(u"كتب", [verb for (verb, cost, freq) in results])
+        self.assertEqual(results, sorted(results,
+            key=lambda result: (result[1], -result[2])))
+        self.assertLessEqual(len(results), verb_search.SEARCH_LIMIT)
+        self.assertEqual(verb_search.search(u"xyz"), [])
+
+    def test_search_many(self):
+        """The batch search gives the results of every word"""
+        words = [u"استعملو", u"انطلك", u"استعملو"]
+        results = verb_search.search_many(words, limit=3)
+        self.assertEqual(len(results), 3)
+        for (word, found) in zip(words, results):
+            self.assertEqual(found, verb_search.search(word, limit=3))
+        self.assertIs(results[0], results[2])
+
+    def test_missing_dictionary(self):
+        """The search gives nothing without dictionary"""
+        missing = os.path.join(BASE_DIR, "data", "missing.db")
+        self.assertFalse(verb_search.load(missing))
+        self.assertEqual(verb_search.search(u"كتب", db_file=missing), [])
+
+    def test_suggestions(self):
+        """The suggestions of misspelled verbs come from the index"""
+        api = qutrub_api.QutrubApi(db_path=BASE_DIR)
+        suggestions = api.suggest_similar_verb_list(u"إستغفرو", u"فتحة")
+        self.assertEqual(suggestions[0]["verb"], u"اِسْتَغْفَرَ")
+        self.assertTrue(suggestions[0]["future"])
+        # a valid verb missing in the dictionary
+        suggestions = api.suggest_similar_verb_list(u"انطلك", u"فتحة")
+        self.assertEqual(suggestions[0]["verb"], u"اِنْطَلَقَ")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for the conjugation by paradigm templates
+"""
+import unittest
+import sys
+import os
+import itertools
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import libqutrub.verb_template as verb_template
+
+
+class VerbTemplateTestCase(unittest.TestCase):
+    """Tests for root substitution in paradigm templates"""
+
+    def test_signature(self):
+        """Verbs of the same class have the same signature"""
+        (sig1, radicals1) = verb_template.get_signature(u"كَسَرَ")
+        (sig2, radicals2) = verb_template.get_signature(u"ضَرَبَ")
+        self.assertEqual(sig1, sig2)
+        self.assertEqual(radicals1, u"كسر")
+        self.assertEqual(radicals2, u"ضرب")
+        # the same radicals have the same placeholder
+        (sig3, radicals3) = verb_template.get_signature(u"مَدَدَ")
+        self.assertEqual(radicals3, u"مد")
+        self.assertNotEqual(sig1, sig3)
+
+    def test_not_templated(self):
+        """Irregular verbs and verbs starting by alef madda use rules"""
+        self.assertIsNone(verb_template.get_signature(u"وَسِعَ"))
+        self.assertIsNone(verb_template.get_signature(u"آمَنَ"))
+        self.assertIsNotNone(verb_template.get_signature(u"وَقَعَ"))
+
+    def test_same_conjugation(self):
+        """The templates give the same conjugation as the rules"""
+        verbs = [(u"كَتَبَ", u"ضمة", True), (u"وَقَعَ", u"فتحة", False),
+            (u"وَسِعَ", u"فتحة", False), (u"قَالَ", u"ضمة", True),
+            (u"اِسْتَعْمَلَ", u"فتحة", True), (u"مَدَّ", u"ضمة", True),
+            (u"رَمَى", u"كسرة", True), (u"سَأَلَ", u"فتحة", True)]
+        self.assertEqual(verb_template.verify(verbs), [])
+
+    def test_lexicon_sample(self):
+        """A sample of the lexicon has the same conjugation"""
+        verbs = itertools.islice(verb_template.lexicon_verbs(), 0, None, 40)
+        self.assertEqual(verb_template.verify(verbs), [])
+
+    def test_verbmore_sample(self):
+        """The lexicon has the verbmore verbs, with the same conjugation"""
+        import libqutrub.verb_db as verb_db
+        # the verbmore verbs follow the triliteral verbs
+        triliteral = 2 * len(verb_db.get_triverbtable())
+        verbs = list(verb_template.lexicon_verbs())[triliteral:]
+        self.assertTrue(verbs)
+        self.assertEqual(set(item[1] for item in verbs), set([u"فتحة"]))
+        self.assertIn((u"اِسْتَعْمَلَ", u"فتحة", False), verbs)
+        self.assertEqual(verb_template.verify(verbs[::200]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for the timing of the conjugation stages
+"""
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import libqutrub.ar_verb as ar_verb
+import libqutrub.mosaref_main
+import libqutrub.verb_cache as verb_cache
+import libqutrub.verb_timing as verb_timing
+import libqutrub.verb_template as verb_template
+import libqutrub.conjugation_store as conjugation_store
+
+
+class VerbTimingTestCase(unittest.TestCase):
+    """Tests for the stages timing"""
+
+    def setUp(self):
+        self.path = conjugation_store._store["path"]
+        conjugation_store.set_store_path(None)
+        verb_cache.RESULT_CACHE.clear()
+        verb_template.TEMPLATE_CACHE.clear()
+        verb_timing.reset()
+
+    def tearDown(self):
+        verb_timing.disable()
+        verb_timing.reset()
+        conjugation_store.set_store_path(self.path)
+        verb_cache.RESULT_CACHE.clear()
+
+    def test_timing(self):
+        """The stages are timed inside the with block only"""
+        standard2 = ar_verb.standard2
+        with verb_timing.timing():
+            self.assertTrue(verb_timing.is_enabled())
+            self.assertIsNot(ar_verb.standard2, standard2)
+            libqutrub.mosaref_main.do_sarf(u"كَتَبَ", u"ضمة",
+                transitive=True, display_format="DICT")
+        self.assertFalse(verb_timing.is_enabled())
+        self.assertIs(ar_verb.standard2, standard2)
+        stats = verb_timing.get_stats()
+        for stage in ("uniformate_verb", "prepare_past_stem", "cache_lookup",
+                "display_render"):
+            self.assertGreater(stats[stage]["calls"], 0)
+            self.assertGreaterEqual(stats[stage]["total"], 0)
+        # nothing is counted when disabled
+        libqutrub.mosaref_main.do_sarf(u"ضَرَبَ", u"كسرة",
+            transitive=True, display_format="DICT")
+        self.assertEqual(verb_timing.get_stats(), stats)
+
+    def test_reset(self):
+        """The stats are cleared by reset"""
+        verb_timing.enable()
+        ar_verb.uniformate_verb(u"كَتَبَ")
+        verb_timing.enable()
+        ar_verb.uniformate_verb(u"كَتَبَ")
+        self.assertEqual(verb_timing.get_stats()["uniformate_verb"]["calls"],
+            2)
+        verb_timing.reset()
+        self.assertEqual(verb_timing.get_stats()["uniformate_verb"],
+            {"calls":0, "total":0.0, "mean":0.0})
+
+
+if __name__ == '__main__':
+    unittest.main()
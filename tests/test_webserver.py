@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for the flask web interface
+"""
+import unittest
+import sys
+import os
+import json
+BASE_DIR = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.join(BASE_DIR, "interfaces", "web"))
+sys.path.insert(0, BASE_DIR)
+
+import config.qutrub_config
+import core.response_cache as response_cache
+try:
+    import flask
+except ImportError:
+    flask = None
+if flask is not None:
+    # the tests don't write the server log
+    config.qutrub_config.LOGGING_FILE = os.devnull
+    import qutrub_webserver
+
+
+@unittest.skipIf(flask is None, "flask is not installed")
+class WebServerTestCase(unittest.TestCase):
+    """Tests for the flask application"""
+
+    def setUp(self):
+        self.db_base_path = config.qutrub_config.DB_BASE_PATH
+        config.qutrub_config.DB_BASE_PATH = BASE_DIR
+        response_cache.invalidate()
+        self.client = qutrub_webserver.app.test_client()
+
+    def tearDown(self):
+        config.qutrub_config.DB_BASE_PATH = self.db_base_path
+        response_cache.invalidate()
+
+    def test_etag(self):
+        """The responses have a strong ETag and are cached by clients"""
+        args = {"verb":u"كتب", "haraka":"u"}
+        response = self.client.get("/api", query_string=args)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers["ETag"]
+        self.assertEqual(etag, '"%s"' % response_cache.content_etag(
+            response.data))
+        self.assertEqual(response.headers["Cache-Control"],
+            "public, max-age=%d" % config.qutrub_config.RESPONSE_MAX_AGE)
+        self.assertEqual(response.headers["Content-Type"],
+            "application/json; charset=utf-8")
+        self.assertTrue(response.json["result"])
+        # the client has the response
+        response2 = self.client.get("/api", query_string=args,
+            headers={"If-None-Match":etag})
+        self.assertEqual(response2.status_code, 304)
+        self.assertEqual(response2.data, b"")
+        self.assertEqual(response2.headers["ETag"], etag)
+        # the cached response is the computed one
+        response3 = self.client.get("/api/%s/u" % u"كتب")
+        self.assertEqual((response3.status_code, response3.data),
+            (200, response.data))
+        # another response has another ETag
+        response4 = self.client.get("/api", query_string=args,
+            headers={"If-None-Match":'"other"'})
+        self.assertEqual(response4.status_code, 200)
+        other = self.client.get("/api", query_string={"verb":u"قال"})
+        self.assertNotEqual(other.headers["ETag"], etag)
+
+    def test_debug_etag(self):
+        """The debug mode doesn't change the response body nor its ETag"""
+        args = {"verb":u"كتب", "haraka":"u"}
+        response = self.client.get("/api", query_string=args)
+        response_cache.invalidate()
+        debug = qutrub_webserver.app.debug
+        try:
+            qutrub_webserver.app.debug = True
+            response2 = self.client.get("/api", query_string=args)
+        finally:
+            qutrub_webserver.app.debug = debug
+        self.assertEqual(response2.data, response.data)
+        self.assertEqual(response2.headers["ETag"], response.headers["ETag"])
+        self.assertEqual(len(response.data.splitlines()), 1)
+
+    def test_ajax_etag(self):
+        """The GET and POST ajax requests are cached"""
+        args = {"text":u"استعمل", "action":"Conjugate", "all":"true"}
+        response = self.client.get("/ajaxGet", query_string=args)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["Content-Type"], "application/json")
+        response2 = self.client.post("/ajaxGet", json={"data":args},
+            headers={"If-None-Match":response.headers["ETag"]})
+        # a POST request is not conditional
+        self.assertEqual(response2.status_code, 200)
+        self.assertEqual(response2.headers["ETag"], response.headers["ETag"])
+
+    def test_batch(self):
+        """The batch lines are the /api responses, in order"""
+        verbs = [u"كتب", {"verb":u"قال", "haraka":"u"}, {"haraka":"u"}]
+        response = self.client.post("/api/batch", json=verbs)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        self.assertEqual(response.headers["Access-Control-Allow-Origin"], "*")
+        lines = [json.loads(line) for line in response.data.splitlines()]
+        self.assertEqual([line["index"] for line in lines], [0, 1, 2])
+        self.assertEqual(lines[0]["response"], self.client.get("/api",
+            query_string={"verb":u"كتب"}).json)
+        self.assertEqual(lines[1]["response"], self.client.get("/api",
+            query_string={"verb":u"قال", "haraka":"u"}).json)
+        self.assertEqual(lines[2], {"index":2, "verb":None,
+            "error":"a verb is expected"})
+
+    def test_batch_debug(self):
+        """The batch is newline delimited JSON in debug mode"""
+        debug = qutrub_webserver.app.debug
+        try:
+            qutrub_webserver.app.debug = True
+            response = self.client.post("/api/batch", json=[u"كتب", u"جلس"])
+        finally:
+            qutrub_webserver.app.debug = debug
+        self.assertEqual(response.status_code, 200)
+        lines = [json.loads(line) for line in response.data.splitlines()]
+        self.assertEqual([(line["index"], line["verb"]) for line in lines],
+            [(0, u"كتب"), (1, u"جلس")])
+        self.assertTrue(lines[1]["response"]["result"])
+
+    def test_batch_errors(self):
+        """The invalid and too long batches"""
+        for data in (b"{", b'{"verb":"x"}', b'"x"'):
+            response = self.client.post("/api/batch", data=data,
+                content_type="application/json")
+            self.assertEqual(response.status_code, 400)
+        max_size = qutrub_webserver.BATCH_MAX_SIZE
+        try:
+            qutrub_webserver.BATCH_MAX_SIZE = 2
+            response = self.client.post("/api/batch", json=[u"كتب"] * 3)
+            self.assertEqual(response.status_code, 413)
+            self.assertEqual(self.client.post("/api/batch",
+                json=[u"كتب"] * 2).status_code, 200)
+        finally:
+            qutrub_webserver.BATCH_MAX_SIZE = max_size
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for the worker pool of the asyncio server
+"""
+import unittest
+import sys
+import os
+import asyncio
+import threading
+BASE_DIR = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, BASE_DIR)
+
+import core.adaat as adaat
+import core.worker_pool as worker_pool
+
+
+class WorkerPoolTestCase(unittest.TestCase):
+    """Tests for the worker pool"""
+
+    def setUp(self):
+        self.pool = worker_pool.WorkerPool(workers=1, max_pending=2,
+            timeout=10)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_run(self):
+        """The jobs are run by the workers"""
+        result = asyncio.run(self.pool.run(adaat.DoAction, u"كتب",
+            "DoNothing", {}))
+        self.assertEqual(result, u"كتب")
+        self.assertEqual(self.pool.stats()["pending"], 0)
+
+    def test_full(self):
+        """The jobs are refused when the pool is full"""
+        event = threading.Event()
+        self.assertEqual(self.pool.free(), 2)
+        jobs = [self.pool.submit(event.wait, 10) for i in range(2)]
+        self.assertEqual(self.pool.free(), 0)
+        self.assertRaises(worker_pool.PoolFullError, self.pool.submit,
+            event.wait, 10)
+        event.set()
+        for job in jobs:
+            job.result()
+        self.assertEqual(self.pool.stats()["refused"], 1)
+        self.assertEqual(self.pool.stats()["pending"], 0)
+
+    def test_timeout(self):
+        """A timed out job keeps its worker until it's done"""
+        event = threading.Event()
+        async def run():
+            with self.assertRaises(asyncio.TimeoutError):
+                await self.pool.run(event.wait, 10, timeout=0.01)
+            # the running job is still pending
+            self.assertEqual(self.pool.stats()["pending"], 1)
+            event.set()
+        asyncio.run(run())
+        self.pool.shutdown()
+        self.assertEqual(self.pool.stats()["pending"], 0)
+        self.assertEqual(self.pool.stats()["timeouts"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#************************************************************************
+# Build analyzer index
+#
+# Description:
+# Index all conjugated forms of the lexicon verbs for the verb analyzer
+#
+# Copyright (c) 2026, Qutrub-ng Project
+#
+#***********************************************************************/
+"""
+Build the reverse index used by libqutrub.verb_analyzer
+to analyze conjugated verbs.
+"""
+import argparse
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '../'))
+import libqutrub.verb_analyzer as verb_analyzer
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '../data/')
+
+
+def grabargs():
+    parser = argparse.ArgumentParser(
+        description='Build the reverse index of conjugated verbs')
+    parser.add_argument("-d", dest="db_file",
+        default=os.path.join(DATA_DIR, "verbdict.db"),
+        help="verb dictionary database (verbdict and verbmore tables)")
+    parser.add_argument("-o", dest="index_file",
+        default=verb_analyzer.INDEX_PATH,
+        help="output index file")
+    return parser.parse_args()
+
+
+def main(args):
+    args = grabargs()
+    start = time.time()
+    (verbs, forms) = verb_analyzer.build(args.db_file, args.index_file)
+    print("%d verbs, %d conjugated forms indexed in %s (%.1f s)" % (verbs,
+        forms, args.index_file, time.time() - start))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#************************************************************************
+# Build conjugation store
+#
+# Description:
+# Conjugate all lexicon verbs and save them in the conjugation store
+#
+# Copyright (c) 2026, Qutrub-ng Project
+#
+#***********************************************************************/
+"""
+Build the precomputed conjugation store of the lexicon verbs,
+used by do_sarf and the web interface before conjugating a verb.
+"""
+import argparse
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '../'))
+import libqutrub.conjugation_store as conjugation_store
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '../data/')
+
+
+def grabargs():
+    parser = argparse.ArgumentParser(
+        description='Build the conjugation store of the lexicon verbs')
+    parser.add_argument("-d", dest="db_file",
+        default=os.path.join(DATA_DIR, "verbdict.db"),
+        help="verb dictionary database (verbdict and verbmore tables)")
+    parser.add_argument("-o", dest="store_file",
+        default=conjugation_store.STORE_PATH,
+        help="output conjugation store file")
+    return parser.parse_args()
+
+
+def main(args):
+    args = grabargs()
+    start = time.time()
+    count = conjugation_store.build(args.db_file, args.store_file)
+    print("%d conjugations stored in %s (%.1f s)" % (count, args.store_file,
+        time.time() - start))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
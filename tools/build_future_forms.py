@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#************************************************************************
+# Build future forms
+#
+# Description:
+# Precompute the future form of all verbs of the verb dictionary
+#
+# Copyright (c) 2026, Qutrub-ng Project
+#
+#***********************************************************************/
+"""
+Add the future form column to the verbdict and verbmore tables of the
+verb dictionary, with the future form of every verb, used by the
+suggestions and the verb info instead of conjugating the verbs.
+"""
+import argparse
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '../'))
+import libqutrub.verb_db as verb_db
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '../data/')
+
+
+def grabargs():
+    parser = argparse.ArgumentParser(
+        description='Precompute the future forms of the verb dictionary')
+    parser.add_argument("-d", dest="db_file",
+        default=os.path.join(DATA_DIR, "verbdict.db"),
+        help="verb dictionary database (verbdict and verbmore tables)")
+    return parser.parse_args()
+
+
+def main(args):
+    args = grabargs()
+    start = time.time()
+    count = verb_db.build_future_forms(args.db_file)
+    print("%d future forms stored in %s (%.1f s)" % (count, args.db_file,
+        time.time() - start))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#************************************************************************
+# Build index snapshot
+#
+# Description:
+# Save the lookup structures of the verbs data in the index snapshot
+#
+# Copyright (c) 2026, Qutrub-ng Project
+#
+#***********************************************************************/
+"""
+Build the index snapshot, loaded at start instead of building the
+lookup structures of the verbs data, it must be rebuilt when the data
+is changed, else it's not used.
+"""
+import argparse
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '../'))
+import libqutrub.index_snapshot as index_snapshot
+
+
+def grabargs():
+    parser = argparse.ArgumentParser(
+        description='Build the index snapshot of the verbs data')
+    parser.add_argument("-o", dest="snapshot_file",
+        default=index_snapshot.SNAPSHOT_PATH,
+        help="output snapshot file")
+    parser.add_argument("-d", dest="db_file",
+        default=index_snapshot.DICTIONARY_PATH,
+        help="verb dictionary database (verbmore and search indexes)")
+    return parser.parse_args()
+
+
+def main(args):
+    args = grabargs()
+    start = time.time()
+    sections = index_snapshot.build(args.snapshot_file, args.db_file)
+    print("%s saved in %s (%.1f s)" % (", ".join(sections),
+        args.snapshot_file, time.time() - start))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -21,81 +21,344 @@
 #  MA 02110-1301, USA.
 #  
 #  
-import pandas as pd
-import pyarabic.araby as araby
+"""
+Build the verbmore table of the verb dictionary from the verbs source file.
+The source rows are read at once, they are matched with the stored rows
+across the whole source. The features of every row (unvocalized forms,
+stamp, length, weakness and future form) are computed once, by chunks in
+a process pool, and the rows are written in the database by chunk
+transactions.
+The rebuild is incremental: only the rows which are new or changed in the
+source are computed again, the rows removed from the source are deleted.
+A source row keeps the id of its stored row, matched by its content, the
+changed rows are updated in place and the new rows are added after the
+others, so the table order of the lookups is kept.
+The database is rebuilt in a copy, which replaces the database file when
+it's done, the servers never read a half written table.
+
+    python tools/prepare_database.py
+    python tools/prepare_database.py --full -j 4
+    python tools/prepare_database.py --csv tools/temp.csv
+"""
+import argparse
+import csv
+import itertools
+import multiprocessing
+import os
+import shutil
+import sqlite3
 import sys
-sys.path.append("../")
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '../'))
+import pyarabic.araby as araby
 import core.qutrub_api
 
-DATAFILE = "../data/verbsarfiabase.csv"
+DATA_DIR = os.path.join(os.path.dirname(__file__), '../data/')
+DATAFILE = os.path.join(DATA_DIR, "verbsarfiabase.csv")
+# the fields of the source file
+SOURCE_FIELDS = ["verb", "transitive", "Table-base"]
+# the fields of the verbmore table
+FIELDS = ["id", "verb", "transitive", "Table-base", "unvocalized",
+    "unmarked", "normalized", "stamp", "length", "salim", "weak",
+    "future_form"]
+CREATE_TABLE = """create table if not exists "verbmore" (
+    "id" INTEGER, "verb" TEXT, "transitive" TEXT, "Table-base" INTEGER,
+    "unvocalized" TEXT, "unmarked" TEXT, "normalized" TEXT, "stamp" TEXT,
+    "length" INTEGER, "salim" TEXT, "weak" TEXT, "future_form" TEXT)"""
+INDEXES = ["""create index if not exists "stamp" on "verbmore" ("stamp")""",
+    "create index if not exists verbmore_verb on verbmore (verb)",
+    "create index if not exists verbmore_id on verbmore (id)"]
+# number of rows by worker task and by transaction
+CHUNK_SIZE = 500
+VERB_URL = "http://qutrub.arabeyes.org/verb/%s"
+
+
 class converter():
     """ a class to convert basic data into specific data table"""
-    def __init__(self, datafile=DATAFILE):
+    def __init__(self):
         """
+        the future forms are conjugated, not taken from the dictionary
         """
-        self.datafile = datafile
-        self.conjugator = core.qutrub_api.QutrubApi()
-        
-    def load(self, datafile=False):
+        self.conjugator = core.qutrub_api.QutrubApi(db_path=None)
+
+    def convert_row(self, row):
         """
-        load verb file
+        Compute the fields of a verbmore row.
+        @param row: (id, verb, transitive, table base) of the row.
+        @type row: tuple.
+        @return: the values of FIELDS.
+        @rtype: tuple
         """
-        if not datafile:
-            # if not datafile given load the defaul one, or previous datafile
-            datafile = self.datafile
-        else:
-            self.datafile = datafile
-        self.df = pd.read_csv(datafile,comment='#', encoding="utf8", delimiter="\t")
-        print(self.df.head())
-    def convert(self,):
+        (row_id, verb, transitive, table_base) = row
+        unvocalized = araby.strip_tashkeel(verb)
+        unmarked = araby.strip_harakat(verb)
+        features = self.get_info(verb)
+        # the length is made with counting Shadda and normializing hamza
+        values = (row_id, verb, transitive, table_base, unvocalized,
+            unmarked, araby.normalize_hamza(unvocalized),
+            self.conjugator.verb_stamp(unvocalized),
+            len(araby.normalize_hamza(unmarked)), features.get("سالم"),
+            features.get("علة"), features.get("مضارعه"))
+        # the empty fields are null
+        return tuple(None if value == "" else value for value in values)
+
+    def convert(self, rows):
         """
-        Convert loaded file
+        Compute the fields of many rows.
+        @rtype: list of tuple
         """
-        # create unvocalized column
-        self.df["unvocalized"] = self.df["verb"].apply(lambda x: araby.strip_tashkeel(x))
-        self.df["unmarked"] = self.df["verb"].apply(lambda x: araby.strip_harakat(x))
-        self.df["normalized"] = self.df["unvocalized"].apply(lambda x: araby.normalize_hamza(x))
-        self.df["stamp"] = self.df["unvocalized"].apply(lambda x: self.conjugator.verb_stamp(x))
-        # the length is made with counting Shadda and normializing hamza"
-        self.df["length"] = self.df["unmarked"].apply(lambda x: len(araby.normalize_hamza(x)))
-        
-        #verb features
-        
-        self.df["salim"] = self.df["verb"].apply(lambda x: self.get_info(x).get("سالم"))
-        self.df["weak"] = self.df["verb"].apply(lambda x: self.get_info(x).get("علة"))
-        self.df["url"] = self.df["unmarked"].apply(lambda x: "http://qutrub.arabeyes.org/verb/%s"%x)
-        
-        
+        return [self.convert_row(row) for row in rows]
+
     def get_info(self, verb):
         """
         extract fearures from verb
         """
-        features = self.conjugator.get_verb_info(verb, future_type="فتحة", transitive=True)
-        # ~ print(verb)
-        # ~ return repr(features)
-        return features
-        
-        
-    def dump(self, outfile):
-        """
-        
-        """
-        self.df.to_csv(outfile, encoding="utf8", sep="\t")
-        
+        return self.conjugator.get_verb_info(verb, future_type="فتحة",
+            transitive=True)
+
+
+# the converter of a worker process
+_worker = {}
+
+
+def _init_worker():
+    _worker["converter"] = converter()
+
+
+def _convert_chunk(rows):
+    return _worker["converter"].convert(rows)
+
+
+def read_source(datafile):
+    """
+    Read the source file, line by line, the comment lines are skipped.
+    @param datafile: the source file, tab separated, with a header.
+    @type datafile: path string.
+    @return: (verb, transitive, table base)
+    @rtype: generator of tuple
+    """
+    with open(datafile, encoding="utf8", newline="") as infile:
+        lines = (line for line in infile if not line.startswith("#"))
+        reader = csv.reader(lines, delimiter="\t", quoting=csv.QUOTE_NONE)
+        header = next(reader)
+        positions = [header.index(field) for field in SOURCE_FIELDS]
+        for fields in reader:
+            fields += [""] * (len(header) - len(fields))
+            yield tuple(fields[pos].strip() for pos in positions)
+
+
+def chunks(iterable, size):
+    """
+    Split an iterable in lists of size items.
+    """
+    iterator = iter(iterable)
+    chunk = list(itertools.islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(itertools.islice(iterator, size))
+
+
+def source_key(fields):
+    """
+    Get the comparable source fields of a row, as stored in the table:
+    the empty fields are null and the numbers are integers.
+    @param fields: (verb, transitive, table base)
+    @type fields: tuple.
+    @rtype: tuple
+    """
+    return tuple(int(value) if isinstance(value, str) and value.isdigit()
+        else value or None for value in fields)
+
+
+def existing_rows(conn):
+    """
+    Get the source fields of the rows of the verbmore table.
+    @return: {id:source_key}
+    @rtype: dict
+    """
+    return dict((row[0], source_key(row[1:])) for row in conn.execute(
+        """select id, verb, transitive, "Table-base" from verbmore
+        order by id"""))
+
+
+def assign_ids(source, existing):
+    """
+    Give the source rows the ids of the stored rows. A row keeps the id of
+    the same stored row, else the id of a stored row of the same verb and
+    table base (the row is changed), else it's a new row, given the next
+    free id in the source order.
+    @param source: the source rows (verb, transitive, table base).
+    @type source: list of tuple.
+    @param existing: the stored rows {id:source_key}.
+    @type existing: dict.
+    @return: (the id of every source row, the ids of the removed rows)
+    @rtype: tuple
+    """
+    keys = [source_key(fields) for fields in source]
+    # the free ids of every key, in the table order
+    by_key = {}
+    for (row_id, key) in sorted(existing.items()):
+        by_key.setdefault(key, []).append(row_id)
+    ids = [by_key[key].pop(0) if by_key.get(key) else None for key in keys]
+    # the changed rows take the remaining ids of their verb and table base
+    by_verb = {}
+    for row_id in sorted(row_id for row_ids in by_key.values()
+            for row_id in row_ids):
+        key = existing[row_id]
+        by_verb.setdefault((key[0], key[2]), []).append(row_id)
+    next_id = max(existing) + 1 if existing else 0
+    for (pos, key) in enumerate(keys):
+        if ids[pos] is not None:
+            continue
+        if by_verb.get((key[0], key[2])):
+            ids[pos] = by_verb[(key[0], key[2])].pop(0)
+        else:
+            ids[pos] = next_id
+            next_id += 1
+    removed = sorted(row_id for row_ids in by_verb.values()
+        for row_id in row_ids)
+    return (ids, removed)
+
+
+def rebuild(datafile, db_file, jobs = None, full = False,
+        chunk_size = CHUNK_SIZE):
+    """
+    Build the verbmore table from the source file, only the new and the
+    changed rows are computed, unless a full rebuild is asked.
+    The table is written in a copy of the database, which replaces it
+    when it's done, the database is not replaced if no row is changed.
+    @param datafile: the source file.
+    @type datafile: path string.
+    @param db_file: the database file, created if missing.
+    @type db_file: path string.
+    @param jobs: number of worker processes, default the number of cpus,
+    1 to compute in this process.
+    @type jobs: integer.
+    @param full: compute all rows again, the table is written again in
+    the id order.
+    @type full: Boolean.
+    @param chunk_size: number of rows by task and by transaction.
+    @type chunk_size: integer.
+    @return: (number of written rows, number of deleted rows)
+    @rtype: tuple
+    """
+    jobs = jobs or os.cpu_count() or 1
+    source = list(read_source(datafile))
+    tmp_file = db_file + ".tmp"
+    if os.path.exists(tmp_file):
+        os.remove(tmp_file)
+    if os.path.exists(db_file):
+        shutil.copyfile(db_file, tmp_file)
+    conn = sqlite3.connect(tmp_file)
+    try:
+        with conn:
+            conn.execute(CREATE_TABLE)
+        existing = existing_rows(conn)
+        (ids, removed) = assign_ids(source, existing)
+        todo = [(row_id, ) + fields for (row_id, fields) in zip(ids, source)
+            if full or existing.get(row_id) != source_key(fields)]
+        if full:
+            # the rows are inserted in the id order
+            todo.sort(key=lambda row: row[0])
+            existing = {}
+            with conn:
+                conn.execute("drop table verbmore")
+                conn.execute(CREATE_TABLE)
+        with conn:
+            for query in INDEXES:
+                conn.execute(query)
+        insert = "insert into verbmore (%s) values (%s)" % (", ".join(
+            '"%s"' % field for field in FIELDS), ", ".join("?" * len(FIELDS)))
+        # the changed rows keep their place in the table
+        update = "update verbmore set %s where id = ?" % ", ".join(
+            '"%s" = ?' % field for field in FIELDS[1:])
+        pool = None
+        if jobs > 1:
+            pool = multiprocessing.Pool(jobs, initializer=_init_worker)
+            results = pool.imap(_convert_chunk, chunks(todo, chunk_size))
+        else:
+            _init_worker()
+            results = (_convert_chunk(rows) for rows in chunks(todo,
+                chunk_size))
+        written = 0
+        try:
+            for rows in results:
+                with conn:
+                    conn.executemany(update, [row[1:] + row[:1]
+                        for row in rows if row[0] in existing])
+                    conn.executemany(insert, [row for row in rows
+                        if row[0] not in existing])
+                written += len(rows)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+        with conn:
+            conn.executemany("delete from verbmore where id = ?",
+                [(row_id, ) for row_id in removed])
+    except BaseException:
+        conn.close()
+        os.remove(tmp_file)
+        raise
+    conn.close()
+    if written or removed or full or not os.path.exists(db_file):
+        os.replace(tmp_file, db_file)
+    else:
+        os.remove(tmp_file)
+    return (written, len(removed))
+
+
+def dump(db_file, outfile):
+    """
+    Save the verbmore table as a tab separated file, with the verb url.
+    @param db_file: the database file.
+    @type db_file: path string.
+    @param outfile: the output file.
+    @type outfile: path string.
+    """
+    fields = FIELDS[1:-1]
+    conn = sqlite3.connect(db_file)
+    try:
+        with open(outfile, "w", encoding="utf8", newline="") as out:
+            writer = csv.writer(out, delimiter="\t", lineterminator="\n")
+            writer.writerow([""] + fields + ["url"])
+            for row in conn.execute("select id, %s from verbmore order by id"
+                    % ", ".join('"%s"' % field for field in fields)):
+                writer.writerow(["" if value is None else value
+                    for value in row] + [VERB_URL % row[FIELDS.index(
+                    "unmarked")]])
+    finally:
+        conn.close()
+
+
+def grabargs():
+    parser = argparse.ArgumentParser(
+        description='Build the verbmore table of the verb dictionary')
+    parser.add_argument("-f", dest="datafile", default=DATAFILE,
+        help="verbs source file")
+    parser.add_argument("-d", dest="db_file",
+        default=os.path.join(DATA_DIR, "verbdict.db"),
+        help="verb dictionary database, updated")
+    parser.add_argument("-j", dest="jobs", type=int, default=None,
+        help="number of worker processes, default the number of cpus")
+    parser.add_argument("--full", action="store_true",
+        help="compute all rows again, not only the changed rows")
+    parser.add_argument("--csv", dest="csv_file",
+        help="save the table as a tab separated file too")
+    return parser.parse_args()
+
 
-     
-        
 def main(args):
-    conv = converter()
-    conv.load()
-    print("***********loading-----------------")
-    print(conv.df.head())
-    conv.convert()
-    print(">>>>>>>> Output -------------------")    
-    print(conv.df.head())
-    conv.dump("temp.csv")
+    args = grabargs()
+    start = time.time()
+    (written, removed) = rebuild(args.datafile, args.db_file, args.jobs,
+        args.full)
+    print("%d rows written, %d rows deleted in %s (%.1f s)" % (written,
+        removed, args.db_file, time.time() - start))
+    if args.csv_file:
+        dump(args.db_file, args.csv_file)
+        print("result saved on %s" % args.csv_file)
     return 0
 
 if __name__ == '__main__':
-    import sys
     sys.exit(main(sys.argv))